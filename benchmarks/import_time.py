@@ -0,0 +1,52 @@
+"""
+Measure the time it takes to import valentine and its matchers, each in a fresh interpreter so that nothing is cached
+in sys.modules. Run it from the root of the repository:
+
+    python benchmarks/import_time.py [--repeat 7]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "valentine": "import valentine",
+    "JaccardDistanceMatcher": "from valentine.algorithms import JaccardDistanceMatcher",
+    "SimilarityFlooding": "from valentine.algorithms import SimilarityFlooding",
+    "DistributionBased": "from valentine.algorithms import DistributionBased",
+    "Cupid": "from valentine.algorithms import Cupid",
+    "Coma": "from valentine.algorithms import Coma",
+}
+
+HEAVY_MODULES = ("nltk", "networkx", "ot", "jellyfish", "anytree")
+
+TIMED_IMPORT = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy_modules!r} if m in sys.modules))
+"""
+
+
+def time_import(statement: str):
+    output = subprocess.run([sys.executable, "-c", TIMED_IMPORT.format(statement=statement,
+                                                                      heavy_modules=HEAVY_MODULES)],
+                            check=True, capture_output=True, text=True).stdout.split()
+    return float(output[0]), output[1] if len(output) > 1 else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7, help="the number of fresh interpreters per target")
+    args = parser.parse_args()
+
+    print(f"{'target':<24}{'median (s)':>12}{'min (s)':>10}  heavy modules loaded")
+    for name, statement in TARGETS.items():
+        results = [time_import(statement) for _ in range(args.repeat)]
+        times = [elapsed for elapsed, _ in results]
+        print(f"{name:<24}{statistics.median(times):>12.3f}{min(times):>10.3f}  {results[-1][1] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,34 @@
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+from itertools import product
+
+import numpy as np
+import pandas as pd
 import pytest
 
 from tests import df1, df2
+from valentine import valentine_match
 from valentine.algorithms import Coma, JaccardDistanceMatcher, DistributionBased, SimilarityFlooding, Cupid
+from valentine.algorithms.coma import coma, coma_server
+from valentine.algorithms.cupid import linguistic_matching
+from valentine.algorithms.cupid.schema_tree import SchemaTree
+from valentine.algorithms.distribution_based import CorrelationClusteringBackend
+from valentine.algorithms.distribution_based.clustering_utils import compute_global_ranks, iter_global_ranks
+from valentine.algorithms.distribution_based.discovery import correlation_clustering_edge_signs, \
+    correlation_clustering_pivot
+from valentine.algorithms.distribution_based.distribution_index import DistributionIndex
+from valentine.algorithms.distribution_based.quantile_sketch import QuantileSketch
+from valentine.algorithms.distribution_based.emd_utils import emd_1d
 from valentine.algorithms.jaccard_distance import StringDistanceFunction
-from valentine.data_sources import DataframeTable
+from valentine.algorithms.jaccard_distance.filtering_index import FilteringIndex
+from valentine.algorithms.jaccard_distance.jaccard_distance import DISTANCE_FUNCTIONS
+from valentine.algorithms.jaccard_distance.minhash_lsh import MinHashLSHIndex
+from valentine.algorithms.jaccard_distance.shared_values import SharedColumnValues, get_shared_index
+from valentine.data_sources import DataframeTable, SamplingStrategy
 
 d1 = DataframeTable(df1, name='authors1')
 d2 = DataframeTable(df2, name='authors2')
@@ -24,6 +49,158 @@ def test_coma():
     assert matches_coma_matcher_schema != matches_coma_matcher_instances
 
 
+requires_java = pytest.mark.skipif(shutil.which('java') is None or not os.path.isfile(coma_server.get_jar_path()),
+                                   reason='COMA needs Java and coma.jar')
+
+
+def run_coma_once(source_file, target_file, output_file, max_n, strategy):
+    # A one-shot run of coma.jar, as the Coma matcher does without server_mode
+    subprocess.check_output(['java', '-Xmx1024m', '-cp', coma_server.get_jar_path(), f'-DinputFile1={source_file}',
+                             f'-DinputFile2={target_file}', f'-DoutputFile={output_file}', f'-DmaxN={max_n}',
+                             f'-Dstrategy={strategy}', 'Main'], stderr=subprocess.DEVNULL)
+    with open(output_file, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+@requires_java
+def test_coma_server_isolation():
+    # Different jobs in a row on one JVM give the results of one-shot runs of coma.jar, so no static state of COMA
+    # leaks from one job to the next
+    d3 = DataframeTable(df1[['EID', 'Title', 'Authors']], name='authors3')
+    with tempfile.TemporaryDirectory() as directory:
+        files = {}
+        for table in (d1, d2, d3):
+            files[table.name] = os.path.join(directory, table.name + '.csv')
+            table.get_df().to_csv(files[table.name], index=False)
+        jobs = [('authors1', 'authors2', 0, 'COMA_OPT_INST'), ('authors3', 'authors2', 0, 'COMA_OPT'),
+                ('authors2', 'authors1', 2, 'COMA_OPT_INST'), ('authors1', 'authors3', 0, 'COMA_OPT')]
+        one_shot = [run_coma_once(files[source], files[target], os.path.join(directory, 'once.txt'), max_n, strategy)
+                    for source, target, max_n, strategy in jobs]
+        server = coma_server.ComaServer()
+        try:
+            for _ in range(2):
+                for (source, target, max_n, strategy), expected in zip(jobs, one_shot):
+                    output = os.path.join(directory, 'server.txt')
+                    assert server.match(files[source], files[target], output, max_n, strategy) == expected
+                    assert not os.path.exists(output)
+        finally:
+            server.close()
+    # The same holds for the matcher, whose jobs run on one server
+    for use_instances in (False, True):
+        pairs = [(d1, d2), (d3, d2), (d2, d1), (d1, d3)]
+        one_shot_matches = [Coma(use_instances=use_instances).get_matches(source, target) for source, target in pairs]
+        with Coma(use_instances=use_instances, server_mode=True) as coma_server_matcher:
+            assert [coma_server_matcher.get_matches(source, target) for source, target in pairs] == one_shot_matches
+
+
+@requires_java
+def test_coma_header_only_schema():
+    # The schema strategy gives the same result from the header-only CSV files that Coma writes as from the full ones
+    with tempfile.TemporaryDirectory() as full_directory, tempfile.TemporaryDirectory() as header_directory:
+        outputs = []
+        for directory, header_only in ((full_directory, False), (header_directory, True)):
+            files = []
+            for table in (d1, d2):
+                files.append(os.path.join(directory, table.name + '.csv'))
+                df = pd.DataFrame(columns=table.get_column_names()) if header_only else table.get_df()
+                df.to_csv(files[-1], index=False)
+            outputs.append(run_coma_once(files[0], files[1], os.path.join(directory, 'out.txt'), 0, 'COMA_OPT'))
+        assert outputs[0] == outputs[1]
+
+
+FAKE_COMA_SERVER = """
+import os
+import sys
+for job in sys.stdin:
+    source, target, output, max_n, strategy = job.rstrip('\\n').split('\\t')
+    if strategy == 'EXIT':
+        sys.exit(1)
+    if strategy == 'EXIT0':
+        # Like a COMA that calls System.exit(0) after writing its result
+        with open(output, 'w') as f:
+            f.write(f'{source} <-> {target}: {max_n}\\n')
+        sys.exit(0)
+    if strategy == 'FAIL':
+        print('<<ERROR>> java.lang.OutOfMemoryError', flush=True)
+        continue
+    if os.path.exists(source):
+        # Match the columns with the same names, like COMA's output followed by its summary line
+        names = [[open(path).readline().strip().split(','), os.path.basename(path)[:-4]] for path in (source, target)]
+        for column in names[0][0]:
+            if column in names[1][0]:
+                print(f'{names[0][1]}.{column} <-> {names[1][1]}.{column}: 0.5')
+        print('summary')
+    else:
+        print(f'{source} <-> {target}: {max_n}')
+    print('<<END_OF_RESULT>>', flush=True)
+"""
+
+
+def test_coma_server_protocol(monkeypatch):
+    # The protocol of the server, with a stand-in for the JVM
+    monkeypatch.setattr(coma_server, 'get_server_command', lambda java_xmx: [sys.executable, '-c', FAKE_COMA_SERVER])
+    server = coma_server.ComaServer()
+    assert server.match('s.csv', 't.csv', 'out.txt', 0, 'COMA_OPT') == ['s.csv <-> t.csv: 0']
+    assert server.match('s2.csv', 't2.csv', 'out.txt', 3, 'COMA_OPT') == ['s2.csv <-> t2.csv: 3']
+    with pytest.raises(coma_server.JavaException):
+        server.match('s.csv', 't.csv', 'out.txt', 0, 'FAIL')
+    assert server.is_running
+    # The output file of a job is deleted even if the job failed
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'out.txt')
+        open(output, 'w').close()
+        with pytest.raises(coma_server.JavaException):
+            server.match('s.csv', 't.csv', output, 0, 'FAIL')
+        assert not os.path.exists(output)
+    with pytest.raises(coma_server.JavaException):
+        server.match('s.csv', 't.csv', 'out.txt', 0, 'EXIT')
+    assert not server.is_running
+    # A dead server is restarted by the next job
+    assert server.match('s.csv', 't.csv', 'out.txt', 0, 'COMA_OPT') == ['s.csv <-> t.csv: 0']
+    # The result of a job that ends the JVM with a status of 0 is read from its output file
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'out.txt')
+        assert server.match('s.csv', 't.csv', output, 1, 'EXIT0') == ['s.csv <-> t.csv: 1']
+        assert not os.path.exists(output)
+    assert server.match('s.csv', 't.csv', 'out.txt', 2, 'COMA_OPT') == ['s.csv <-> t.csv: 2']
+    server.close()
+    assert not server.is_running
+
+
+def test_coma_parallel(monkeypatch):
+    monkeypatch.setattr(coma_server, 'get_server_command', lambda java_xmx: [sys.executable, '-c', FAKE_COMA_SERVER])
+    d3 = DataframeTable(df1[['EID', 'Title']], name='authors3')
+    pairs = [(d1, d2), (d2, d3), (d3, d1), (d1, d3)]
+    job_directories = []
+    mkdtemp = tempfile.mkdtemp
+    monkeypatch.setattr(coma.tempfile, 'mkdtemp', lambda: job_directories.append(mkdtemp()) or job_directories[-1])
+    with Coma(server_mode=True) as coma_matcher:
+        serial_matches = [coma_matcher.get_matches(source, target) for source, target in pairs]
+    assert all(len(matches) > 0 for matches in serial_matches)
+    # The input and output files of every job are deleted along with its directory
+    assert len(job_directories) == len(pairs)
+    assert not any(os.path.exists(directory) for directory in job_directories)
+    # The matches of the pairs come back in their order
+    with Coma(server_mode=True, process_num=2, java_xmx='2g') as coma_matcher:
+        assert list(coma_matcher.get_matches_batch(pairs)) == serial_matches
+        # The pairs are consumed in a bounded window of 2 * process_num pending jobs
+        consumed = []
+
+        def generate_pairs():
+            for pair in pairs * 3:
+                consumed.append(pair)
+                yield pair
+        batch = coma_matcher.get_matches_batch(generate_pairs())
+        assert next(batch) == serial_matches[0]
+        assert len(consumed) <= 5
+        assert list(batch) == (serial_matches * 3)[1:]
+    assert coma_server.split_java_xmx('2g', 2) == '1024m'
+    assert coma_server.split_java_xmx('1000m', 3) == '333m'
+    assert coma_server.split_java_xmx('1024m', 1) == '1024m'
+    with pytest.raises(ValueError):
+        Coma(java_xmx='1 GB')
+
+
 def test_cupid():
     # Test the CUPID matcher
     cu_matcher = Cupid()
@@ -36,6 +213,46 @@ def test_cupid():
     assert len(matches_cu_matcher) > 0
 
 
+def get_cupid_schema_tree(table):
+    tree = SchemaTree('DB__' + table.name)
+    tree.add_node(table_name=table.name, table_guid=table.unique_identifier, data_type='Table',
+                  parent=tree.get_node('DB__' + table.name))
+    for column in table.get_columns():
+        tree.add_node(table_name=table.name, table_guid=table.unique_identifier, column_name=column.name,
+                      column_guid=column.unique_identifier, data_type=column.data_type,
+                      parent=tree.get_node(table.name))
+    return tree
+
+
+def test_cupid_similarity_caches(monkeypatch):
+    nltk = pytest.importorskip('nltk')
+    try:
+        nltk.data.find('corpora/wordnet')
+    except LookupError:
+        pytest.skip('The WordNet corpus is not downloaded')
+    # The memoized WordNet lookups and token similarities give the same scores as the uncached functions, and the
+    # linguistic similarities reduced from the vocabulary matrices the same as comparing every element pair token by
+    # token
+    source_tree, target_tree = get_cupid_schema_tree(d1), get_cupid_schema_tree(d2)
+    token_pairs = list(product(linguistic_matching.get_vocabulary(source_tree),
+                               linguistic_matching.get_vocabulary(target_tree)))
+    cached_similarities = [linguistic_matching.compute_similarity_tokens(*pair) for pair in token_pairs]
+    categories = {column.data_type for table in (d1, d2) for column in table.get_columns()}
+    compatibility_table = linguistic_matching.compute_compatibility(categories)
+    vocabulary_l_sims = linguistic_matching.comparison(source_tree, target_tree, compatibility_table, 0.7)
+
+    for name in ('get_synonyms', 'get_wup_similarity', 'compute_similarity_wordnet', 'compute_similarity_leven'):
+        monkeypatch.setattr(linguistic_matching, name, getattr(linguistic_matching, name).__wrapped__)
+    uncached_similarities = [linguistic_matching.compute_similarity_tokens(*pair) for pair in token_pairs]
+    assert len(token_pairs) > 0
+    assert cached_similarities == pytest.approx(uncached_similarities)
+    pairwise_l_sims = dict(linguistic_matching.l_sim_proc(pair, compatibility_table) for pair in
+                           linguistic_matching.generate_parallel_l_sim_input(source_tree, target_tree,
+                                                                             compatibility_table, 0.7))
+    assert len(vocabulary_l_sims) > 0 and vocabulary_l_sims.keys() == pairwise_l_sims.keys()
+    assert all(vocabulary_l_sims[key] == pytest.approx(pairwise_l_sims[key]) for key in vocabulary_l_sims)
+
+
 def test_distribution_based():
     # Test the Distribution based matcher
     distribution_based_matcher = DistributionBased()
@@ -48,12 +265,89 @@ def test_distribution_based():
     assert len(matches_db_matcher) > 0
 
 
+def test_distribution_based_memory_budget():
+    # Spilling the ranks of the columns to disk gives the same matches, serially and in parallel
+    matches = DistributionBased().get_matches(d1, d2)
+    assert DistributionBased(memory_budget=0).get_matches(d1, d2) == matches
+    with DistributionBased(process_num=2, memory_budget=2000) as distribution_based_matcher:
+        assert distribution_based_matcher.get_matches(d1, d2) == matches
+
+
+def test_distribution_based_clustering_backend():
+    # Both backends cluster the attribute graphs without a solver, EdgeSigns by default
+    for backend in CorrelationClusteringBackend:
+        assert len(DistributionBased(clustering_backend=backend).get_matches(d1, d2)) > 0
+    assert DistributionBased().get_matches(d1, d2) == \
+        DistributionBased(clustering_backend=CorrelationClusteringBackend.EdgeSigns).get_matches(d1, d2)
+    # Two triangles of agreeing vertices, with a disagreeing edge between them
+    vertexes = list(range(6))
+    edges = {i: {j: 1 if i // 3 == j // 3 else -1 for j in vertexes} for i in vertexes}
+    edges[2][3] = edges[3][2] = 1
+    # EdgeSigns keeps every positive edge, like the optimum of the integer program without transitivity constraints
+    clusters = correlation_clustering_edge_signs(vertexes, edges)
+    assert all(clusters[i, j] == (0 if edges[i][j] == 1 else 1) for i in vertexes for j in vertexes)
+    # Pivot cuts the single positive edge between the triangles
+    clusters = correlation_clustering_pivot(vertexes, edges)
+    assert all(clusters[i, j] == (0 if i // 3 == j // 3 else 1) for i in vertexes for j in vertexes)
+
+
+def test_distribution_based_global_ranks():
+    # Equal numbers share a rank whatever their type, the numbers are ranked before the strings
+    ranks = compute_global_ranks([np.array([3, 1, 2]), np.array(['1.0', 'b', '10', 'a'], dtype=object)])
+    assert ranks[0].tolist() == [1, 2, 3]
+    assert ranks[1].tolist() == [1, 4, 5, 6]
+    # The columns can be ranked one at a time, from a function that gives their values
+    columns = {'numbers': np.array([3, 1, 2]), 'strings': np.array(['1.0', 'b', '10', 'a'], dtype=object)}
+    assert [r.tolist() for r in iter_global_ranks(list(columns), columns.get)] == [r.tolist() for r in ranks]
+
+
+def test_distribution_based_emd_kernel():
+    # The closed form EMD of a stack of histograms agrees with the linear program solver
+    histograms = np.random.default_rng(0).random((5, 32))
+    histograms /= histograms.sum(axis=1, keepdims=True)
+    distances = emd_1d(histograms[0], histograms[1:])
+    assert distances.shape == (4,)
+    assert np.allclose(distances, emd_1d(histograms[0], histograms[1:], exact=True))
+    assert emd_1d(histograms[0], histograms[0]) == 0
+
+
+def test_distribution_index():
+    index = DistributionIndex()
+    index.add_table(d1)
+    index.add_table(d2)
+    assert len(index) == len(d1.get_columns()) + len(d2.get_columns())
+    # Equal columns have the same distribution and columns of the same table are never returned
+    assert index.query('authors1', 'EID', k=1) == [(('authors2', 'EID'), 1.0)]
+    assert all(table_name == 'authors2' for (table_name, _), _ in index.query('authors1', 'Authors'))
+    # New rows are merged into the summaries, the index can be persisted
+    index.update_table(d1)
+    assert pickle.loads(pickle.dumps(index)).query('authors1', 'EID', k=1) == index.query('authors1', 'EID', k=1)
+
+    # The sketch keeps a bounded number of items with accurate quantiles
+    values = np.random.default_rng(0).random(100_000)
+    sketch = QuantileSketch()
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+    items, weights = sketch.get_items()
+    assert sketch.n == weights.sum() == 100_000 and len(sketch) < 1000
+    assert abs(items[np.searchsorted(np.cumsum(weights), 50_000)] - 0.5) < 0.02
+
+
 def test_jaccard():
     # Test the Jaccard matcher with exact string similarity
     jd_matcher = JaccardDistanceMatcher(distance_fun=StringDistanceFunction.Exact)
     matches_jd_matcher = jd_matcher.get_matches(d1, d2)
     # Check that it actually produced output
     assert len(matches_jd_matcher) > 0
+    # Exact matching is Levenshtein matching with a threshold of 1
+    leven_matcher = JaccardDistanceMatcher(threshold_dist=1.0, distance_fun=StringDistanceFunction.Levenshtein)
+    assert matches_jd_matcher == leven_matcher.get_matches(d1, d2)
+    # Values are compared by their string form, so 1 and '1' are one value: the sets are {'1', 'x'} and {'1', 'y'}
+    mixed = DataframeTable(pd.DataFrame({'a': [1, '1', 'x']}), name='mixed1')
+    strings = DataframeTable(pd.DataFrame({'b': ['1', 'y', 'y']}), name='mixed2')
+    for distance_function in (StringDistanceFunction.Exact, StringDistanceFunction.Levenshtein):
+        assert JaccardDistanceMatcher(distance_fun=distance_function).get_matches(mixed, strings) == \
+            {(('mixed1', 'a'), ('mixed2', 'b')): 1 / 3}
 
 
 @pytest.mark.parametrize("distance_function", [StringDistanceFunction.Hamming, StringDistanceFunction.Levenshtein,
@@ -71,6 +365,114 @@ def test_jaccard_distance_function(distance_function):
     assert len(matches_jd_matcher) > 0
 
 
+@pytest.mark.parametrize("distance_function", list(DISTANCE_FUNCTIONS))
+def test_jaccard_filtering_index(distance_function):
+    # The filters should never prune a string that is within the threshold
+    source_values = {str(x) for x in df1['Authors']}
+    target_values = {str(x) for x in df2['Authors']}
+    index = FilteringIndex(frozenset(target_values))
+    function, normalize = DISTANCE_FUNCTIONS[distance_function]
+    for threshold in [0.5, 0.8]:
+        for s1 in source_values:
+            if normalize:
+                within = {s2 for s2 in target_values
+                          if 1 - function(s1, s2) / max(len(s1), len(s2), 1) >= threshold}
+            else:
+                within = {s2 for s2 in target_values if function(s1, s2) >= threshold}
+            assert within <= set(index.candidates(s1, threshold, distance_function))
+
+
+def test_jaccard_lsh_index():
+    lsh_index = MinHashLSHIndex(threshold=0.5)
+    lsh_index.add_table(d1)
+    lsh_index.add_table(d2)
+    # The identical columns of the two tables should be candidates with an estimated similarity of 1
+    candidate_pairs = lsh_index.candidate_pairs()
+    assert (('authors1', 'EID'), ('authors2', 'EID')) in candidate_pairs
+    assert lsh_index.estimate_jaccard(('authors1', 'EID'), ('authors2', 'EID')) == 1.0
+    # Only the candidate pairs should be matched
+    jd_matcher = JaccardDistanceMatcher(distance_fun=StringDistanceFunction.Exact, lsh_index=lsh_index)
+    matches_jd_matcher = jd_matcher.get_matches(d1, d2)
+    assert len(matches_jd_matcher) > 0
+    assert all(pair in candidate_pairs for pair in matches_jd_matcher)
+
+
+def test_jaccard_lsh_index_reuse():
+    # The index is not modified by the matcher, which hashes the two tables it matches unless they were added to the
+    # index, even when their names are the ones of earlier matches (valentine_match always uses table_1 and table_2)
+    # or of each other
+    lsh_index = MinHashLSHIndex(threshold=0.5)
+    jd_matcher = JaccardDistanceMatcher(distance_fun=StringDistanceFunction.Exact, lsh_index=lsh_index)
+    valentine_match(pd.DataFrame({'x': ['a', 'b']}), pd.DataFrame({'y': ['c', 'd']}), jd_matcher)
+    matches = valentine_match(pd.DataFrame({'x': ['e', 'f']}), pd.DataFrame({'y': ['e', 'f']}), jd_matcher)
+    assert dict(matches) == {(('table_1', 'x'), ('table_2', 'y')): 1.0}
+    assert len(lsh_index) == 0
+    assert jd_matcher.get_matches(d1, d1) == JaccardDistanceMatcher(distance_fun=StringDistanceFunction.Exact,
+                                                                    ).get_matches(d1, d1)
+
+
+def test_jaccard_lsh_index_signature_reuse(monkeypatch):
+    # The tables added to the index are not hashed again when they are matched, but the tables that were not added are
+    lsh_index = MinHashLSHIndex(threshold=0.5)
+    lsh_index.add_table(d1)
+    lsh_index.add_table(d2)
+    hashed_columns = []
+    get_signature = MinHashLSHIndex.get_signature
+
+    def counting_get_signature(index, column):
+        hashed_columns.append(column.name)
+        return get_signature(index, column)
+
+    monkeypatch.setattr(MinHashLSHIndex, 'get_signature', counting_get_signature)
+    jd_matcher = JaccardDistanceMatcher(distance_fun=StringDistanceFunction.Exact, lsh_index=lsh_index)
+    matches = [jd_matcher.get_matches(d1, d2) for _ in range(3)]
+    assert not hashed_columns
+    assert matches[0] == matches[1] == matches[2]
+    assert matches[0] == JaccardDistanceMatcher(distance_fun=StringDistanceFunction.Exact,
+                                                lsh_index=MinHashLSHIndex(threshold=0.5)).get_matches(d1, d2)
+    hashed_columns.clear()
+    unindexed = DataframeTable(df2.copy(), name='authors2')
+    assert jd_matcher.get_matches(d1, unindexed) == matches[0]
+    assert sorted(hashed_columns) == sorted(unindexed.get_column_names())
+
+
+def test_jaccard_shared_values():
+    columns = {'empty': frozenset(),
+               'authors': frozenset(str(x) for x in df1['Authors']),
+               'unicode': frozenset({'ß', 'ü'})}
+    with SharedColumnValues(columns) as shared_values:
+        for key, values in columns.items():
+            assert get_shared_index(shared_values.get_handle(key)).values == values
+    # Both tables' columns are sent through shared memory to the workers
+    matches_serial = JaccardDistanceMatcher(threshold_dist=0.5).get_matches(d1, d2)
+    with JaccardDistanceMatcher(threshold_dist=0.5, process_num=2) as jd_matcher:
+        assert jd_matcher.get_matches(d1, d2) == matches_serial
+
+
+def test_persistent_process_pool():
+    # The process pool of a matcher should be created once and reused until the matcher is closed
+    with JaccardDistanceMatcher(process_num=2) as jd_matcher:
+        process_pool = jd_matcher._get_process_pool(2)
+        matches_first = jd_matcher.get_matches(d1, d2)
+        matches_second = jd_matcher.get_matches(d1, d2)
+        assert jd_matcher._get_process_pool(2) is process_pool
+    assert matches_first == matches_second
+    assert jd_matcher._get_process_pool(2) is not process_pool
+    jd_matcher.close()
+
+
+def test_sampling():
+    # A budget that covers all the values gives the same matches
+    for matcher, sampled_matcher in ((JaccardDistanceMatcher(), JaccardDistanceMatcher(sample_size=1000)),
+                                     (DistributionBased(), DistributionBased(sample_size=1000))):
+        assert sampled_matcher.get_matches(d1, d2) == matcher.get_matches(d1, d2)
+    # Smaller samples are reproducible
+    for strategy in SamplingStrategy:
+        jd_matcher = JaccardDistanceMatcher(distance_fun=StringDistanceFunction.Exact, sample_size=5,
+                                            sampling_strategy=strategy, sampling_seed=3)
+        assert jd_matcher.get_matches(d1, d2) == jd_matcher.get_matches(d1, d2)
+
+
 def test_similarity_flooding():
     # Test the Similarity flooding matcher
     sf_matcher = SimilarityFlooding()
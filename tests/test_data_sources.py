@@ -0,0 +1,225 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests import df1, d1_path
+from valentine.data_sources import CSVTable, DataframeTable, ParquetTable, SamplingStrategy
+from valentine.data_sources.sampling import ReservoirSampler
+from valentine.data_sources.type_inference import infer_data_type
+
+
+class TestDataframeTable(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({'ints': [3, 1, 3, 2],
+                                'floats': [1.5, None, 1.5, None],
+                                'strings': ['a', 'b', None, 'a']})
+        self.table = DataframeTable(self.df, name='table')
+        self.columns = {column.name: column for column in self.table.get_columns()}
+
+    def test_columns(self):
+        assert [column.name for column in self.table.get_columns()] == list(self.df.columns)
+        assert self.columns['ints'].data_type == 'int'
+        assert self.columns['floats'].data_type == 'float'
+        assert self.columns['strings'].data_type == 'varchar'
+
+    def test_column_values(self):
+        ints = self.columns['ints']
+        # Columns without missing values are not copied
+        assert np.shares_memory(ints.values, self.df['ints'].to_numpy())
+        assert ints.data == [3, 1, 3, 2]
+        assert ints.size == 4 and ints.null_count == 0
+        floats = self.columns['floats']
+        assert floats.data == [1.5, 1.5]
+        assert floats.size == 2 and floats.null_count == 2
+
+    def test_column_derived_values(self):
+        assert list(self.columns['ints'].distinct_values) == [3, 1, 2]
+        assert self.columns['ints'].value_counts.to_dict() == {3: 2, 1: 1, 2: 1}
+        assert list(self.columns['strings'].distinct_values) == ['a', 'b']
+
+    def test_str(self):
+        assert 'Column: Authors' in str(DataframeTable(df1, name='authors1'))
+
+    def test_lazy_profiling(self):
+        table = DataframeTable(self.df, name='table')
+        column = table.get_columns()[1]
+        # The data type only looks at the first non-null value, the values are only computed when accessed
+        assert column.data_type == 'float'
+        assert column._DataframeColumn__values is None
+        assert column.null_count == 2
+        assert column._DataframeColumn__values is None
+        assert column.data == [1.5, 1.5]
+        empty = DataframeTable(pd.DataFrame({'empty': [None, None]}), name='empty_table').get_columns()[0]
+        assert empty.data_type == 'varchar' and empty.is_empty
+
+
+class TestTypeInference(unittest.TestCase):
+
+    def test_object_columns(self):
+        assert infer_data_type(np.array(['1', ' 2', '-3', None], dtype=object), 'object') == ('int', 1.0, 3)
+        assert infer_data_type(['1.5', '2', '1e3'], 'object').data_type == 'float'
+        assert infer_data_type(['2019-04-26 18:03:50.941332', '2020-01-02 10:00:00.5'], 'object').data_type == 'date'
+        assert infer_data_type(['26/04/2019', '27/04/2019', '01/13/2019'], 'object').data_type == 'varchar'
+        assert infer_data_type([datetime.date(2020, 1, 1), datetime.date(2020, 1, 2)], 'object').data_type == 'date'
+        assert infer_data_type([1, 2, 3], 'object').data_type == 'int'
+        assert infer_data_type(['a', 'b', 'a'], 'object') == ('varchar', 1.0, 2)
+
+    def test_confidence(self):
+        inferred = infer_data_type([str(i) for i in range(95)] + ['a'] * 5, 'object')
+        assert inferred.data_type == 'int' and inferred.confidence == 0.95
+        inferred = infer_data_type([str(i) for i in range(50)] + ['a'] * 50, 'object')
+        assert inferred.data_type == 'varchar' and inferred.confidence == 0.5
+
+    def test_sample(self):
+        values = np.array(['a'] * 10 + ['1'] * 990, dtype=object)
+        assert infer_data_type(values, 'object', sample_size=10).cardinality == 2
+        assert infer_data_type(values, 'object', sample_size=10).data_type == 'int'
+
+    def test_numeric_strings(self):
+        # Object columns of numeric strings are ints or floats, not varchars
+        assert DataframeTable.get_data_type(['1', '22', '333'], 'object') == 'int'
+        assert DataframeTable.get_data_type(['1.5', '2', '-3e2'], 'object') == 'float'
+        assert DataframeTable.get_data_type(['a1', '2'], 'object') == 'varchar'
+        columns = DataframeTable(pd.DataFrame({'codes': ['007', '042', None, '100'], 'prices': ['1.5', '2.25', '3', '4'],
+                                               'ids': ['a1', 'b2', 'c3', 'd4']}), name='table').get_columns()
+        assert [column.data_type for column in columns] == ['int', 'float', 'varchar']
+
+    def test_other_dtypes(self):
+        assert infer_data_type(np.array([1, 2]), 'int64') == ('int', 1.0, 2)
+        assert infer_data_type(np.array([1.5]), 'float32') == ('float', 1.0, 1)
+        assert infer_data_type(np.arange(1000), 'int64', sample_size=10).cardinality == 10
+        assert infer_data_type(np.array(['2020-01-01', '2020-01-01'], dtype='datetime64[ns]'),
+                               'datetime64[ns]') == ('date', 1.0, 1)
+        # The cardinality of a column is counted on a sample of its non-null values, whatever its dtype
+        column = DataframeTable(pd.DataFrame({'floats': [1.5, None, 2.5, 1.5, None]}), name='table').get_columns()[0]
+        assert column.inferred_type == ('float', 1.0, 2)
+        assert column._DataframeColumn__values is None
+        assert infer_data_type(np.array([], dtype=float), 'float64').data_type == 'float64'
+        assert infer_data_type([], 'object').data_type == 'varchar'
+
+
+class TestFileTables(unittest.TestCase):
+
+    def test_csv_table(self):
+        table = CSVTable(d1_path, chunk_size=7)
+        assert table.name == 'authors1'
+        reference = {column.name: column for column in DataframeTable(df1, name='authors1').get_columns()}
+        for column in table.get_columns():
+            assert not column.is_sampled
+            assert column.data == reference[column.name].data
+            assert column.data_type == reference[column.name].data_type
+            assert column.null_count == reference[column.name].null_count
+        assert table.get_df().equals(df1)
+
+    def test_memory_budget(self):
+        table = CSVTable(d1_path, chunk_size=5, memory_budget=len(df1.columns) * 80)
+        for column in table.get_columns():
+            assert column.is_sampled
+            assert column.size == df1[column.name].notna().sum()
+            assert 0 < len(column.data) < column.size
+            assert set(column.data) <= set(df1[column.name])
+        # The samples are reproducible
+        sample = CSVTable(d1_path, chunk_size=5, memory_budget=len(df1.columns) * 80).get_columns()[0].data
+        assert sample == table.get_columns()[0].data
+
+    def test_memory_budget_sparse_column(self):
+        # The values of a mostly missing column are sized without its nulls, so its sample stays within its budget
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sparse.csv')
+            pd.DataFrame({'sparse': [f'v{i:049d}' if i % 10 == 0 else None for i in range(1000)],
+                          'dense': range(1000)}).to_csv(path, index=False)
+            column_budget = 2000
+            table = CSVTable(path, chunk_size=200, memory_budget=2 * column_budget)
+            sparse = table.get_columns()[0]
+            assert sparse.is_sampled and sparse.size == 100 and sparse.null_count == 900
+            assert 0 < pd.Series(sparse.values).memory_usage(deep=True, index=False) <= column_budget
+
+    def test_chunk_dtype_change(self):
+        # The ints of the first chunks are strings in a single read, because of the strings of the last chunk
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'mixed.csv')
+            pd.DataFrame({'codes': [955, 296, None, 7, 'x12', 'y3'], 'ints': range(6)}).to_csv(path, index=False)
+            table = CSVTable(path, chunk_size=2)
+            reference = {column.name: column for column in DataframeTable(pd.read_csv(path), name='mixed').get_columns()}
+            for column in table.get_columns():
+                assert column.data == reference[column.name].data
+                assert column.data_type == reference[column.name].data_type
+            assert list(table.get_columns()[0].data) == ['955', '296', '7', 'x12', 'y3']
+            assert table.get_row_sample(6).equals(pd.read_csv(path))
+
+    def test_row_sample(self):
+        table = CSVTable(d1_path, chunk_size=4)
+        assert table.get_column_names() == list(df1.columns)
+        assert table.get_row_sample(len(df1)).equals(df1)
+        sample = table.get_row_sample(5, seed=3)
+        assert len(sample) == 5
+        # The sampled rows keep their order in the file and the same seed gives the same rows
+        rows = [df1.index[(df1 == row).fillna(df1.isna()).all(axis=1)][0] for _, row in sample.iterrows()]
+        assert rows == sorted(rows)
+        assert sample.equals(table.get_row_sample(5, seed=3))
+        df_sample = DataframeTable(df1, name='authors1').get_row_sample(5, seed=3)
+        assert len(df_sample) == 5 and list(df_sample.index) == sorted(df_sample.index)
+
+    def test_parquet_table(self):
+        pytest.importorskip('pyarrow')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'authors1.parquet')
+            df1.to_parquet(path, row_group_size=6)
+            table = ParquetTable(path, chunk_size=4)
+            assert [column.data for column in table.get_columns()] == \
+                [column.data for column in DataframeTable(df1, name='authors1').get_columns()]
+
+    def test_parquet_index_columns(self):
+        pytest.importorskip('pyarrow')
+        with tempfile.TemporaryDirectory() as directory:
+            # The default index of a filtered DataFrame is written as an __index_level_0__ column, and a RangeIndex
+            # only as metadata, neither of which is a column of the table
+            for df in (df1[df1.index % 2 == 0], df1):
+                path = os.path.join(directory, 'authors1.parquet')
+                df.to_parquet(path)
+                table = ParquetTable(path, chunk_size=4)
+                assert table.get_column_names() == list(df1.columns)
+                assert [column.name for column in table.get_columns()] == list(df1.columns)
+                assert list(table.get_df().columns) == list(df1.columns)
+
+    def test_reservoir_sampler(self):
+        sampler = ReservoirSampler(100, seed=1)
+        for start in range(0, 10000, 300):
+            sampler.add(np.arange(start, start + 300))
+        sample = sampler.get_sample()
+        assert sampler.seen == 10200 and not sampler.is_exact
+        assert len(sample) == 100 and len(set(sample)) == 100
+        # Uniform over the stream, not biased towards the first or the last values
+        assert 3000 < sample.mean() < 7000
+
+
+class TestSampling(unittest.TestCase):
+
+    def setUp(self):
+        self.column = DataframeTable(pd.DataFrame({'values': ['a', 'b', 'a', 'c', 'd', 'a', 'b', 'e']}),
+                                     name='table').get_columns()[0]
+
+    def test_reservoir(self):
+        sample = self.column.sample(3, SamplingStrategy.Reservoir, seed=1)
+        assert len(sample) == 3 and set(sample) <= set(self.column.data)
+        assert list(sample) == list(self.column.sample(3, SamplingStrategy.Reservoir, seed=1))
+        assert list(self.column.sample(100)) == self.column.data
+
+    def test_distinct(self):
+        sample = self.column.sample(2, SamplingStrategy.Distinct, seed=1)
+        assert len(set(sample)) == 2
+        # Every occurrence of the kept values is kept, and the same values are kept in every column
+        assert len(sample) == sum(self.column.data.count(value) for value in set(sample))
+        other = DataframeTable(pd.DataFrame({'values': ['e', 'd', 'c', 'b', 'a', 'f', 'g']}),
+                               name='other').get_columns()[0]
+        other_sample = set(other.sample(2, SamplingStrategy.Distinct, seed=1))
+        assert other_sample & set(self.column.data) <= set(sample)
+
+    def test_top_k_frequent(self):
+        assert list(self.column.sample(2, SamplingStrategy.TopKFrequent)) == ['a', 'b', 'a', 'a', 'b']
@@ -1,6 +1,12 @@
 import unittest
+from unittest import mock
+
+import nltk
+from nltk.tokenize.destructive import NLTKWordTokenizer
 
 from tests import d1_path
+from valentine.algorithms.cupid.linguistic_matching import normalization, split_tokens, tokenize_name
+from valentine.algorithms.cupid.schema_element import TokenTypes
 from valentine.data_sources.utils import get_encoding, get_delimiter, is_date
 from valentine.utils.utils import is_sorted, convert_data_type
 
@@ -30,3 +36,24 @@ class TestUtils(unittest.TestCase):
     def test_is_date(self):
         date_str = "2019-04-26 18:03:50.941332"
         assert is_date(date_str)
+
+    def test_tokenize_name(self):
+        tokens = tokenize_name("CitedBy_2019 of HTTPServer-id").get_tokens_data_and_type()
+        assert tokens == [("cited", TokenTypes.CONTENT), ("by", TokenTypes.COMMON_WORDS), ("2019", TokenTypes.NUMBER),
+                          ("of", TokenTypes.COMMON_WORDS), ("http", TokenTypes.CONTENT),
+                          ("server-id", TokenTypes.CONTENT)]
+
+    def test_tokenize_name_as_nltk(self):
+        # The names are tokenized like nltk.word_tokenize does, whose word tokenizer needs no NLTK data, so hyphens,
+        # periods and apostrophes inside a word are kept and the symbols, the clitics and a final period are split off
+        names = ["first-name", "addr.line", "o'brien", "O'Brien_id", "e-mail address", "addr.line_no", "v1.2.3",
+                 "first-name.", "no.", "users'", "customer's name", "don't", "'quoted'", "cannot", "a--b", "x...y",
+                 "price($)", "rock&roll", "col#1", "key:value", "time:12", "1,000", "a,b", '"q" name', "1e5", "1_000",
+                 "CitedBy_2019 of HTTPServer-id", "firstName-lastName.suffix"]
+        word_tokenizer = NLTKWordTokenizer()
+        for name in names:
+            assert split_tokens(name) == word_tokenizer.tokenize(name), name
+        with mock.patch.object(nltk, 'word_tokenize', word_tokenizer.tokenize):
+            for name in names:
+                assert tokenize_name(name).get_tokens_data_and_type() == \
+                    normalization(name).get_tokens_data_and_type(), name
@@ -1,10 +1,29 @@
+import subprocess
+import sys
 import unittest
+from unittest import mock
 
 from valentine.data_sources import DataframeTable
+from valentine.data_sources.dataframe import dataframe_column
 
-from valentine import valentine_match, valentine_match_batch, NotAValentineMatcher
+from valentine import valentine_match, valentine_match_batch, valentine_match_batch_iter, NotAValentineMatcher
 from tests import df1, df2
-from valentine.algorithms import JaccardDistanceMatcher
+from valentine.algorithms import BaseMatcher, JaccardDistanceMatcher
+
+
+class ProfileCountingMatcher(BaseMatcher):
+    """
+    A matcher that reads the profile of every column and scores each pair with the number of type inferences and
+    distinct value computations that this took
+    """
+
+    def get_matches(self, source_input, target_input):
+        with mock.patch.object(dataframe_column, 'infer_data_type', wraps=dataframe_column.infer_data_type) as infer, \
+                mock.patch.object(dataframe_column.pd, 'unique', wraps=dataframe_column.pd.unique) as unique:
+            for column in source_input.get_columns() + target_input.get_columns():
+                column.profile()
+        return {((source_input.name, 'profiled'), (target_input.name, 'profiled')): infer.call_count +
+                unique.call_count}
 
 
 class TestValentine(unittest.TestCase):
@@ -41,4 +60,38 @@ class TestValentine(unittest.TestCase):
 
     def test_batch_names(self):
         matches = valentine_match_batch([df1, df1], [df2, df2], JaccardDistanceMatcher(), ['ta1', 'tb1'], ['ta2', 'tb2'])
-        assert len(matches) > 0
\ No newline at end of file
+        assert len(matches) > 0
+
+    def test_batch_parallel(self):
+        matches = valentine_match_batch([df1, df1], [df2, df2], JaccardDistanceMatcher(), process_num=2)
+        serial_matches = valentine_match_batch([df1, df1], [df2, df2], JaccardDistanceMatcher())
+        assert matches == serial_matches
+        # Matchers with their own process pool run serially inside the daemonic batch workers
+        nested_matches = valentine_match_batch([df1, df1], [df2, df2], JaccardDistanceMatcher(process_num=2),
+                                               process_num=2)
+        assert nested_matches == serial_matches
+
+    def test_batch_parallel_profiling(self):
+        # The tables are profiled once in the calling process and the workers never profile them again
+        with mock.patch.object(dataframe_column, 'infer_data_type', wraps=dataframe_column.infer_data_type) as infer:
+            matches = valentine_match_batch([df1, df1], [df2, df2], ProfileCountingMatcher(), process_num=2)
+        assert infer.call_count == 2 * len(df1.columns) + 2 * len(df2.columns)
+        assert len(matches) == 4
+        assert all(profiling_calls == 0 for profiling_calls in matches.values())
+        # The serial path profiles each table once too, on first use
+        with mock.patch.object(dataframe_column, 'infer_data_type', wraps=dataframe_column.infer_data_type) as infer:
+            matches = valentine_match_batch([df1, df1], [df2, df2], ProfileCountingMatcher())
+        assert sum(matches.values()) > 0
+        assert infer.call_count == 2 * len(df1.columns) + 2 * len(df2.columns)
+
+    def test_batch_iter(self):
+        pair_matches = list(valentine_match_batch_iter([df1, df1], [df2], JaccardDistanceMatcher(), ['ta1', 'tb1']))
+        assert len(pair_matches) == 2
+        assert all(len(m) > 0 for m in pair_matches)
+
+    def test_lazy_imports(self):
+        # The dependencies of the matchers are only imported along with them
+        statement = ("import sys, valentine; from valentine.algorithms import JaccardDistanceMatcher; "
+                     "print(','.join(m for m in ('nltk', 'networkx', 'ot') if m in sys.modules))")
+        loaded = subprocess.run([sys.executable, '-c', statement], check=True, capture_output=True, text=True)
+        assert loaded.stdout.strip() == ''
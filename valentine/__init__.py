@@ -3,7 +3,9 @@ import pandas as pd
 import valentine.algorithms
 import valentine.data_sources
 
-from typing import Iterable, List, Union
+from itertools import product
+from multiprocessing import get_context
+from typing import Iterable, Iterator, List, Union
 from valentine.algorithms.matcher_results import MatcherResults
 
 
@@ -35,18 +37,95 @@ def valentine_match_batch(df_iter_1: Iterable[pd.DataFrame],
                           df_iter_2: Iterable[pd.DataFrame],
                           matcher: valentine.algorithms.BaseMatcher,
                           df_iter_1_names: Union[List[str], None] = None,
-                          df_iter_2_names: Union[List[str], None] = None):
-
-    validate_matcher(matcher)
+                          df_iter_2_names: Union[List[str], None] = None,
+                          process_num: int = 1):
 
     matches = {}
 
-    for df1_idx, df1 in enumerate(df_iter_1):
-        for df2_idx, df2 in enumerate(df_iter_2):
-            table_1_name = df_iter_1_names[df1_idx] if df_iter_1_names is not None else f'table_1_{df1_idx}'
-            table_2_name = df_iter_2_names[df2_idx] if df_iter_2_names is not None else f'table_2_{df2_idx}'
-            table_1 = valentine.data_sources.DataframeTable(df1, name=table_1_name)
-            table_2 = valentine.data_sources.DataframeTable(df2, name=table_2_name)
-            matches.update(matcher.get_matches(table_1, table_2))
+    for pair_matches in valentine_match_batch_iter(df_iter_1, df_iter_2, matcher,
+                                                   df_iter_1_names, df_iter_2_names, process_num):
+        matches.update(pair_matches)
 
     return MatcherResults(matches)
+
+
+def valentine_match_batch_iter(df_iter_1: Iterable[pd.DataFrame],
+                               df_iter_2: Iterable[pd.DataFrame],
+                               matcher: valentine.algorithms.BaseMatcher,
+                               df_iter_1_names: Union[List[str], None] = None,
+                               df_iter_2_names: Union[List[str], None] = None,
+                               process_num: int = 1) -> Iterator[MatcherResults]:
+    """
+    Match every DataFrame of df_iter_1 against every DataFrame of df_iter_2 and yield the MatcherResults of each
+    pair as soon as it is available.
+
+    Every DataFrame is wrapped in a table and profiled exactly once, no matter how many pairs it takes part in. On
+    the serial path (process_num == 1) the columns profile themselves lazily, so only what the matcher reads is
+    computed. With process_num > 1 the pairs are scheduled over a pool of spawned processes and the results are
+    yielded in completion order instead of input order. The tables are then profiled up front in the calling
+    process and sent to each worker once when it starts, with the profiles of their columns instead of a second
+    copy of the column data, and the tasks only carry the indices of the pair. Every worker still holds a copy of
+    all the tables, so the memory grows with process_num. Matchers that spawn processes of their own run serially
+    inside the workers.
+    """
+    validate_matcher(matcher)
+
+    # The workers of the parallel path get the tables already profiled, so that they never profile them again
+    profile = process_num != 1
+    tables_1 = _get_profiled_tables(df_iter_1, df_iter_1_names, 'table_1', profile)
+    tables_2 = _get_profiled_tables(df_iter_2, df_iter_2_names, 'table_2', profile)
+
+    return _iter_batch_matches(tables_1, tables_2, matcher, process_num)
+
+
+def _iter_batch_matches(tables_1: List[valentine.data_sources.DataframeTable],
+                        tables_2: List[valentine.data_sources.DataframeTable],
+                        matcher: valentine.algorithms.BaseMatcher,
+                        process_num: int) -> Iterator[MatcherResults]:
+    pairs = product(range(len(tables_1)), range(len(tables_2)))
+
+    if process_num == 1:
+        # Matchers that run several pairs at the same time on their own, like Coma with process_num > 1, get them all
+        table_pairs = ((tables_1[df1_idx], tables_2[df2_idx]) for df1_idx, df2_idx in pairs)
+        for pair_matches in matcher.get_matches_batch(table_pairs):
+            yield MatcherResults(pair_matches)
+    else:
+        with get_context("spawn").Pool(process_num,
+                                       initializer=_init_batch_worker,
+                                       initargs=(matcher, tables_1, tables_2)) as process_pool:
+            for pair_matches in process_pool.imap_unordered(_match_table_pair, pairs, chunksize=1):
+                yield MatcherResults(pair_matches)
+
+
+def _get_profiled_tables(df_iter: Iterable[pd.DataFrame],
+                         df_iter_names: Union[List[str], None],
+                         default_name_prefix: str,
+                         profile: bool = False) -> List[valentine.data_sources.DataframeTable]:
+    tables = []
+    for df_idx, df in enumerate(df_iter):
+        table_name = df_iter_names[df_idx] if df_iter_names is not None else f'{default_name_prefix}_{df_idx}'
+        table = valentine.data_sources.DataframeTable(df, name=table_name)
+        # Create the columns once, so that every pair the table takes part in shares their lazily computed profiles
+        for column in table.get_columns():
+            if profile:
+                column.profile()
+        tables.append(table)
+    return tables
+
+
+# The state of a batch worker process, sent once by the pool initializer
+_batch_worker_state = {}
+
+
+def _init_batch_worker(matcher: valentine.algorithms.BaseMatcher,
+                       tables_1: List[valentine.data_sources.DataframeTable],
+                       tables_2: List[valentine.data_sources.DataframeTable]):
+    _batch_worker_state['matcher'] = matcher
+    _batch_worker_state['tables_1'] = tables_1
+    _batch_worker_state['tables_2'] = tables_2
+
+
+def _match_table_pair(pair: tuple):
+    df1_idx, df2_idx = pair
+    return _batch_worker_state['matcher'].get_matches(_batch_worker_state['tables_1'][df1_idx],
+                                                      _batch_worker_state['tables_2'][df2_idx])
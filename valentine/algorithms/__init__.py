@@ -1,13 +1,21 @@
+from importlib import import_module
+
 from .base_matcher import BaseMatcher
-from .coma.coma import Coma
-from .cupid.cupid_model import Cupid
-from .distribution_based.distribution_based import DistributionBased
-from .jaccard_distance.jaccard_distance import JaccardDistanceMatcher
-from .similarity_flooding.similarity_flooding import SimilarityFlooding
-
-schema_only_algorithms = [SimilarityFlooding.__name__, Cupid.__name__]
-instance_only_algorithms = [DistributionBased.__name__, JaccardDistanceMatcher.__name__]
-schema_instance_algorithms = [Coma.__name__]
+
+# The matchers are imported on first access, so that importing valentine (and every spawned worker process) only
+# loads the dependencies of the matchers that are actually used, e.g. NLTK for Cupid or POT for
+# DistributionBased
+_matcher_modules = {
+    "Coma": ".coma.coma",
+    "Cupid": ".cupid.cupid_model",
+    "DistributionBased": ".distribution_based.distribution_based",
+    "JaccardDistanceMatcher": ".jaccard_distance.jaccard_distance",
+    "SimilarityFlooding": ".similarity_flooding.similarity_flooding",
+}
+
+schema_only_algorithms = ["SimilarityFlooding", "Cupid"]
+instance_only_algorithms = ["DistributionBased", "JaccardDistanceMatcher"]
+schema_instance_algorithms = ["Coma"]
 all_matchers = schema_only_algorithms + instance_only_algorithms + schema_instance_algorithms
 
 __all__ = [
@@ -22,3 +30,15 @@ __all__ = [
     "SimilarityFlooding",
     "BaseMatcher"
 ]
+
+
+def __getattr__(name: str):
+    if name in _matcher_modules:
+        matcher = getattr(import_module(_matcher_modules[name], __name__), name)
+        globals()[name] = matcher
+        return matcher
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
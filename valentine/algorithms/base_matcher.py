@@ -1,10 +1,30 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Tuple
+from multiprocessing import current_process, get_context
+from multiprocessing.pool import Pool
+from typing import Dict, Iterable, Iterator, Tuple
 
 from ..data_sources.base_table import BaseTable
 
 
 class BaseMatcher(ABC):
+    """
+    Abstract class representing a matcher
+
+    Matchers that run on multiple processes get their process pool from `_get_process_pool`. The pool is created on
+    first use and reused by every following `get_matches` call, so that the spawned workers only pay the cost of
+    starting up and importing their dependencies once. It is shut down by `close`, either explicitly or by using the
+    matcher as a context manager:
+
+        with JaccardDistanceMatcher(process_num=4) as matcher:
+            for df1, df2 in pairs:
+                valentine_match(df1, df2, matcher)
+
+    Matchers decide between their serial and their parallel path with `_get_process_num`, since the daemonic
+    worker processes of a pool, e.g. the ones of `valentine_match_batch` with process_num > 1, cannot have children.
+    """
+
+    __process_pool = None
+    __process_pool_size = 0
 
     @abstractmethod
     def get_matches(self, source_input: BaseTable, target_input: BaseTable) -> Dict[Tuple[Tuple[str, str],
@@ -15,3 +35,57 @@ class BaseMatcher(ABC):
         :returns List of matches
         """
         raise NotImplementedError
+
+    def get_matches_batch(self,
+                          table_pairs: Iterable[Tuple[BaseTable, BaseTable]]
+                          ) -> Iterator[Dict[Tuple[Tuple[str, str], Tuple[str, str]], float]]:
+        """
+        Get the column matches of every (source, target) pair of tables, in the order of the pairs. Matchers that can
+        work on several pairs at the same time override it.
+        :returns An iterator over the matches of each pair
+        """
+        for source_input, target_input in table_pairs:
+            yield self.get_matches(source_input, target_input)
+
+    def close(self):
+        """
+        Shut down the process pool of the matcher, if it has one. A new pool is created if the matcher is used again.
+        """
+        if self.__process_pool is not None:
+            self.__process_pool.terminate()
+            self.__process_pool.join()
+            self.__process_pool = None
+            self.__process_pool_size = 0
+
+    @staticmethod
+    def _get_process_num(process_num: int) -> int:
+        """
+        The number of processes that a matcher configured with process_num can use, 1 inside a daemonic process
+        """
+        return 1 if current_process().daemon else max(int(process_num), 1)
+
+    def _get_process_pool(self, process_num: int) -> Pool:
+        """
+        Get the long-lived process pool of the matcher, creating it with process_num spawned workers if needed
+        """
+        if self.__process_pool is None or self.__process_pool_size != process_num:
+            self.close()
+            self.__process_pool = get_context("spawn").Pool(process_num)
+            self.__process_pool_size = process_num
+        return self.__process_pool
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def __getstate__(self):
+        # The matcher is pickled when its methods are sent to the workers, which cannot share the pool
+        state = self.__dict__.copy()
+        state.pop('_BaseMatcher__process_pool', None)
+        state.pop('_BaseMatcher__process_pool_size', None)
+        return state
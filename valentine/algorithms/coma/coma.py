@@ -1,17 +1,19 @@
+import queue
+import shutil
 import subprocess
 import os
 import tempfile
 import time
-from typing import AnyStr, Dict, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AnyStr, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import pandas as pd
+
+from .coma_server import ComaServer, JavaException, get_jar_path, split_java_xmx
 from ..base_matcher import BaseMatcher
 from ..match import Match
 from ...data_sources.base_table import BaseTable
-from ...utils.utils import get_project_root
-
-
-class JavaException(Exception):
-    pass
 
 
 class Coma(BaseMatcher):
@@ -19,38 +21,127 @@ class Coma(BaseMatcher):
     def __init__(self,
                  max_n: int = 0,
                  use_instances: bool = False,
-                 java_xmx: str = "1024m"):
+                 java_xmx: str = "1024m",
+                 server_mode: bool = False,
+                 sample_size: Optional[int] = None,
+                 sampling_seed: Optional[int] = 0,
+                 process_num: int = 1):
         self.__max_n = int(max_n)
         self.__strategy = "COMA_OPT_INST" if use_instances else "COMA_OPT"
         self.__java_XmX = java_xmx
+        # Up to process_num JVMs run at the same time, each with an even share of java_xmx
+        self.__process_num = max(int(process_num), 1)
+        self.__worker_xmx = split_java_xmx(java_xmx, self.__process_num)
+        # The number of rows of every table that COMA gets with the instance strategy, None (the default) for all
+        self.__sample_size = sample_size
+        self.__sampling_seed = sampling_seed
+        # With server_mode, the matches are computed by a long-lived JVM that is reused by every call until `close`
+        self.__server_mode = server_mode
+        self.__servers: Optional[List[ComaServer]] = None
+        self.__idle_servers: Optional[queue.Queue] = None
 
     def get_matches(self,
                     source_input: BaseTable,
                     target_input: BaseTable
                     ) -> Dict[Tuple[Tuple[str, str], Tuple[str, str]], float]:
 
-        with tempfile.TemporaryDirectory() as tmp_folder_path:
+        # Every job has a directory of its own for its input and output files, which are deleted when it is over
+        tmp_folder_path = tempfile.mkdtemp()
+        try:
             s_f_name, t_f_name = self.__write_schema_csv_files(source_input, target_input, tmp_folder_path)
             dataset_name: str = f'{source_input.name}____{target_input.name}{self.__max_n}{self.__strategy}.txt'
             coma_output_file: str = os.path.join(tmp_folder_path, dataset_name)
-            self.__run_coma_jar(s_f_name, t_f_name, coma_output_file, tmp_folder_path)
-            raw_output = self.__read_coma_output(s_f_name, t_f_name, coma_output_file, tmp_folder_path)
+            if self.__server_mode:
+                raw_output = self.__run_coma_server(s_f_name, t_f_name, coma_output_file)
+            else:
+                self.__run_coma_jar(s_f_name, t_f_name, coma_output_file, tmp_folder_path)
+                raw_output = self.__read_coma_output(s_f_name, t_f_name, coma_output_file, tmp_folder_path)
             matches = self.__process_coma_output(raw_output, target_input, source_input)
+        finally:
+            # A JVM that was killed may still hold a file open for a moment, which must not fail the match
+            shutil.rmtree(tmp_folder_path, ignore_errors=True)
 
         return matches
 
+    def get_matches_batch(self,
+                          table_pairs: Iterable[Tuple[BaseTable, BaseTable]]
+                          ) -> Iterator[Dict[Tuple[Tuple[str, str], Tuple[str, str]], float]]:
+        """
+        Match every (source, target) pair of tables, running up to process_num COMA jobs at the same time. The
+        pairs are taken from the iterable as the jobs complete, with at most 2 * process_num of them submitted and
+        not yet yielded, and the matches of the pairs are yielded in the order of the pairs.
+        """
+        if self.__process_num == 1:
+            yield from super().get_matches_batch(table_pairs)
+            return
+        if self.__server_mode:
+            # The servers are created before the threads share them
+            self.__get_idle_servers()
+        # At most two jobs per worker are pending at a time, so that a large batch is not queued up front
+        max_pending = 2 * self.__process_num
+        with ThreadPoolExecutor(self.__process_num) as executor:
+            pending = deque()
+            for source_input, target_input in table_pairs:
+                if len(pending) == max_pending:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(self.get_matches, source_input, target_input))
+            while pending:
+                yield pending.popleft().result()
+
+    def close(self):
+        """
+        Stop the COMA servers of the matcher, if it has any, along with its process pool
+        """
+        if getattr(self, '_Coma__servers', None) is not None:
+            for server in self.__servers:
+                server.close()
+            self.__servers = None
+            self.__idle_servers = None
+        super().close()
+
+    def __getstate__(self):
+        # Every process that the matcher is sent to starts its own servers
+        state = super().__getstate__()
+        state['_Coma__servers'] = None
+        state['_Coma__idle_servers'] = None
+        return state
+
+    def __get_idle_servers(self) -> queue.Queue:
+        if self.__idle_servers is None:
+            # A server only starts its JVM on its first job
+            self.__servers = [ComaServer(self.__worker_xmx) for _ in range(self.__process_num)]
+            self.__idle_servers = queue.Queue()
+            for server in self.__servers:
+                self.__idle_servers.put(server)
+        return self.__idle_servers
+
+    def __run_coma_server(self,
+                          source_table_f_name: str,
+                          target_table_f_name: str,
+                          coma_output_path: str
+                          ) -> List[str]:
+        idle_servers = self.__get_idle_servers()
+        server = idle_servers.get()
+        try:
+            matches = [x.strip() for x in server.match(source_table_f_name, target_table_f_name, coma_output_path,
+                                                       self.__max_n, self.__strategy)]
+        finally:
+            idle_servers.put(server)
+        # The last line of the output is not a match, as with the output file of a one-off run
+        return matches[:-1]
+
     def __run_coma_jar(self,
                        source_table_f_name: str,
                        target_table_f_name: str,
                        coma_output_path: str,
                        tmp_folder_path: str
                        ) -> None:
-        jar_path = os.path.join(get_project_root(), 'algorithms', 'coma', 'artifact', 'coma.jar')
+        jar_path = get_jar_path()
         source_data = os.path.join(tmp_folder_path, source_table_f_name)
         target_data = os.path.join(tmp_folder_path, target_table_f_name)
         coma_output_path = os.path.join(tmp_folder_path, coma_output_path)
         try:
-            subprocess.check_output(['java', f'-Xmx{self.__java_XmX}',
+            subprocess.check_output(['java', f'-Xmx{self.__worker_xmx}',
                                      '-cp', jar_path,
                                      '-DinputFile1=' + source_data,
                                      '-DinputFile2=' + target_data,
@@ -114,12 +205,19 @@ class Coma(BaseMatcher):
         else:
             return matches
 
-    @staticmethod
-    def __write_csv_file(table: BaseTable,
+    def __write_csv_file(self,
+                         table: BaseTable,
                          tmp_folder_path: str
                          ) -> str:
         f_name: AnyStr = os.path.join(tmp_folder_path, table.name + ".csv")
-        table.get_df().to_csv(f_name, index=False)
+        if self.__strategy == "COMA_OPT":
+            # The schema strategy only reads the column names
+            df = pd.DataFrame(columns=table.get_column_names())
+        elif self.__sample_size is None:
+            df = table.get_df()
+        else:
+            df = table.get_row_sample(self.__sample_size, self.__sampling_seed)
+        df.to_csv(f_name, index=False)
         return f_name
 
     @staticmethod
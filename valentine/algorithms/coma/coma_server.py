@@ -0,0 +1,199 @@
+import os
+import re
+import subprocess
+import threading
+from typing import List, Optional
+
+from ...utils.utils import get_project_root
+
+END_OF_RESULT = "<<END_OF_RESULT>>"
+ERROR = "<<ERROR>>"
+
+JAVA_MEMORY_UNITS = {'': 1, 'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30, 't': 1 << 40}
+
+
+class JavaException(Exception):
+    pass
+
+
+def get_jar_path() -> str:
+    return os.path.join(get_project_root(), 'algorithms', 'coma', 'artifact', 'coma.jar')
+
+
+def split_java_xmx(java_xmx: str,
+                   workers: int) -> str:
+    """
+    The maximum heap size of each of a number of JVMs that share the memory of java_xmx evenly
+
+    Parameters
+    ----------
+    java_xmx : str
+        The memory of all the JVMs, in the format of the -Xmx option of Java, e.g. "1024m" or "4g"
+    workers : int
+        The number of JVMs
+
+    Returns
+    -------
+    str
+        The -Xmx of each JVM, java_xmx itself for a single JVM and in megabytes otherwise
+
+    Raises
+    ------
+    ValueError
+        If java_xmx is not a valid memory size or its share is less than a megabyte
+    """
+    size = re.fullmatch(r'(\d+)([kmgt]?)', java_xmx.strip().lower())
+    if size is None:
+        raise ValueError(f"Invalid java_xmx: {java_xmx!r}, expected e.g. '1024m' or '4g'")
+    if workers <= 1:
+        return java_xmx
+    worker_megabytes = int(size.group(1)) * JAVA_MEMORY_UNITS[size.group(2)] // workers >> 20
+    if worker_megabytes == 0:
+        raise ValueError(f"A java_xmx of {java_xmx} leaves less than a megabyte to each of {workers} JVMs")
+    return f"{worker_megabytes}m"
+
+
+def get_server_command(java_xmx: str) -> List[str]:
+    """
+    The command that starts a COMA server. The ComaServer class is used if it has been compiled next to its source,
+    otherwise the source is launched directly, which needs a Java 11+ JDK.
+    """
+    server_dir = os.path.join(get_project_root(), 'algorithms', 'coma', 'server')
+    if os.path.isfile(os.path.join(server_dir, 'ComaServer.class')):
+        return ['java', f'-Xmx{java_xmx}', '-cp', os.pathsep.join([get_jar_path(), server_dir]), 'ComaServer']
+    return ['java', f'-Xmx{java_xmx}', '-cp', get_jar_path(), os.path.join(server_dir, 'ComaServer.java')]
+
+
+class ComaServer(object):
+    """
+    A long-lived JVM running COMA, which takes match jobs on its stdin and streams their results back on its stdout,
+    so that the start-up of the JVM and the loading of COMA are paid once instead of once per table pair.
+
+    The JVM is started on the first job and restarted if it dies. The jobs of a server run one at a time. If COMA
+    ends the JVM with System.exit(0) after writing its result, which the server cannot prevent on Java 18+, the
+    result is read from the output file and the next job starts a new JVM.
+
+    Methods
+    -------
+    match(source_file, target_file, output_file, max_n, strategy)
+        Match two CSV files and return the lines of the COMA result
+
+    close()
+        Stop the JVM
+    """
+
+    def __init__(self,
+                 java_xmx: str = "1024m"):
+        """
+        Parameters
+        ----------
+        java_xmx : str, optional
+            The maximum heap size of the JVM (default is "1024m")
+        """
+        self.java_xmx = java_xmx
+        self.__process: Optional[subprocess.Popen] = None
+        self.__lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self.__process is not None and self.__process.poll() is None
+
+    def match(self,
+              source_file: str,
+              target_file: str,
+              output_file: str,
+              max_n: int,
+              strategy: str) -> List[str]:
+        """
+        Run a COMA job on the server
+
+        Parameters
+        ----------
+        source_file : str
+            The path of the CSV file of the source table
+        target_file : str
+            The path of the CSV file of the target table
+        output_file : str
+            The path where COMA writes its result, which is deleted once the job is over, whether it succeeded or not
+        max_n : int
+            The maxN parameter of COMA
+        strategy : str
+            The COMA strategy, COMA_OPT or COMA_OPT_INST
+
+        Returns
+        -------
+        list
+            The lines of the result
+
+        Raises
+        ------
+        JavaException
+            If the JVM cannot be started, dies during the job or the job fails
+        """
+        fields = [source_file, target_file, output_file, str(max_n), strategy]
+        if any('\t' in field or '\n' in field for field in fields):
+            raise ValueError("The paths of a COMA job cannot contain tabs or newlines")
+        with self.__lock:
+            try:
+                return self.__run_job(fields, output_file)
+            finally:
+                # The server deletes the output file itself, unless the job failed before it could
+                if os.path.isfile(output_file):
+                    os.remove(output_file)
+
+    def close(self):
+        with self.__lock:
+            self.__stop()
+
+    def __run_job(self,
+                  fields: List[str],
+                  output_file: str) -> List[str]:
+        process = self.__get_process()
+        try:
+            process.stdin.write('\t'.join(fields) + '\n')
+            process.stdin.flush()
+            lines = []
+            for line in iter(process.stdout.readline, ''):
+                line = line.rstrip('\r\n')
+                if line == END_OF_RESULT:
+                    return lines
+                if line.startswith(ERROR):
+                    raise JavaException(f"COMA failed: {line[len(ERROR):].strip()}")
+                lines.append(line)
+        except (BrokenPipeError, OSError):
+            pass
+        self.__stop()
+        if process.returncode == 0 and os.path.isfile(output_file):
+            # COMA ended the JVM with System.exit(0) after writing its result, on a JDK that cannot trap the exit
+            with open(output_file, encoding='utf-8') as f:
+                return f.read().splitlines()
+        raise JavaException("The COMA server stopped unexpectedly. Either it could not be started, as it needs "
+                            "a Java 11+ JDK unless ComaServer.class has been compiled next to its source, or Java "
+                            "does not have enough memory to operate. Try raising the java_xmx parameter of the "
+                            "Coma class")
+
+    def __get_process(self) -> subprocess.Popen:
+        if not self.is_running:
+            try:
+                self.__process = subprocess.Popen(get_server_command(self.java_xmx),
+                                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                                  stderr=subprocess.DEVNULL, text=True, encoding='utf-8')
+            except OSError:
+                raise JavaException("Java is not installed. The COMA server needs a Java 11+ JDK, unless "
+                                    "ComaServer.class has been compiled next to its source")
+        return self.__process
+
+    def __stop(self):
+        if self.__process is None:
+            return
+        try:
+            # Closing stdin lets the server exit on its own
+            self.__process.stdin.close()
+            self.__process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.__process.kill()
+            self.__process.wait()
+        self.__process = None
+
+    def __del__(self):
+        self.__stop()
@@ -0,0 +1,121 @@
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.io.PrintStream;
+import java.io.PrintWriter;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.security.Permission;
+import java.util.List;
+
+/**
+ * A long-lived COMA worker that keeps the JVM (and COMA's classes) warm across match jobs.
+ *
+ * Every line read from stdin is a job of tab separated fields:
+ *
+ *     inputFile1 \t inputFile2 \t outputFile \t maxN \t strategy
+ *
+ * The job runs the Main class of coma.jar with the same system properties as a one-off `java ... Main` call. The
+ * lines of the result are then written to stdout, followed by a line with END_OF_RESULT, or a single line starting
+ * with ERROR if the job failed. Anything that COMA prints itself goes to stderr, so that stdout only carries the
+ * protocol. The server exits when stdin is closed.
+ *
+ * A call of System.exit by COMA is trapped with a SecurityManager where the JDK still allows one (up to Java 17), an
+ * exit status of 0 counting as the end of the job. On newer JDKs the exit ends the server after COMA has written its
+ * result, which the Python side then reads from the output file before it starts a new server.
+ */
+public class ComaServer {
+
+    static final String END_OF_RESULT = "<<END_OF_RESULT>>";
+    static final String ERROR = "<<ERROR>>";
+
+    static class ExitTrappedException extends SecurityException {
+        final int status;
+
+        ExitTrappedException(int status) {
+            super("COMA called System.exit(" + status + ")");
+            this.status = status;
+        }
+    }
+
+    static class ExitTrap extends SecurityManager {
+        @Override
+        public void checkExit(int status) {
+            throw new ExitTrappedException(status);
+        }
+
+        @Override
+        public void checkPermission(Permission permission) {
+        }
+
+        @Override
+        public void checkPermission(Permission permission, Object context) {
+        }
+    }
+
+    @SuppressWarnings("removal")
+    static void trapExits() {
+        try {
+            System.setSecurityManager(new ExitTrap());
+        } catch (UnsupportedOperationException | SecurityException e) {
+            // Java 18+ does not allow a SecurityManager to be set at runtime
+        }
+    }
+
+    public static void main(String[] args) throws Exception {
+        PrintWriter protocol = new PrintWriter(new OutputStreamWriter(System.out, StandardCharsets.UTF_8), false);
+        System.setOut(new PrintStream(System.err, true));
+        Method comaMain = Class.forName("Main").getMethod("main", String[].class);
+        trapExits();
+
+        BufferedReader jobs = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        String job;
+        while ((job = jobs.readLine()) != null) {
+            if (job.isEmpty()) {
+                continue;
+            }
+            try {
+                for (String line : runJob(comaMain, job.split("\t", -1))) {
+                    protocol.println(line);
+                }
+                protocol.println(END_OF_RESULT);
+            } catch (Exception | OutOfMemoryError e) {
+                Throwable cause = e instanceof InvocationTargetException ? e.getCause() : e;
+                protocol.println(ERROR + " " + String.valueOf(cause).replace('\n', ' '));
+            }
+            protocol.flush();
+        }
+    }
+
+    static List<String> runJob(Method comaMain, String[] fields) throws Exception {
+        if (fields.length != 5) {
+            throw new IllegalArgumentException("Expected 5 tab separated fields, got " + fields.length);
+        }
+        File outputFile = new File(fields[2]);
+        System.setProperty("inputFile1", fields[0]);
+        System.setProperty("inputFile2", fields[1]);
+        System.setProperty("outputFile", fields[2]);
+        System.setProperty("maxN", fields[3]);
+        System.setProperty("strategy", fields[4]);
+        try {
+            try {
+                comaMain.invoke(null, (Object) new String[0]);
+            } catch (InvocationTargetException e) {
+                if (!(e.getCause() instanceof ExitTrappedException)
+                        || ((ExitTrappedException) e.getCause()).status != 0) {
+                    throw e;
+                }
+            }
+            if (!outputFile.exists()) {
+                throw new IOException("COMA did not write a result");
+            }
+            return Files.readAllLines(outputFile.toPath(), StandardCharsets.UTF_8);
+        } finally {
+            outputFile.delete();
+        }
+    }
+}
@@ -38,9 +38,11 @@ class Cupid(BaseMatcher):
         self.__add_data("DB__"+target_input.name, target_input)
         source_tree = self.__get_schema_by_name("DB__"+source_input.name)
         target_tree = self.__get_schema_by_name("DB__"+target_input.name)
+        parallelism = self._get_process_num(self.__parallelism)
+        process_pool = self._get_process_pool(parallelism) if parallelism > 1 else None
         sims = tree_match(source_tree, target_tree, self.__categories, self.__leaf_w_struct, self.__w_struct,
                           self.__th_accept, self.__th_high, self.__th_low, self.__c_inc, self.__c_dec,
-                          self.__th_ns, self.__parallelism)
+                          self.__th_ns, process_pool)
         new_sims = recompute_wsim(source_tree, target_tree, sims)
         matches = mapping_generation_leaves(source_tree, target_tree, new_sims, self.__th_accept)
         return matches
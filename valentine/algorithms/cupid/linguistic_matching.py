@@ -2,34 +2,155 @@ import math
 import re
 import operator
 import string
+from functools import lru_cache
 from itertools import product, repeat, combinations_with_replacement
-from multiprocessing import get_context
-import nltk
+import numpy as np
 from anytree import LevelOrderIter
-from nltk.corpus import stopwords
-from nltk.corpus import wordnet as wn
 from jellyfish import levenshtein_distance
 
 from . import DATATYPE_COMPATIBILITY_TABLE
 from .schema_element import SchemaElement, Token, TokenTypes
+from .stopwords import ENGLISH_STOPWORDS
 from ...utils.utils import normalize_distance
 
+# The token similarities are memoized per process, so the WordNet lookups of a token pair are done once across all the
+# element pairs and get_matches calls that compare it. The caches are bounded to keep the memory of long runs in check.
+SYNSET_CACHE_SIZE = 1 << 14
+SIMILARITY_CACHE_SIZE = 1 << 18
+
+
+# The rules of NLTK's word tokenizer (NLTKWordTokenizer, which nltk.word_tokenize applies to every sentence) in their
+# order, compiled once: each one pads the symbols it splits off with spaces and the result is split on whitespace. The
+# names are not split into sentences first, since a schema name is a single sentence.
+WORD_TOKENIZER_RULES = [(re.compile(pattern, flags), replacement) for pattern, replacement, flags in [
+    # Starting quotes
+    (r"([\u00ab\u201c\u2018\u201e]|[`]+)", r" \1 ", 0),
+    (r'^"', r"``", 0),
+    (r"(``)", r" \1 ", 0),
+    (r"([ (\[{<])(\"|'{2})", r"\1 `` ", 0),
+    (r"(')(?!re|ve|ll|m|t|s|d|n)(\w)\b", r"\1 \2", re.IGNORECASE),
+    # Punctuation, a final period is split off but the periods inside a name are kept
+    (r"([^.])(\.)([\])}>\"'\u00bb\u201d\u2019 ]*)\s*$", r"\1 \2 \3 ", 0),
+    (r"([:,])([^\d])", r" \1 \2", 0),
+    (r"([:,])$", r" \1 ", 0),
+    (r"\.{2,}", r" \g<0> ", 0),
+    (r"[;@#$%&]", r" \g<0> ", 0),
+    (r"([^.])(\.)([\])}>\"']*)\s*$", r"\1 \2\3 ", 0),
+    (r"[?!]", r" \g<0> ", 0),
+    (r"([^'])' ", r"\1 ' ", 0),
+    (r"[*]", r" \g<0> ", 0),
+    # Parentheses and brackets, double dashes
+    (r"[\]\[(){}<>]", r" \g<0> ", 0),
+    (r"--", r" -- ", 0),
+]]
+# The rules that need a space on either side of the name, for the ending quotes and the clitics
+WORD_TOKENIZER_PADDED_RULES = [(re.compile(pattern, flags), replacement) for pattern, replacement, flags in [
+    # Ending quotes and clitics, e.g. customer's or don't
+    (r"([\u00bb\u201d\u2019])", r" \1 ", 0),
+    (r"''", " '' ", 0),
+    (r'"', " '' ", 0),
+    (r"\s+", " ", 0),
+    (r"([^' ])('[sS]|'[mM]|'[dD]|') ", r"\1 \2 ", 0),
+    (r"([^' ])('ll|'LL|'re|'RE|'ve|'VE|n't|N'T) ", r"\1 \2 ", 0),
+    # Contractions that are split in two, e.g. cannot
+    (r"\b(can)(not)\b", r" \1 \2 ", re.IGNORECASE),
+    (r"\b(d)('ye)\b", r" \1 \2 ", re.IGNORECASE),
+    (r"\b(gim)(me)\b", r" \1 \2 ", re.IGNORECASE),
+    (r"\b(gon)(na)\b", r" \1 \2 ", re.IGNORECASE),
+    (r"\b(got)(ta)\b", r" \1 \2 ", re.IGNORECASE),
+    (r"\b(lem)(me)\b", r" \1 \2 ", re.IGNORECASE),
+    (r"\b(more)('n)\b", r" \1 \2 ", re.IGNORECASE),
+    (r"\b(wan)(na)(?=\s)", r" \1 \2 ", re.IGNORECASE),
+    (r" ('t)(is)\b", r" \1 \2 ", re.IGNORECASE),
+    (r" ('t)(was)\b", r" \1 \2 ", re.IGNORECASE),
+]]
+# The word boundaries of camelCase and PascalCase, as in snakecase_convert
+CAMEL_CASE_PATTERN_1 = re.compile('(.)([A-Z][a-z]+)')
+CAMEL_CASE_PATTERN_2 = re.compile('([a-z0-9])([A-Z])')
+
+
 def snakecase_convert(name):
-    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+    s1 = CAMEL_CASE_PATTERN_1.sub(r'\1_\2', name)
+    return CAMEL_CASE_PATTERN_2.sub(r'\1_\2', s1).lower()
+
+
+def split_tokens(name) -> list:
+    """
+    Split a name into tokens like nltk.word_tokenize, with the compiled rules of its word tokenizer: the symbols,
+    clitics and a final period are split off, while hyphens, apostrophes and periods inside a word are kept, e.g.
+    first-name, o'brien and addr.line are single tokens
+    """
+    for rule, replacement in WORD_TOKENIZER_RULES:
+        name = rule.sub(replacement, name)
+    name = f" {name} "
+    for rule, replacement in WORD_TOKENIZER_PADDED_RULES:
+        name = rule.sub(replacement, name)
+    return name.split()
+
+
+def tokenize_name(element,
+                  schema_element=None):
+    """
+    Normalize a schema name into the tokens of a SchemaElement without NLTK. It gives the same tokens as
+    normalization: the name is split with split_tokens, the symbols and the numbers are kept as they are and the
+    other tokens are split further on their underscores and camelCase boundaries and lowercased, with the stopwords
+    looked up in a frozenset.
+
+    Parameters
+    ----------
+    element : str
+        The name
+    schema_element : SchemaElement, optional
+        The element to add the tokens to, a new one by default
+
+    Returns
+    -------
+    SchemaElement
+        The element with the tokens of the name
+    """
+    if schema_element is None:
+        schema_element = SchemaElement(element)
+    for token in split_tokens(element):
+        if token in string.punctuation:
+            schema_element.add_token(make_token(token, TokenTypes.SYMBOLS, ignore=True))
+        elif is_number(token):
+            schema_element.add_token(make_token(token, TokenTypes.NUMBER))
+        else:
+            token_snake = snakecase_convert(token)
+            if '_' in token_snake:
+                tokenize_name(token_snake.replace('_', ' '), schema_element)
+            elif token_snake in ENGLISH_STOPWORDS:
+                schema_element.add_token(make_token(token_snake, TokenTypes.COMMON_WORDS, ignore=True))
+            else:
+                schema_element.add_token(make_token(token_snake, TokenTypes.CONTENT))
+    return schema_element
+
+
+def is_number(token) -> bool:
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def make_token(data, token_type, ignore=False) -> Token:
+    token = Token().add_data(data)
+    token.token_type = token_type
+    token.ignore = ignore
+    return token
 
 
 def normalization(element,
                   schema_element=None):
+    import nltk
+
     if schema_element is None:
         schema_element = SchemaElement(element)
     try:
         tokens = nltk.word_tokenize(element)
     except LookupError:
-        nltk.download('punkt_tab')
-        nltk.download('omw-1.4')
-        nltk.download('stopwords')
-        nltk.download('wordnet')
+        download_nltk_data()
         tokens = nltk.word_tokenize(element)
 
     for token in tokens:
@@ -52,7 +173,7 @@ def normalization(element,
                 if '_' in token_snake:
                     token_snake = token_snake.replace('_', ' ')
                     schema_element = normalization(token_snake, schema_element)
-                elif token.lower() in stopwords.words('english'):
+                elif token.lower() in ENGLISH_STOPWORDS:
                     token_obj.data = token.lower()
                     token_obj.ignore = True
                     token_obj.token_type = TokenTypes.COMMON_WORDS
@@ -87,10 +208,10 @@ def compute_compatibility(categories):
             compatibility_table[cat1][cat2] = DATATYPE_COMPATIBILITY_TABLE[cat1][cat2]
             compatibility_table[cat2][cat1] = DATATYPE_COMPATIBILITY_TABLE[cat1][cat2]
         else:
-            tokens1 = [Token().add_data(t) for t in nltk.word_tokenize(cat1) if t.isalnum()]
+            tokens1 = [Token().add_data(t) for t in split_tokens(cat1) if t.isalnum()]
             for token in tokens1:
                 token.token_type = add_token_type(token)
-            tokens2 = [Token().add_data(t) for t in nltk.word_tokenize(cat2) if t.isalnum()]
+            tokens2 = [Token().add_data(t) for t in split_tokens(cat2) if t.isalnum()]
             for token in tokens2:
                 token.token_type = add_token_type(token)
             compatibility = data_type_similarity(tokens1, tokens2)
@@ -103,16 +224,71 @@ def comparison(source_tree,
                target_tree,
                compatibility_table,
                th_ns,
-               parallelism):
+               process_pool=None):
+    # The similarities of the distinct tokens of the two schemata are computed once, every element pair only reduces
+    # the rows and columns of its tokens
+    vocabulary = VocabularySimilarity(get_vocabulary(source_tree), get_vocabulary(target_tree), process_pool)
     elements_to_compare = generate_parallel_l_sim_input(source_tree, target_tree, compatibility_table, th_ns)
-    if parallelism == 1:
-        l_sim = {k: v for k, v in [l_sim_proc(pair, compatibility_table) for pair in elements_to_compare]}
-    else:
-        with get_context("spawn").Pool(parallelism) as process_pool:
-            l_sim = dict(process_pool.starmap(l_sim_proc, zip(list(elements_to_compare), repeat(compatibility_table))))
+    l_sim = {k: v for k, v in [l_sim_proc(pair, compatibility_table, vocabulary) for pair in elements_to_compare]}
     return l_sim
 
 
+def get_vocabulary(schema_tree) -> list:
+    """
+    The distinct tokens of the names of all the nodes of a schema tree, in order of appearance
+    """
+    return list(dict.fromkeys(token.data for node in LevelOrderIter(schema_tree.root) for token in node.tokens
+                              if token.token_type != TokenTypes.SYMBOLS))
+
+
+class VocabularySimilarity(object):
+    """
+    The similarities between the tokens of a source and a target vocabulary: 1 for equal tokens, else their WordNet
+    similarity or their Levenshtein similarity for the tokens that WordNet does not know. The matrices are computed
+    once per vocabulary pair, so the name similarity of every element pair is a max/sum reduction over them.
+    """
+
+    def __init__(self,
+                 source_vocabulary: list,
+                 target_vocabulary: list,
+                 process_pool=None):
+        self.source_index = {token: i for i, token in enumerate(source_vocabulary)}
+        self.target_index = {token: i for i, token in enumerate(target_vocabulary)}
+        if process_pool is None:
+            forward = [compute_similarity_row(token, target_vocabulary) for token in source_vocabulary]
+            backward = [compute_similarity_row(token, source_vocabulary) for token in target_vocabulary]
+        else:
+            forward = process_pool.starmap(compute_similarity_row, zip(source_vocabulary, repeat(target_vocabulary)))
+            backward = process_pool.starmap(compute_similarity_row, zip(target_vocabulary, repeat(source_vocabulary)))
+        # The similarity of every source token to every target token and the other way around
+        self.forward = np.array(forward, dtype=np.float64).reshape(len(source_vocabulary), len(target_vocabulary))
+        self.backward = np.array(backward, dtype=np.float64).reshape(len(target_vocabulary), len(source_vocabulary))
+
+    def name_similarity_tokens(self,
+                               source_tokens,
+                               target_tokens):
+        source = [self.source_index[t.data] for t in source_tokens]
+        target = [self.target_index[t.data] for t in target_tokens]
+        sum1 = self.forward[np.ix_(source, target)].max(axis=1).sum()
+        sum2 = self.backward[np.ix_(target, source)].max(axis=1).sum()
+        return float((sum1 + sum2) / (len(source) + len(target)))
+
+
+def compute_similarity_row(token,
+                           vocabulary):
+    return [compute_similarity_tokens(token, other) for other in vocabulary]
+
+
+def compute_similarity_tokens(word1,
+                              word2):
+    if word1 == word2:
+        return 1.0
+    sim = compute_similarity_wordnet(word1, word2)
+    if math.isnan(sim):
+        sim = compute_similarity_leven(word1, word2)
+    return sim
+
+
 def generate_parallel_l_sim_input(source_tree,
                                   target_tree,
                                   compatibility_table,
@@ -128,13 +304,14 @@ def generate_parallel_l_sim_input(source_tree,
 
 
 def l_sim_proc(pair: tuple,
-               compatibility_table: dict):
+               compatibility_table: dict,
+               vocabulary=None):
     s, t = pair
     s_cat = s.categories
     t_cat = t.categories
     max_s = [max(dict(filter(lambda x: x[0] in t_cat, compatibility_table[c].items())).items(),
                  key=operator.itemgetter(1))[1] for c in s_cat]
-    return (s.long_name, t.long_name), name_similarity_elements(s, t) * max(max_s)
+    return (s.long_name, t.long_name), name_similarity_elements(s, t, vocabulary) * max(max_s)
 
 
 def data_type_similarity(token_set1,
@@ -170,12 +347,7 @@ def get_partial_similarity(token_set1,
     for t1 in token_set1:
         max_sim = -math.inf
         for t2 in token_set2:
-            if t1.data == t2.data:
-                sim = 1.0
-            else:
-                sim = compute_similarity_wordnet(t1.data, t2.data)
-                if math.isnan(sim):
-                    sim = compute_similarity_leven(t1.data, t2.data)
+            sim = compute_similarity_tokens(t1.data, t2.data)
 
             if sim > max_sim:
                 max_sim = sim
@@ -185,33 +357,64 @@ def get_partial_similarity(token_set1,
     return total_sum
 
 
-def get_synonyms(word) -> set:
-    return set(ss for ss in wn.synsets(word))
+def download_nltk_data():
+    import nltk
 
+    nltk.download('punkt_tab')
+    nltk.download('omw-1.4')
+    nltk.download('stopwords')
+    nltk.download('wordnet')
 
-# the higher, the better
-def compute_similarity_wordnet(word1,
-                               word2):
+
+@lru_cache(maxsize=1)
+def get_wordnet():
+    """
+    The WordNet corpus reader. NLTK takes about a second to import, so it is only imported by the processes that
+    compare tokens with WordNet.
+    """
+    from nltk.corpus import wordnet
+    return wordnet
+
+
+@lru_cache(maxsize=1)
+def get_wordnet_lemmas() -> frozenset:
+    """
+    The names of all the WordNet lemmas, loaded once per process
+    """
     try:
-        wn_lemmas = set(wn.all_lemma_names())
+        return frozenset(get_wordnet().all_lemma_names())
     except LookupError:
-        nltk.download('punkt_tab')
-        nltk.download('omw-1.4')
-        nltk.download('stopwords')
-        nltk.download('wordnet')
-        wn_lemmas = set(wn.all_lemma_names())
+        download_nltk_data()
+        return frozenset(get_wordnet().all_lemma_names())
+
+
+@lru_cache(maxsize=SYNSET_CACHE_SIZE)
+def get_synonyms(word) -> frozenset:
+    return frozenset(ss for ss in get_wordnet().synsets(word))
+
+
+@lru_cache(maxsize=SIMILARITY_CACHE_SIZE)
+def get_wup_similarity(synset1, synset2):
+    return get_wordnet().wup_similarity(synset1, synset2)
+
 
+# the higher, the better
+@lru_cache(maxsize=SIMILARITY_CACHE_SIZE)
+def compute_similarity_wordnet(word1,
+                               word2):
+    wn_lemmas = get_wordnet_lemmas()
     if word1 not in wn_lemmas or word2 not in wn_lemmas:
         return math.nan
     allsyns1 = get_synonyms(word1)
     allsyns2 = get_synonyms(word2)
     if len(allsyns1) == 0 or len(allsyns2) == 0:
         return math.nan
-    best = max(wn.wup_similarity(s1, s2) or math.nan for s1, s2 in product(allsyns1, allsyns2))
+    best = max(get_wup_similarity(s1, s2) or math.nan for s1, s2 in product(allsyns1, allsyns2))
     return best
 
 
 # Higher the better
+@lru_cache(maxsize=SIMILARITY_CACHE_SIZE)
 def compute_similarity_leven(word1,
                              word2):
     return normalize_distance(levenshtein_distance(word1, word2), word1, word2)
@@ -219,7 +422,8 @@ def compute_similarity_leven(word1,
 
 # max is 0.5
 def name_similarity_elements(element1,
-                             element2):
+                             element2,
+                             vocabulary=None):
     sum1 = 0
     sum2 = 0
 
@@ -230,7 +434,10 @@ def name_similarity_elements(element1,
         t2 = element2.get_tokens_by_token_type(tt)
         if len(t1) == 0 or len(t2) == 0:
             continue
-        sim = name_similarity_tokens(t1, t2)
+        if vocabulary is None:
+            sim = name_similarity_tokens(t1, t2)
+        else:
+            sim = vocabulary.name_similarity_tokens(t1, t2)
         sum1 = sum1 + tt.weight * sim
         sum2 = sum2 + tt.weight
 
@@ -253,9 +460,9 @@ def get_max_ns_category(categories_e1,
     max_category = -math.inf
 
     for c1 in categories_e1:
-        c1_tokens = [Token().add_data(t) for t in nltk.word_tokenize(c1)]
+        c1_tokens = [Token().add_data(t) for t in split_tokens(c1)]
         for c2 in categories_e2:
-            c2_tokens = [Token().add_data(t) for t in nltk.word_tokenize(c2)]
+            c2_tokens = [Token().add_data(t) for t in split_tokens(c2)]
             name_similarity_categories = name_similarity_tokens(c1_tokens, c2_tokens)
 
             if name_similarity_categories > max_category:
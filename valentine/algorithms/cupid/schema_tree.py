@@ -1,13 +1,15 @@
 from anytree import RenderTree
 
-from .linguistic_matching import normalization
+from .linguistic_matching import tokenize_name
 from .schema_element_node import SchemaElementNode
 
 
 class SchemaTree(object):
-    def __init__(self, root):
+    def __init__(self, root, normalizer=tokenize_name):
         # k: node name v: SchemaElementNode object
         self.nodes = dict()
+        # The function that turns a name into a SchemaElement with its tokens, e.g. the NLTK based normalization
+        self.normalizer = normalizer
         self.add_node(root)
         self.schema_name = root
         self.schema_tree = None
@@ -22,13 +24,13 @@ class SchemaTree(object):
         if parent:
             if data_type == "Table":
                 self.nodes[table_name] = SchemaElementNode(table_name, parent=parent)
-                self.nodes[table_name].tokens = normalization(table_name).tokens
+                self.nodes[table_name].tokens = self.normalizer(table_name).tokens
                 self.nodes[table_name].data_type = data_type
                 self.nodes[table_name].add_category(data_type)
                 self.nodes[table_name].add_long_name(parent.name, "", table_name, table_guid)
             else:
                 self.nodes[column_name] = SchemaElementNode(column_name, parent=parent)
-                self.nodes[column_name].tokens = normalization(column_name).tokens
+                self.nodes[column_name].tokens = self.normalizer(column_name).tokens
                 self.nodes[column_name].data_type = data_type
                 self.nodes[column_name].add_category(data_type)
                 self.nodes[column_name].add_long_name(parent.name, table_guid, column_name, column_guid)
@@ -25,9 +25,9 @@ def get_sims(s_leaves, t_leaves, compatibility_table, l_sims, leaf_w_struct):
 
 
 def tree_match(source_tree, target_tree, categories, leaf_w_struct, w_struct, th_accept, th_high, th_low, c_inc, c_dec,
-               th_ns, parallelism):
+               th_ns, process_pool=None):
     compatibility_table = compute_compatibility(categories)
-    l_sims = comparison(source_tree, target_tree, compatibility_table, th_ns, parallelism)
+    l_sims = comparison(source_tree, target_tree, compatibility_table, th_ns, process_pool)
     s_leaves = source_tree.get_leaves()
     t_leaves = target_tree.get_leaves()
     sims = get_sims(s_leaves, t_leaves, compatibility_table, l_sims, leaf_w_struct)
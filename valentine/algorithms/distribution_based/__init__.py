@@ -1,3 +1,12 @@
+from enum import Enum, auto
+
+
+class CorrelationClusteringBackend(Enum):
+    EdgeSigns = auto()
+    Pivot = auto()
+
+
 __all__ = [
     "distribution_based",
+    "CorrelationClusteringBackend",
 ]
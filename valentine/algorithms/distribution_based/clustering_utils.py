@@ -1,14 +1,10 @@
-import pickle
-import os
-import subprocess
-from functools import lru_cache
-from typing import List, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
-from .column_model import CorrelationClusteringColumn
-from .emd_utils import intersection_emd, quantile_emd
-from .quantile_histogram import QuantileHistogram
-from ...data_sources.base_column import BaseColumn
-from ...utils.utils import convert_data_type
+import numpy as np
+import pandas as pd
+
+from .column_store import ColumnStore, ColumnStoreHandle, get_shared_column
+from .emd_utils import intersection_emd, quantile_emd, quantile_emds
 
 
 def compute_cutoff_threshold(matrix_c: list, threshold: float):
@@ -44,8 +40,9 @@ def compute_cutoff_threshold(matrix_c: list, threshold: float):
 
 def column_combinations(columns: List[Tuple],
                         quantiles: int,
-                        tmp_folder_path: str,
-                        intersection: bool = False):
+                        column_store: Union[ColumnStore, ColumnStoreHandle],
+                        intersection: bool = False,
+                        indexes: Optional[Dict[Tuple, int]] = None):
     """
     All the unique combinations between all the columns
 
@@ -55,16 +52,20 @@ def column_combinations(columns: List[Tuple],
         A list that contains all the column names
     quantiles : int
         The number of quantiles that the histograms are split on
-    tmp_folder_path: str
-        The path of the temporary folder that will serve as a cache for the run
+    column_store: ColumnStore or ColumnStoreHandle
+        The store that holds the columns, or the handle of the shared store for the worker processes
     intersection : bool, optional
         If true do the intersection EMD else the normal EMD
+    indexes : dict, optional
+        The indexes of the columns in the store, by default looked up in the store itself
 
     Returns
     -------
     tuple
-        A tuple with ((column_name1, column_name1), quantiles, intersection)
+        A tuple with ((column_name1, column_name1), (index1, index2), quantiles, intersection, column_store)
     """
+    if indexes is None:
+        indexes = {column: column_store.index(column) for column in columns}
     c = len(columns)
     c_i = 0
     while c_i < c:
@@ -73,69 +74,92 @@ def column_combinations(columns: List[Tuple],
         while c_j < c:
             _, table_guid_j, _, _ = columns[c_j]
             if table_guid_i != table_guid_j:
-                yield (columns[c_i], columns[c_j]), quantiles, intersection, tmp_folder_path
+                yield (columns[c_i], columns[c_j]), (indexes[columns[c_i]], indexes[columns[c_j]]), quantiles, \
+                    intersection, column_store
             c_j = c_j + 1
         c_i = c_i + 1
 
 
-def process_emd(tup: tuple):
+def column_batches(columns: List[Tuple],
+                   column_store: Union[ColumnStore, ColumnStoreHandle],
+                   indexes: Optional[Dict[Tuple, int]] = None):
     """
-    Function defining a single quantile_emd process between two columns.
+    The combinations between all the columns, grouped by their first column, so that the EMDs of every column to all
+    the columns after it are computed over its histogram at once
 
     Parameters
     ---------
-    tup : tuple
-        A tuple with ((column_name1, column_name1), quantiles, intersection)
+    columns : list
+        A list that contains all the column names
+    column_store: ColumnStore or ColumnStoreHandle
+        The store that holds the columns, or the handle of the shared store for the worker processes
+    indexes : dict, optional
+        The indexes of the columns in the store, by default looked up in the store itself
 
     Returns
     -------
     tuple
-        a dictionary entry {k: joint key of the column combination, v: quantile_emd calculation}
+        A tuple with (column_name, index, [other column names], [other indexes], column_store)
     """
-    name_i, name_j, k, quantile, intersection, tmp_folder_path = unwrap_process_input_tuple(tup)
-    tn_i, _, cn_i, _ = name_i
-    tn_j, _, cn_j, _ = name_j
-    c1 = read_from_cache(f'{make_filename_safe(tn_i)}_{make_filename_safe(cn_i)}', tmp_folder_path)
-    c2 = read_from_cache(f'{make_filename_safe(tn_j)}_{make_filename_safe(cn_j)}', tmp_folder_path)
-    if intersection:
-        return k, intersection_emd(c1, c2, tmp_folder_path, quantile)
-    else:
-        return k, quantile_emd(c1, c2, quantile)
+    if indexes is None:
+        indexes = {column: column_store.index(column) for column in columns}
+    for c_i, column_i in enumerate(columns):
+        _, table_guid_i, _, _ = column_i
+        others = [column_j for column_j in columns[c_i + 1:] if column_j[1] != table_guid_i]
+        if others:
+            yield column_i, indexes[column_i], others, [indexes[column_j] for column_j in others], column_store
 
 
-@lru_cache(maxsize=32)
-def read_from_cache(file_name: str, tmp_folder_path):
+def process_emd_batch(tup: tuple):
     """
-    Function that reads from a pickle file lru cache a column after pre-processing
+    Function defining the quantile_emd computations between a column and a batch of columns
 
     Parameters
-    ----------
-    file_name: str
-        The file name that contains the
-    tmp_folder_path: str
-        The path of the temporary folder that will serve as a cache for the run
+    ---------
+    tup : tuple
+        A tuple with (column_name, index, [other column names], [other indexes], column_store)
 
     Returns
     -------
-    CorrelationClusteringColumn
-        The preprocessed column
+    list
+        The dictionary entries {k: joint key of the column combination, v: quantile_emd calculation}
     """
-    return get_column_from_store(file_name, tmp_folder_path)
+    name_i, i, names_j, js, column_store = tup
+    if isinstance(column_store, ColumnStoreHandle):
+        c1 = get_shared_column(column_store, i)
+        columns = [get_shared_column(column_store, j) for j in js]
+    else:
+        c1 = column_store.get_column(i)
+        columns = [column_store.get_column(j) for j in js]
+    distances = quantile_emds(c1, columns)
+    return [((name_i, name_j), float(e)) for name_j, e in zip(names_j, distances)]
 
 
-def unwrap_process_input_tuple(tup: tuple):
+def process_emd(tup: tuple):
     """
-    Helper function that unwraps a tuple to its components and creates a unique key for the column combination
+    Function defining a single quantile_emd process between two columns.
 
     Parameters
     ---------
     tup : tuple
-        the tuple to unwrap
+        A tuple with ((column_name1, column_name1), (index1, index2), quantiles, intersection, column_store)
+
+    Returns
+    -------
+    tuple
+        a dictionary entry {k: joint key of the column combination, v: quantile_emd calculation}
     """
-    names, quantile, intersection, tmp_folder_path = tup
-    name_i, name_j = names
-    k = (name_i, name_j)
-    return name_i, name_j, k, quantile, intersection, tmp_folder_path
+    k, (i, j), quantile, intersection, column_store = tup
+    if isinstance(column_store, ColumnStoreHandle):
+        c1 = get_shared_column(column_store, i)
+        c2 = get_shared_column(column_store, j)
+    else:
+        c1 = column_store.get_column(i)
+        c2 = column_store.get_column(j)
+    if intersection:
+        return k, intersection_emd(c1, c2, quantile)
+    else:
+        return k, quantile_emd(c1, c2, quantile)
 
 
 def insert_to_dict(dc: dict, k: str, v: dict):
@@ -177,140 +201,114 @@ def transform_dict(dc: dict):
     return tmp_dict
 
 
-def process_columns(tup: tuple):
-    """
-    Process a pandas dataframe column to a column_model_scale.Column
-
-    Parameters
-    ---------
-    tup : tuple
-        tuple containing the information of the column to be processed
-    """
-    column_name, column_uid, data, source_name, source_guid, quantiles, tmp_folder_path = tup
-    column = CorrelationClusteringColumn(column_name, column_uid, data, source_name, source_guid, tmp_folder_path)
-    if column.size > 0:
-        column.quantile_histogram = QuantileHistogram(column.long_name, column.ranks, column.size, quantiles)
-    with open(os.path.join(tmp_folder_path,
-                           f'{make_filename_safe(column.table_name)}_{make_filename_safe(column.name)}.pkl'),
-              'wb') as output:
-        pickle.dump(column, output, pickle.HIGHEST_PROTOCOL)
-    del column
-
-
 def parallel_cutoff_threshold(tup: tuple):
     """
-    Process the cutoff threshold in parallel for each column
+    Process the cutoff threshold for each column
 
     Parameters
     ---------
     tup : tuple
         tuple containing the information of the column to be processed
     """
-    matrix_a, column, threshold = tup
-    name_i = column.long_name
+    matrix_a, name_i, threshold = tup
     theta = compute_cutoff_threshold(matrix_a[name_i], threshold)
     n_c = [(name_i, i['c']) for i in matrix_a[name_i] if i['e'] <= theta]
     return n_c
 
 
-def ingestion_column_generator(columns: List[BaseColumn],
-                               table_name: str,
-                               table_guid: object,
-                               quantiles: int,
-                               tmp_folder_path: str):
-    """
-    Generator of incoming pandas dataframe columns
-    """
-    for column in columns:
-        if not column.is_empty:
-            yield column.name, column.unique_identifier, column.data, table_name, table_guid, quantiles, tmp_folder_path
-
-
 def cuttoff_column_generator(matrix_a: dict,
                              columns: List[Tuple[str, str, str, str]],
-                             threshold: float,
-                             tmp_folder_path: str):
+                             threshold: float):
     """
     Generator of columns for the cutoff threshold computation
     """
     for column_name in columns:
-        tn_i, _, cn_i, _ = column_name
-        f_name = f'{make_filename_safe(tn_i)}_{make_filename_safe(cn_i)}'
-        column = read_from_cache(f_name, tmp_folder_path)
-        yield matrix_a, column, threshold
+        yield matrix_a, column_name, threshold
 
 
-def generate_global_ranks(data: list, tmp_folder_path: str):
+def compute_global_ranks(columns: List[Sequence]) -> List[np.ndarray]:
     """
-    Function that creates a pickle file with the global ranks of all the values inside the database.
+    Function that ranks all the distinct values inside the database and returns the sorted ranks of the values of every
+    column, see `iter_global_ranks`
 
     Parameters
     ----------
-    data : list
-        All the values from every column
-    tmp_folder_path: str
-        The path of the temporary folder that will serve as a cache for the run
+    columns : list
+        The values of every column
+
+    Returns
+    -------
+    list
+        The ndarray with the sorted ranks of the values of every column, in the order of the columns
     """
-    ranks = unix_sort_ranks(set(data), tmp_folder_path)
-    with open(os.path.join(tmp_folder_path, 'ranks.pkl'), 'wb') as output:
-        pickle.dump(ranks, output, pickle.HIGHEST_PROTOCOL)
+    return list(iter_global_ranks(columns))
 
 
-def unix_sort_ranks(corpus: set,
-                    tmp_folder_path: str):
+def iter_global_ranks(columns: Sequence,
+                      get_values: Optional[Callable[[object], Sequence]] = None) -> Iterator[np.ndarray]:
     """
-    Function that takes a corpus sorts it with the unix sort -n command and generates the global ranks
-    for each value in the corpus.
+    Function that ranks all the distinct values inside the database and yields the sorted ranks of the values of every
+    column, one column at a time. The values are compared as numbers if their string representation is one, so that
+    e.g. 1, 1.0 and '1' share a rank, and the numbers are ranked before the strings.
+
+    The ranking is vectorized and takes two passes over the columns: the first one finds the distinct keys of every
+    column with np.unique and merges them, the second one looks up the ranks of the values of each column with
+    np.searchsorted. Besides the distinct keys of the database, only the keys and the ranks of one column are held
+    at a time, so that the caller can store (or spill) the ranks of a column before the next one is ranked.
 
     Parameters
     ----------
-    corpus: set
-        The corpus (all the unique values from every column)
-    tmp_folder_path: str
-        The path of the temporary folder that will serve as a cache for the run
+    columns : Sequence
+        The columns, or their values if get_values is not given
+    get_values : callable, optional
+        A function that returns the values of a column, called once per pass
 
     Returns
     -------
-    dict
-        The ranks in the form of k: value, v: the rank of the value
+    generator
+        The ndarray with the sorted ranks of the values of every column, in the order of the columns
+    """
+    if get_values is None:
+        def get_values(column):
+            return column
+
+    numeric_keys, string_keys = [np.empty(0, dtype=np.float64)], [np.empty(0, dtype=object)]
+    for column in columns:
+        numeric, strings = get_rank_keys(get_values(column))
+        numeric_keys.append(np.unique(numeric))
+        string_keys.append(np.unique(strings))
+    numeric_keys = np.unique(np.concatenate(numeric_keys))
+    string_keys = np.unique(np.concatenate(string_keys))
+
+    for column in columns:
+        numeric, strings = get_rank_keys(get_values(column))
+        # The ranks start from 1, the strings are ranked after all the numbers
+        column_ranks = np.concatenate([np.searchsorted(numeric_keys, numeric) + 1,
+                                       np.searchsorted(string_keys, strings) + 1 + len(numeric_keys)])
+        column_ranks.sort()
+        yield column_ranks.astype(np.int64, copy=False)
+
+
+def get_rank_keys(values: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split the values of a column to the numeric keys (as float64) of the ones whose string representation is a number
+    and the string keys of the rest
+
+    Parameters
+    ----------
+    values : Sequence
+        The values of the column
+
+    Returns
+    -------
+    tuple
+        The float64 array of the numeric keys and the object array of the string keys
     """
-    unsorted_file_path = os.path.join(tmp_folder_path, 'unsorted_file.txt')
-    sorted_file_path = os.path.join(tmp_folder_path, 'sorted_file.txt')
-
-    with open(unsorted_file_path, 'w', encoding='utf-8') as out:
-        for var in corpus:
-            print(str(var), file=out)
-
-    with open(sorted_file_path, 'w') as f:
-        if os.name == 'nt':
-            subprocess.call(['sort',
-                             unsorted_file_path],
-                            stdout=f)
-        else:
-            sort_env = os.environ.copy()
-            sort_env['LC_ALL'] = 'C'
-            subprocess.call(['sort', '-n',
-                             unsorted_file_path],
-                            stdout=f, env=sort_env)
-
-    rank = 1
-    ranks = []
-
-    with open(sorted_file_path, 'r', encoding='utf-8') as f:
-        txt = f.read()
-        for var in txt.splitlines():
-            ranks.append((convert_data_type(var.replace('\n', '')), rank))
-            rank = rank + 1
-
-    return dict(ranks)
-
-
-def get_column_from_store(file_name: str, tmp_folder_path: str):
-    file_path = os.path.join(tmp_folder_path, f'{file_name}.pkl')
-    with open(file_path, 'rb') as pkl_file:
-        data = pickle.load(pkl_file)
-    return data
-
-
-def make_filename_safe(file_name: str):
-    return "".join([c for c in file_name if c.isalpha() or c.isdigit() or c == ' ']).rstrip()
+    values = np.asarray(values) if not isinstance(values, np.ndarray) else values
+    if values.dtype.kind in 'iu' or values.dtype == np.float64:
+        numeric = values.astype(np.float64)
+        return numeric[~np.isnan(numeric)], np.empty(0, dtype=object)
+    strings = pd.Series(values, dtype=object).astype(str)
+    numeric = pd.to_numeric(strings, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    is_numeric = ~np.isnan(numeric)
+    return numeric[is_numeric], strings.to_numpy()[~is_numeric]
@@ -1,10 +1,7 @@
-import os
-
 import numpy as np
-import pickle
 
+from .quantile_histogram import QuantileHistogram
 from ...data_sources.base_column import BaseColumn
-from ...utils.utils import convert_data_type
 
 
 class CorrelationClusteringColumn(BaseColumn):
@@ -13,46 +10,41 @@ class CorrelationClusteringColumn(BaseColumn):
 
     Attributes
     ----------
-    __data : list
-        The data contained in the column
-    __ranks : list
-        A list containing the ranks of the column
+    __ranks : ndarray
+        The sorted global ranks of the data of the column
     quantile_histogram : QuantileHistogram
-        The quantile histogram representation of the column using the sorted ranks of the data
-
-    Methods
-    -------
-    get_histogram()
-        Returns the quantile histogram of the column
-
-    get_original_data()
-        Returns the original data instances
+        The quantile histogram representation of the column using the sorted ranks of the data, built on first use
     """
     def __init__(self,
                  name: str,
-                 column_uid: str,
-                 data: list,
+                 column_uid: object,
+                 ranks: np.ndarray,
                  table_name: str,
-                 table_guid: str,
-                 tmp_folder_path: str):
+                 table_guid: object,
+                 quantiles: int = 256):
         """
         Parameters
         ----------
         name : str
             The name of the column
-        data : list
-            The data instances of the column
+        column_uid : object
+            The unique identifier of the column
+        ranks : ndarray
+            The sorted global ranks of the data of the column
         table_name : str
             The name of the table
+        table_guid : object
+            The unique identifier of the table
+        quantiles : int, optional
+            The number of quantiles of the histogram (default is 256)
         """
         self.__name = name
         self.__uid = column_uid
-        self.__data = data
+        self.__ranks = ranks
         self.__table_name = table_name
         self.__table_guid = table_guid
-        self.__tmp_dir = tmp_folder_path
-        self.__ranks = self.get_global_ranks(self.__data, self.__tmp_dir)
-        self.quantile_histogram = None
+        self.__quantiles = quantiles
+        self.__quantile_histogram = None
 
     @property
     def unique_identifier(self) -> object:
@@ -68,7 +60,18 @@ class CorrelationClusteringColumn(BaseColumn):
 
     @property
     def data(self) -> list:
-        return self.__data
+        """
+        The data of the column as global ranks, which identify the values in the correlation clustering
+        """
+        return self.__ranks.tolist()
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.__ranks
+
+    @property
+    def size(self) -> int:
+        return len(self.__ranks)
 
     @property
     def table_name(self) -> str:
@@ -79,29 +82,11 @@ class CorrelationClusteringColumn(BaseColumn):
         return self.table_name, self.__table_guid, self.name, self.unique_identifier
 
     @property
-    def ranks(self):
+    def ranks(self) -> np.ndarray:
         return self.__ranks
 
-    @staticmethod
-    def get_global_ranks(column: list, tmp_folder_path: str):
-        """
-        Function that gets the column data, reads the pickled global ranks and produces a ndarray that contains the
-        ranks of the data .
-
-        Parameters
-        ----------
-        column : list
-            The column data
-        tmp_folder_path: str
-            The path of the temporary folder that will serve as a cache for the run
-
-        Returns
-        -------
-        ndarray
-            The ndarray that contains the ranks of the data
-        """
-        with open(os.path.join(tmp_folder_path, 'ranks.pkl'), 'rb') as pkl_file:
-            global_ranks: dict = pickle.load(pkl_file)
-            ranks = np.array(sorted([global_ranks[convert_data_type(x)] for x in column
-                                     if convert_data_type(x) in global_ranks]))
-            return ranks
+    @property
+    def quantile_histogram(self) -> QuantileHistogram:
+        if self.__quantile_histogram is None and self.size > 0:
+            self.__quantile_histogram = QuantileHistogram(self.long_name, self.__ranks, self.size, self.__quantiles)
+        return self.__quantile_histogram
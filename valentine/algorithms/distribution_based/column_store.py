@@ -0,0 +1,230 @@
+import os
+import shutil
+import tempfile
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .column_model import CorrelationClusteringColumn
+
+# The default memory budget of the rank arrays that are kept resident, in bytes
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024
+RANK_DTYPE = np.int64
+# The location of the ranks of a column: in memory (or shared memory) or in the spill file
+RESIDENT = 0
+SPILLED = 1
+
+
+class ColumnStoreHandle(NamedTuple):
+    """
+    A reference to a ColumnStore that has been shared with the worker processes, small enough to be sent with every
+    task. The shared memory block starts with a (n_columns, 3) array of (location, offset, size) rows, followed by
+    the resident ranks.
+    """
+    block_name: str
+    spill_path: Optional[str]
+    n_columns: int
+    quantiles: int
+
+
+class ColumnStore(object):
+    """
+    A class used to keep the rank arrays and the quantile histograms of all the columns of a DistributionBased run in
+    memory, so that every pairwise EMD reads them directly instead of unpickling them from disk.
+
+    The ranks are kept resident as long as their total size fits in the memory budget; the ranks of the columns that
+    are added after that are appended to a spill file in a temporary directory and memory-mapped. For the parallel
+    path, `share` places the resident ranks into a shared memory block once, and the workers get the columns by index
+    through `get_shared_column`.
+
+    Methods
+    -------
+    add_column(long_name, ranks)
+        Add the ranks of a column and return its index
+
+    index(long_name)
+        The index of a column
+
+    get_column(i)
+        The column with the given index
+
+    share()
+        Share the store with the worker processes and return its handle
+
+    close()
+        Release the shared memory block and remove the spill file
+    """
+
+    def __init__(self,
+                 quantiles: int,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        """
+        Parameters
+        ----------
+        quantiles : int
+            The number of quantiles of the histograms
+        memory_budget : int, optional
+            The memory budget of the resident rank arrays, in bytes (default is 1 GiB)
+        """
+        self.__quantiles = quantiles
+        self.__memory_budget = memory_budget
+        self.__resident_bytes = 0
+        self.__columns: List[CorrelationClusteringColumn] = []
+        self.__indexes: Dict[tuple, int] = {}
+        self.__locations: List[Tuple[int, int, int]] = []
+        self.__resident_offset = 0
+        self.__spill_directory: Optional[str] = None
+        self.__spill_path: Optional[str] = None
+        self.__spill_offset = 0
+        self.__block: Optional[shared_memory.SharedMemory] = None
+
+    def __len__(self):
+        return len(self.__columns)
+
+    def add_column(self,
+                   long_name: tuple,
+                   ranks: np.ndarray) -> int:
+        """
+        Add the sorted global ranks of a column to the store
+
+        Parameters
+        ----------
+        long_name : tuple
+            The (table_name, table_guid, column_name, column_guid) of the column
+        ranks : ndarray
+            The sorted global ranks of the values of the column
+
+        Returns
+        -------
+        int
+            The index of the column in the store
+        """
+        ranks = np.ascontiguousarray(ranks, dtype=RANK_DTYPE)
+        if self.__resident_bytes + ranks.nbytes <= self.__memory_budget:
+            self.__resident_bytes += ranks.nbytes
+            self.__locations.append((RESIDENT, self.__resident_offset, len(ranks)))
+            self.__resident_offset += len(ranks)
+        else:
+            ranks = self.__spill(ranks)
+        table_name, table_guid, column_name, column_guid = long_name
+        column = CorrelationClusteringColumn(column_name, column_guid, ranks, table_name, table_guid,
+                                             self.__quantiles)
+        self.__indexes[long_name] = len(self.__columns)
+        self.__columns.append(column)
+        return len(self.__columns) - 1
+
+    def index(self, long_name: tuple) -> int:
+        return self.__indexes[long_name]
+
+    def get_column(self, i: int) -> CorrelationClusteringColumn:
+        return self.__columns[i]
+
+    def share(self) -> ColumnStoreHandle:
+        """
+        Place the locations of the columns and the resident ranks into a shared memory block, once
+
+        Returns
+        -------
+        ColumnStoreHandle
+            The handle that the workers resolve the columns with
+        """
+        if self.__block is None:
+            locations = np.array(self.__locations, dtype=RANK_DTYPE).reshape(-1, 3)
+            size = locations.nbytes + self.__resident_bytes
+            # Shared memory blocks cannot be empty
+            self.__block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            buffer = np.ndarray(size // RANK_DTYPE().itemsize, dtype=RANK_DTYPE, buffer=self.__block.buf)
+            buffer[:locations.size] = locations.ravel()
+            for column, (location, offset, length) in zip(self.__columns, self.__locations):
+                if location == RESIDENT:
+                    buffer[locations.size + offset:locations.size + offset + length] = column.ranks
+            del buffer
+        return ColumnStoreHandle(self.__block.name, self.__spill_path, len(self.__columns), self.__quantiles)
+
+    def close(self):
+        if self.__block is not None:
+            self.__block.close()
+            self.__block.unlink()
+            self.__block = None
+        if self.__spill_directory is not None:
+            self.__columns = []
+            # The workers may still have the spill file mapped, which prevents its removal on Windows
+            shutil.rmtree(self.__spill_directory, ignore_errors=True)
+            self.__spill_directory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __spill(self, ranks: np.ndarray) -> np.ndarray:
+        if self.__spill_directory is None:
+            self.__spill_directory = tempfile.mkdtemp()
+            self.__spill_path = os.path.join(self.__spill_directory, 'ranks.bin')
+        with open(self.__spill_path, 'ab') as spill_file:
+            spill_file.write(ranks.tobytes())
+        self.__locations.append((SPILLED, self.__spill_offset, len(ranks)))
+        offset = self.__spill_offset
+        self.__spill_offset += len(ranks)
+        return read_spilled_ranks(self.__spill_path, offset, len(ranks))
+
+
+def read_spilled_ranks(spill_path: str,
+                       offset: int,
+                       length: int) -> np.ndarray:
+    if length == 0:
+        return np.empty(0, dtype=RANK_DTYPE)
+    return np.memmap(spill_path, dtype=RANK_DTYPE, mode='r', offset=offset * RANK_DTYPE().itemsize, shape=(length,))
+
+
+# The shared memory block a worker is attached to and the columns it has resolved from it. Only the block of the latest
+# store is kept, so the histograms are built once per column and worker instead of once per task.
+_attached_block: Dict[str, shared_memory.SharedMemory] = {}
+_resolved_columns: Dict[Tuple[str, int], CorrelationClusteringColumn] = {}
+
+
+def get_shared_column(handle: ColumnStoreHandle,
+                      i: int) -> CorrelationClusteringColumn:
+    """
+    Get a column of a shared ColumnStore in a worker process, attaching to the store on first use
+
+    Parameters
+    ----------
+    handle : ColumnStoreHandle
+        The handle of the store
+    i : int
+        The index of the column
+
+    Returns
+    -------
+    CorrelationClusteringColumn
+        The column, with the ranks of the store and a histogram that is built on first use
+    """
+    column = _resolved_columns.get((handle.block_name, i))
+    if column is not None:
+        return column
+
+    if handle.block_name not in _attached_block:
+        for block in _attached_block.values():
+            try:
+                block.close()
+            except BufferError:
+                # Ranks of the previous store are still referenced, the block is closed when they are collected
+                pass
+        _attached_block.clear()
+        _resolved_columns.clear()
+        _attached_block[handle.block_name] = shared_memory.SharedMemory(name=handle.block_name)
+
+    buffer = _attached_block[handle.block_name].buf
+    locations = np.frombuffer(buffer, dtype=RANK_DTYPE, count=handle.n_columns * 3).reshape(-1, 3)
+    location, offset, length = (int(x) for x in locations[i])
+    if location == RESIDENT:
+        ranks = np.frombuffer(buffer, dtype=RANK_DTYPE, count=length,
+                              offset=(locations.size + offset) * RANK_DTYPE().itemsize)
+    else:
+        ranks = read_spilled_ranks(handle.spill_path, offset, length)
+    column = CorrelationClusteringColumn('', i, ranks, '', '', handle.quantiles)
+    _resolved_columns[(handle.block_name, i)] = column
+    return column
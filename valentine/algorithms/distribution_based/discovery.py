@@ -1,20 +1,18 @@
-from ast import literal_eval
 from typing import List, Tuple
 
 import numpy as np
 import networkx as nx
-import pulp as plp
 from multiprocessing import Pool
 
-from pulp import PULP_CBC_CMD
-
-from .clustering_utils import column_combinations, transform_dict, process_emd, parallel_cutoff_threshold, \
-    cuttoff_column_generator, compute_cutoff_threshold
+from .clustering_utils import column_batches, column_combinations, transform_dict, process_emd, process_emd_batch, \
+    parallel_cutoff_threshold, cuttoff_column_generator, compute_cutoff_threshold
+from .column_store import ColumnStore
+from ..distribution_based import CorrelationClusteringBackend
 
 
 def compute_distribution_clusters(columns: List[Tuple[str, str, str, str]],
                                   threshold: float,
-                                  tmp_folder_path: str,
+                                  column_store: ColumnStore,
                                   quantiles: int = 256):
     """
     Algorithm 2 of the paper "Automatic Discovery of Attributes in Relational Databases" from M. Zhang et al. [1]. This
@@ -26,8 +24,8 @@ def compute_distribution_clusters(columns: List[Tuple[str, str, str, str]],
         The column names of the database
     threshold : float
         The conservative global EMD cutoff threshold described in [1]
-    tmp_folder_path: str
-        The path of the temporary folder that will serve as a cache for the run
+    column_store: ColumnStore
+        The store that holds the ranks and the histograms of the columns
     quantiles : int, optional
         The number of quantiles that the histograms are split on (default is 256)
 
@@ -36,11 +34,11 @@ def compute_distribution_clusters(columns: List[Tuple[str, str, str, str]],
     list(list(str))
         A list that contains the distribution clusters that contain the column names in the cluster
     """
-    combinations = column_combinations(columns, quantiles, tmp_folder_path, intersection=False)
-
-    matrix_a: dict = transform_dict({k: v for k, v in [process_emd(cmb) for cmb in combinations]})
+    # The EMDs of every column to the columns after it are computed over its histogram in a single batch
+    matrix_a: dict = transform_dict({k: v for batch in column_batches(columns, column_store)
+                                     for k, v in process_emd_batch(batch)})
 
-    ctf_clm_gnr = cuttoff_column_generator(matrix_a, columns, threshold, tmp_folder_path)
+    ctf_clm_gnr = cuttoff_column_generator(matrix_a, columns, threshold)
 
     edges_per_column: list = [parallel_cutoff_threshold(tup) for tup in ctf_clm_gnr]
 
@@ -54,7 +52,7 @@ def compute_distribution_clusters(columns: List[Tuple[str, str, str, str]],
 def compute_distribution_clusters_parallel(columns: list,
                                            threshold: float,
                                            pool: Pool,
-                                           tmp_folder_path: str,
+                                           column_store: ColumnStore,
                                            quantiles: int = 256):
     """
     Algorithm 2 of the paper "Automatic Discovery of Attributes in Relational Databases" from M. Zhang et al. [1]. This
@@ -68,8 +66,8 @@ def compute_distribution_clusters_parallel(columns: list,
         The conservative global EMD cutoff threshold described in [1]
     pool: multiprocessing.Pool
         The process pool that will be used in the pre-processing of the table's columns
-    tmp_folder_path: str
-        The path of the temporary folder that will serve as a cache for the run
+    column_store: ColumnStore
+        The store that holds the ranks and the histograms of the columns
     quantiles : int, optional
         The number of quantiles that the histograms are split on (default is 256)
 
@@ -78,13 +76,16 @@ def compute_distribution_clusters_parallel(columns: list,
     list(list(str))
         A list that contains the distribution clusters that contain the column names in the cluster
     """
-    combinations = column_combinations(columns, quantiles, tmp_folder_path, intersection=False)
-    matrix_a: dict = transform_dict(dict(pool.map(process_emd, combinations, chunksize=1)))
+    # The workers read the columns from shared memory, the tasks only carry their indexes in the store. Every task
+    # computes the EMDs of a column to all the columns after it.
+    batches = column_batches(columns, column_store.share(),
+                             indexes={column: column_store.index(column) for column in columns})
+    matrix_a: dict = transform_dict({k: v for batch in pool.map(process_emd_batch, batches, chunksize=1)
+                                     for k, v in batch})
 
-    edges_per_column = list(pool.map(parallel_cutoff_threshold, cuttoff_column_generator(matrix_a,
-                                                                                         columns,
-                                                                                         threshold,
-                                                                                         tmp_folder_path), chunksize=1))
+    # The cutoff thresholds are cheap, sending the EMD matrix to the workers for them would cost more than it saves
+    edges_per_column = [parallel_cutoff_threshold(tup) for tup in cuttoff_column_generator(matrix_a, columns,
+                                                                                           threshold)]
 
     graph = create_graph(columns, edges_per_column)
 
@@ -95,7 +96,7 @@ def compute_distribution_clusters_parallel(columns: list,
 
 def compute_attributes(distribution_clusters: list,
                        threshold: float,
-                       tmp_folder_path: str,
+                       column_store: ColumnStore,
                        quantiles: int = 256):
     """
     Algorithm 3 of the paper "Automatic Discovery of Attributes in Relational Databases" from M. Zhang et al.[1]
@@ -107,8 +108,8 @@ def compute_attributes(distribution_clusters: list,
         The distribution clusters computed in algorithm 2
     threshold : float
         The conservative global EMD cutoff threshold described in [1]
-    tmp_folder_path: str
-        The path of the temporary folder that will serve as a cache for the run
+    column_store: ColumnStore
+        The store that holds the ranks and the histograms of the columns
     quantiles : int, optional
         The number of quantiles that the histograms are split on (default is 256)
 
@@ -118,7 +119,7 @@ def compute_attributes(distribution_clusters: list,
         A dictionary that contains the attribute graph of the distribution clusters
     """
 
-    combinations = column_combinations(distribution_clusters, quantiles, tmp_folder_path, intersection=True)
+    combinations = column_combinations(distribution_clusters, quantiles, column_store, intersection=True)
 
     matrix_i: dict = transform_dict({k: v for k, v in [process_emd(cmb) for cmb in combinations]})
 
@@ -128,7 +129,7 @@ def compute_attributes(distribution_clusters: list,
 def compute_attributes_parallel(distribution_clusters: list,
                                 threshold: float,
                                 pool: Pool,
-                                tmp_folder_path: str,
+                                column_store: ColumnStore,
                                 quantiles: int = 256):
     """
     Algorithm 3 of the paper "Automatic Discovery of Attributes in Relational Databases" from M. Zhang et al.[1]
@@ -142,8 +143,8 @@ def compute_attributes_parallel(distribution_clusters: list,
         The conservative global EMD cutoff threshold described in [1]
     pool: multiprocessing.Pool
         The process pool that will be used in the pre-processing of the table's columns
-    tmp_folder_path: str
-        The path of the temporary folder that will serve as a cache for the run
+    column_store: ColumnStore
+        The store that holds the ranks and the histograms of the columns
     quantiles : int, optional
         The number of quantiles that the histograms are split on (default is 256)
 
@@ -153,7 +154,8 @@ def compute_attributes_parallel(distribution_clusters: list,
         A dictionary that contains the attribute graph of the distribution clusters
     """
 
-    combinations = column_combinations(distribution_clusters, quantiles, tmp_folder_path, intersection=True)
+    combinations = column_combinations(distribution_clusters, quantiles, column_store.share(), intersection=True,
+                                       indexes={column: column_store.index(column) for column in distribution_clusters})
 
     matrix_i = transform_dict(dict(pool.map(process_emd, combinations, chunksize=1)))
 
@@ -187,10 +189,11 @@ def get_attribute_graph(distribution_clusters: list,
     return g_a
 
 
-def correlation_clustering_pulp(vertexes: list,
-                                edges: dict):
+def correlation_clustering(vertexes: list,
+                           edges: dict,
+                           backend: CorrelationClusteringBackend = CorrelationClusteringBackend.EdgeSigns):
     """
-    The LP solver used to perform the correlation clustering
+    Perform the correlation clustering of an attribute graph with the given backend
 
     Parameters
     ----------
@@ -198,47 +201,99 @@ def correlation_clustering_pulp(vertexes: list,
         The vertices of the graph
     edges : dict
         The edges of the graph
+    backend : CorrelationClusteringBackend, optional
+        The backend that clusters the graph (default is CorrelationClusteringBackend.EdgeSigns)
 
     Returns
     -------
     dict
-        The clusters
+        The clusters, 0 for every pair of vertices in the same cluster and 1 for the rest
     """
-    opt_model = plp.LpProblem(name="MIP_Model", sense=plp.LpMinimize)
+    if backend == CorrelationClusteringBackend.EdgeSigns:
+        return correlation_clustering_edge_signs(vertexes, edges)
+    if backend == CorrelationClusteringBackend.Pivot:
+        return correlation_clustering_pivot(vertexes, edges)
+    raise ValueError(f"Unknown correlation clustering backend: {backend}")
 
-    set_u = vertexes
-    set_v = vertexes
 
-    x_vars = {(i, j): plp.LpVariable(cat=plp.LpInteger, lowBound=0, upBound=1, name="({0},{1})"
-                                     .format(str(i)
-                                             .replace(" ", "__WHITESPACE__")
-                                             .replace("-", "__DASH__")
-                                             .replace(">", "__GREATER__")
-                                             .replace("/", "__BACKSLASH__"),
-                                             str(j)
-                                             .replace(" ", "__WHITESPACE__")
-                                             .replace("-", "__DASH__")
-                                             .replace(">", "__GREATER__")
-                                             .replace("/", "__BACKSLASH__")))
-              for i in set_u for j in set_v}
+def correlation_clustering_edge_signs(vertexes: list,
+                                      edges: dict):
+    """
+    The clustering of the integer program that valentine used to solve with PuLP/CBC: it minimizes the sum of x_ij
+    over the positive edges and of 1 - x_ij over the negative ones without transitivity constraints, so its optimum
+    puts every pair of vertices with a positive edge in the same cluster and every other pair apart. That optimum is
+    assigned directly in O(n^2), without a solver, and the clusters are closed transitively afterwards by
+    process_correlation_clustering_result.
 
-    sum1 = plp.lpSum(x_vars[i, j] for i in set_u for j in set_v if edges[i][j] == 1)
-    sum2 = plp.lpSum(1 - x_vars[i, j] for i in set_u for j in set_v if edges[i][j] == -1)
+    Parameters
+    ----------
+    vertexes : list
+        The vertices of the graph
+    edges : dict
+        The edges of the graph
 
-    opt_model.setObjective(sum1 + sum2)
+    Returns
+    -------
+    dict
+        The clusters, 0 for every pair of vertices in the same cluster and 1 for the rest
+    """
+    return {(i, j): 0 if edges[i][j] == 1 else 1 for i in vertexes for j in vertexes}
 
-    opt_model.solve(PULP_CBC_CMD(msg=False))
 
-    result = dict()
+def correlation_clustering_pivot(vertexes: list,
+                                 edges: dict,
+                                 seed: int = 0):
+    """
+    Approximate correlation clustering with the pivot algorithm (KwikCluster) of Ailon et al., followed by a local
+    search that moves single vertices between clusters as long as that lowers the number of disagreements. Both run
+    on numpy matrices of the graph, in polynomial time and without a solver.
 
-    for v in opt_model.variables():
-        result[literal_eval(v.name
-                            .replace("__WHITESPACE__", " ")
-                            .replace("__DASH__", "-")
-                            .replace("__GREATER__", ">")
-                            .replace("__BACKSLASH__", "/"))] = v.varValue
+    Parameters
+    ----------
+    vertexes : list
+        The vertices of the graph
+    edges : dict
+        The edges of the graph
+    seed : int, optional
+        The seed of the order in which the pivots are picked (default is 0)
 
-    return result
+    Returns
+    -------
+    dict
+        The clusters, 0 for every pair of vertices in the same cluster and 1 for the rest
+    """
+    n = len(vertexes)
+    signs = np.array([[edges[i][j] for j in vertexes] for i in vertexes], dtype=np.float64).reshape(n, n)
+    # The attribute graph is not always symmetric, every direction of an edge counts for half of it
+    positive = ((signs == 1) + (signs == 1).T) / 2
+    negative = ((signs == -1) + (signs == -1).T) / 2
+    np.fill_diagonal(positive, 0)
+    np.fill_diagonal(negative, 0)
+
+    # Pivot: every unclustered vertex in random order forms a cluster with its unclustered positive neighbours
+    labels = np.full(n, -1)
+    for pivot in np.random.default_rng(seed).permutation(n):
+        if labels[pivot] == -1:
+            members = (labels == -1) & (positive[pivot] > negative[pivot])
+            members[pivot] = True
+            labels[members] = pivot
+
+    # Local search: the cost of a vertex in a cluster is the negative weight to its members minus the positive weight
+    # to them. There are n cluster slots, so that the empty ones let a vertex move to a cluster of its own.
+    membership = np.zeros((n, n))
+    membership[np.arange(n), labels] = 1
+    costs = (negative - positive) @ membership
+    for _ in range(n * n):
+        gains = costs[np.arange(n), labels][:, np.newaxis] - costs
+        vertex, cluster = np.unravel_index(np.argmax(gains), gains.shape)
+        if gains[vertex, cluster] <= 1e-9:
+            break
+        costs[:, labels[vertex]] -= negative[:, vertex] - positive[:, vertex]
+        costs[:, cluster] += negative[:, vertex] - positive[:, vertex]
+        labels[vertex] = cluster
+
+    return {(i, j): 0 if labels[i_idx] == labels[j_idx] else 1
+            for i_idx, i in enumerate(vertexes) for j_idx, j in enumerate(vertexes)}
 
 
 def process_correlation_clustering_result(results: list,
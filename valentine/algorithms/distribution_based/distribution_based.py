@@ -1,14 +1,18 @@
-import tempfile
-from multiprocessing import Pool, get_context
+from multiprocessing import Pool
 from itertools import combinations
-from typing import List
+from typing import List, Optional
+
+import numpy as np
 
 from . import discovery
-from .clustering_utils import generate_global_ranks, process_columns, ingestion_column_generator, process_emd
+from ..distribution_based import CorrelationClusteringBackend
+from .clustering_utils import iter_global_ranks, process_emd
+from .column_store import DEFAULT_MEMORY_BUDGET, ColumnStore
 from ..base_matcher import BaseMatcher
 from ..match import Match
 from ...data_sources.base_column import BaseColumn
 from ...data_sources.base_table import BaseTable
+from ...data_sources.sampling import SamplingStrategy
 
 
 class DistributionBased(BaseMatcher):
@@ -42,7 +46,12 @@ class DistributionBased(BaseMatcher):
                  threshold1: float = 0.15,
                  threshold2: float = 0.15,
                  quantiles: int = 256,
-                 process_num: int = 1):
+                 process_num: int = 1,
+                 sample_size: Optional[int] = None,
+                 sampling_strategy: SamplingStrategy = SamplingStrategy.Reservoir,
+                 sampling_seed: int = 0,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 clustering_backend: CorrelationClusteringBackend = CorrelationClusteringBackend.EdgeSigns):
         """
         Parameters
         ----------
@@ -54,11 +63,31 @@ class DistributionBased(BaseMatcher):
             the number of quantiles of the histograms
         process_num: int
             The number of processes to spawn
+        sample_size: int, optional
+            If given, the distribution of every column is built from a sample of its values of this budget instead
+            of from all of them
+        sampling_strategy: SamplingStrategy, optional
+            The strategy of the samples (default is SamplingStrategy.Reservoir, which preserves the distribution)
+        sampling_seed: int, optional
+            The seed of the samples, for reproducible results (default is 0)
+        memory_budget: int, optional
+            The memory budget of the rank arrays of the columns in bytes, beyond which they are spilled to a
+            memory-mapped temporary file. The columns are ranked one at a time, so apart from the budget only the
+            distinct values of the tables and the ranks of one column are held in memory (default is 1 GiB)
+        clustering_backend: CorrelationClusteringBackend, optional
+            The backend of the correlation clustering of the attribute graphs: EdgeSigns, which gives the results
+            of the original integer program without a solver, or the Pivot approximation, which also weighs the
+            negative edges and can split the clusters that EdgeSigns merges (default is EdgeSigns)
         """
         self.__quantiles: int = int(quantiles)
         self.__threshold1: float = float(threshold1)
         self.__threshold2: float = float(threshold2)
         self.__process_num: int = int(process_num)
+        self.__sample_size: Optional[int] = sample_size
+        self.__sampling_strategy: SamplingStrategy = sampling_strategy
+        self.__sampling_seed: int = sampling_seed
+        self.__memory_budget: int = int(memory_budget)
+        self.__clustering_backend: CorrelationClusteringBackend = clustering_backend
         self.__column_names: list = []
         self.__target_name: str = ""
 
@@ -78,49 +107,34 @@ class DistributionBased(BaseMatcher):
         self.__target_name = target_input.name
 
         all_tables: List[BaseTable] = [source_input, target_input]
-        with tempfile.TemporaryDirectory() as tmp_folder_path:
-            data = []
-            for table in all_tables:
-                for column in table.get_columns():
-                    data.extend(column.data)
-            generate_global_ranks(data, tmp_folder_path)
-            del data
-
-            if self.__process_num == 1:
-                for table in all_tables:
-
-                    self.__column_names.extend([(table.name, table.unique_identifier,
-                                                 x.name, x.unique_identifier) for x in table.get_columns()
-                                                if not x.is_empty])
-
-                    columns: List[BaseColumn] = table.get_columns()
-                    for tup in ingestion_column_generator(columns,
-                                                          table.name,
-                                                          table.unique_identifier,
-                                                          self.__quantiles,
-                                                          tmp_folder_path):
-                        process_columns(tup)
-                matches = self.__find_matches(tmp_folder_path)
+        columns = [(table, column) for table in all_tables for column in table.get_columns() if not column.is_empty]
+        # The ranks and the histograms of the columns stay in memory for all the EMD computations. The columns are
+        # ranked one at a time, so that the ranks of a column are stored (or spilled) before the next one is ranked
+        column_ranks = iter_global_ranks(columns, lambda table_column: self.__get_column_data(table_column[1]))
+        with ColumnStore(self.__quantiles, self.__memory_budget) as column_store:
+            for (table, column), ranks in zip(columns, column_ranks):
+                long_name = (table.name, table.unique_identifier, column.name, column.unique_identifier)
+                self.__column_names.append(long_name)
+                column_store.add_column(long_name, ranks)
+
+            process_num = self._get_process_num(self.__process_num)
+            if process_num == 1:
+                matches = self.__find_matches(column_store)
             else:
-                with get_context("spawn").Pool(self.__process_num) as process_pool:
-                    for table in all_tables:
-                        self.__column_names.extend([(table.name, table.unique_identifier,
-                                                     x.name, x.unique_identifier) for x in table.get_columns()
-                                                    if not x.is_empty])
-                        columns: List[BaseColumn] = table.get_columns()
-                        process_pool.map(process_columns, ingestion_column_generator(columns,
-                                                                                     table.name,
-                                                                                     table.unique_identifier,
-                                                                                     self.__quantiles,
-                                                                                     tmp_folder_path), chunksize=1)
-                    matches = self.__find_matches_parallel(tmp_folder_path, process_pool)
+                process_pool = self._get_process_pool(process_num)
+                matches = self.__find_matches_parallel(column_store, process_pool)
 
         return matches
 
-    def __find_matches(self, tmp_folder_path: str):
+    def __get_column_data(self, column: BaseColumn) -> np.ndarray:
+        if self.__sample_size is None:
+            return column.values
+        return column.sample(self.__sample_size, self.__sampling_strategy, self.__sampling_seed)
+
+    def __find_matches(self, column_store: ColumnStore):
         connected_components = discovery.compute_distribution_clusters(self.__column_names,
                                                                        self.__threshold1,
-                                                                       tmp_folder_path,
+                                                                       column_store,
                                                                        self.__quantiles)
 
         all_attributes = list()
@@ -128,37 +142,39 @@ class DistributionBased(BaseMatcher):
         for components in connected_components:
             if len(components) > 1:
                 i = i + 1
-                edges = discovery.compute_attributes(list(components),
+                # In the order of the store, as the order of the sets of the connected components varies between runs
+                components = sorted(components, key=column_store.index)
+                edges = discovery.compute_attributes(components,
                                                      self.__threshold2,
-                                                     tmp_folder_path,
+                                                     column_store,
                                                      self.__quantiles)
-                all_attributes.append((list(components), edges))
+                all_attributes.append((components, edges))
 
         results = list()
         for components, edges in all_attributes:
-            results.append(discovery.correlation_clustering_pulp(components, edges))
+            results.append(discovery.correlation_clustering(components, edges, self.__clustering_backend))
 
         attribute_clusters = discovery.process_correlation_clustering_result(results, self.__column_names)
 
-        return self.__rank_output(attribute_clusters, tmp_folder_path)
+        return self.__rank_output(attribute_clusters, column_store)
 
     def __find_matches_parallel(self,
-                                tmp_folder_path: str,
+                                column_store: ColumnStore,
                                 pool: Pool):
         """
         "Main" function of [1] that will calculate first the distribution clusters and then the attribute clusters
 
         Parameters
         ---------
-        tmp_folder_path: str
-            The path of the temporary folder that will serve as a cache for the run
+        column_store: ColumnStore
+            The store that holds the ranks and the histograms of the columns
         pool: multiprocessing.Pool
             the process pool that will be used in the algorithms 1, 2 and 3 of [1]
         """
         connected_components = discovery.compute_distribution_clusters_parallel(self.__column_names,
                                                                                 self.__threshold1,
                                                                                 pool,
-                                                                                tmp_folder_path,
+                                                                                column_store,
                                                                                 self.__quantiles)
 
         all_attributes = list()
@@ -166,24 +182,26 @@ class DistributionBased(BaseMatcher):
         for components in connected_components:
             if len(components) > 1:
                 i = i + 1
-                edges = discovery.compute_attributes_parallel(list(components),
+                # In the order of the store, as the order of the sets of the connected components varies between runs
+                components = sorted(components, key=column_store.index)
+                edges = discovery.compute_attributes_parallel(components,
                                                               self.__threshold2,
                                                               pool,
-                                                              tmp_folder_path,
+                                                              column_store,
                                                               self.__quantiles)
-                all_attributes.append((list(components), edges))
+                all_attributes.append((components, edges))
 
         results = list()
         for components, edges in all_attributes:
-            results.append(discovery.correlation_clustering_pulp(components, edges))
+            results.append(discovery.correlation_clustering(components, edges, self.__clustering_backend))
 
         attribute_clusters = discovery.process_correlation_clustering_result(results, self.__column_names)
 
-        return self.__rank_output(attribute_clusters, tmp_folder_path)
+        return self.__rank_output(attribute_clusters, column_store)
 
     def __rank_output(self,
                       attribute_clusters: iter,
-                      tmp_folder_path: str):
+                      column_store: ColumnStore):
         """
         Take the attribute clusters that the algorithm produces and give a ranked list of matches based on the the EMD
         between each pair inside an attribute cluster . The ranked list will look like:
@@ -193,8 +211,8 @@ class DistributionBased(BaseMatcher):
         ----------
         attribute_clusters: list
             The attribute clusters
-        tmp_folder_path: str
-            The path of the temporary folder that will serve as a cache for the run
+        column_store: ColumnStore
+            The store that holds the ranks and the histograms of the columns
 
         Returns
         -------
@@ -205,14 +223,15 @@ class DistributionBased(BaseMatcher):
         for cluster in attribute_clusters:
             if len(cluster) < 2:
                 continue
-            for combination in combinations(cluster, 2):
+            for combination in combinations(sorted(cluster, key=column_store.index), 2):
                 table1 = combination[0][0]
                 table2 = combination[1][0]
                 if table1 != table2:
                     k, emd = process_emd(((combination[0], combination[1]),
+                                          (column_store.index(combination[0]), column_store.index(combination[1])),
                                           self.__quantiles,
                                           False,
-                                          tmp_folder_path))
+                                          column_store))
                     sim = 1 / (1 + emd)
                     tn_i, _, cn_i, _ = k[0]
                     tn_j, _, cn_j, _ = k[1]
@@ -0,0 +1,261 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .clustering_utils import get_rank_keys
+from .emd_utils import emd_1d
+from .quantile_histogram import bucket_counts
+from .quantile_sketch import DEFAULT_SKETCH_SIZE, QuantileSketch
+from ...data_sources.base_column import BaseColumn
+from ...data_sources.base_table import BaseTable
+
+
+class ColumnSummary(object):
+    """
+    The quantile sketches of the values of a column: one of the values that are numbers and one of the rest, as the
+    numbers and the strings are ranked separately
+    """
+
+    def __init__(self,
+                 sketch_size: int = DEFAULT_SKETCH_SIZE,
+                 seed: Optional[int] = 0):
+        self.numbers = QuantileSketch(sketch_size, seed)
+        self.strings = QuantileSketch(sketch_size, seed)
+
+    def update(self, values: np.ndarray):
+        numbers, strings = get_rank_keys(values)
+        self.numbers.update(numbers)
+        self.strings.update(strings)
+
+    def merge(self, other: 'ColumnSummary'):
+        self.numbers.merge(other.numbers)
+        self.strings.merge(other.strings)
+
+
+class DistributionIndex(object):
+    """
+    A class used to find the columns with similar value distributions in a whole corpus of tables, with the quantile
+    histograms and the EMD of DistributionBased, without recomputing everything when a table is added.
+
+    Every column is profiled once into a mergeable quantile sketch of its values, so a table is only read when it is
+    added (or when new rows of it are merged in with `update_table`). The global ranks are taken over the items that
+    the sketches of the corpus retain and are recomputed lazily, only when a table brings items that are not ranked
+    yet; the histograms of the columns are cached until then. Columns are identified by their (table_name,
+    column_name) pair, and the index can be pickled to keep it between sessions.
+
+    Attributes
+    ----------
+    quantiles : int
+        The number of quantiles of the histograms
+    sketch_size : int
+        The size of the quantile sketches of the columns
+
+    Methods
+    -------
+    add_table(table)
+        Add (or replace) the columns of a table to the index
+
+    update_table(table)
+        Merge the values of a table into the summaries of the indexed columns with the same names
+
+    query(table_name, column_name, k)
+        The k columns of other tables with the most similar distributions to an indexed column
+
+    similarity(column1, column2)
+        The similarity of the distributions of two indexed columns
+    """
+
+    def __init__(self,
+                 quantiles: int = 256,
+                 sketch_size: int = DEFAULT_SKETCH_SIZE,
+                 seed: Optional[int] = 0):
+        """
+        Parameters
+        ----------
+        quantiles : int, optional
+            The number of quantiles of the histograms (default is 256)
+        sketch_size : int, optional
+            The size of the quantile sketches of the columns, larger sketches are more accurate (default is 200)
+        seed : int, optional
+            The seed of the sketches (default is 0)
+        """
+        self.quantiles = int(quantiles)
+        self.sketch_size = int(sketch_size)
+        self.__seed = seed
+        self.__summaries: Dict[Tuple[str, str], ColumnSummary] = {}
+        # The sorted numbers and strings that the global ranks are taken over, None when they have to be recomputed
+        self.__ranked_keys: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        # The (ranks, weights, bucket_boundaries, histogram) of the columns for the current ranked keys
+        self.__histograms: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def __len__(self):
+        return len(self.__summaries)
+
+    def __contains__(self, column: Tuple[str, str]):
+        return column in self.__summaries
+
+    @property
+    def table_names(self) -> Set[str]:
+        return {table_name for table_name, _ in self.__summaries}
+
+    def add_table(self, table: BaseTable):
+        """
+        Add the columns of a table to the index, replacing the ones of a previously added table with the same name.
+        Empty columns are not indexed, since they have no distribution.
+
+        Parameters
+        ----------
+        table : BaseTable
+            The table to index
+        """
+        for column in table.get_columns():
+            key = (table.name, column.name)
+            if key in self.__summaries:
+                del self.__summaries[key]
+                self.__histograms.pop(key, None)
+            if not column.is_empty:
+                self.__insert(key, self.get_summary(column))
+
+    def update_table(self, table: BaseTable):
+        """
+        Merge the values of a table into the summaries of the indexed columns of the table with the same name, e.g.
+        for the new rows of a table that has been indexed. The columns that are not indexed yet are added.
+
+        Parameters
+        ----------
+        table : BaseTable
+            The table with the new values
+        """
+        for column in table.get_columns():
+            if column.is_empty:
+                continue
+            key = (table.name, column.name)
+            summary = self.get_summary(column)
+            if key in self.__summaries:
+                summary.merge(self.__summaries.pop(key))
+                self.__histograms.pop(key, None)
+            self.__insert(key, summary)
+
+    def get_summary(self, column: BaseColumn) -> ColumnSummary:
+        """
+        Profile the values of a column into its quantile sketches
+
+        Parameters
+        ----------
+        column : BaseColumn
+            The column
+
+        Returns
+        -------
+        ColumnSummary
+            The sketches of the numbers and the strings of the column
+        """
+        summary = ColumnSummary(self.sketch_size, self.__seed)
+        summary.update(column.values)
+        return summary
+
+    def query(self,
+              table_name: str,
+              column_name: str,
+              k: int = 10) -> List[Tuple[Tuple[str, str], float]]:
+        """
+        The columns of other tables whose distributions are the most similar to that of an indexed column, with the
+        similarity 1 / (1 + EMD) of DistributionBased over the buckets of the histogram of the column
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table of the column
+        column_name : str
+            The name of the column
+        k : int, optional
+            The number of columns to return (default is 10)
+
+        Returns
+        -------
+        list
+            The ((table_name, column_name), similarity) of at most k columns, most similar first. Columns without
+            any values in the range of the histogram are left out.
+        """
+        key = (table_name, column_name)
+        if key not in self.__summaries:
+            return []
+        candidates = [candidate for candidate in self.__summaries if candidate[0] != table_name]
+        similarities = 1 / (1 + self.__get_emds(key, candidates))
+        order = np.argsort(-similarities, kind='stable')[:k]
+        return [(candidates[i], float(similarities[i])) for i in order if similarities[i] > 0]
+
+    def similarity(self,
+                   column1: Tuple[str, str],
+                   column2: Tuple[str, str]) -> float:
+        """
+        The similarity 1 / (1 + EMD) of the distributions of two indexed columns, over the buckets of the first
+
+        Parameters
+        ----------
+        column1 : tuple
+            The (table_name, column_name) of the first column
+        column2 : tuple
+            The (table_name, column_name) of the second column
+
+        Returns
+        -------
+        float
+            The similarity, 0 if the second column has no values in the range of the histogram of the first
+        """
+        return float(1 / (1 + self.__get_emds(column1, [column2])[0]))
+
+    def __insert(self, key: Tuple[str, str], summary: ColumnSummary):
+        self.__summaries[key] = summary
+        if self.__ranked_keys is None:
+            return
+        # The ranks only have to be recomputed if the column has items that are not ranked yet
+        numbers, strings = self.__ranked_keys
+        if not (np.isin(summary.numbers.get_items()[0], numbers).all()
+                and np.isin(summary.strings.get_items()[0], strings).all()):
+            self.__ranked_keys = None
+            self.__histograms = {}
+
+    def __get_ranked_keys(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self.__ranked_keys is None:
+            summaries = self.__summaries.values()
+            numbers = [summary.numbers.get_items()[0] for summary in summaries]
+            strings = [summary.strings.get_items()[0] for summary in summaries]
+            self.__ranked_keys = (np.unique(np.concatenate(numbers + [np.empty(0, dtype=np.float64)])),
+                                  np.unique(np.concatenate(strings + [np.empty(0, dtype=object)])))
+            self.__histograms = {}
+        return self.__ranked_keys
+
+    def __get_histogram(self, key: Tuple[str, str]):
+        if key not in self.__histograms:
+            numbers, strings = self.__get_ranked_keys()
+            summary = self.__summaries[key]
+            number_items, number_weights = summary.numbers.get_items()
+            string_items, string_weights = summary.strings.get_items()
+            # The numbers are ranked before the strings, as in DistributionBased, so the ranks are sorted
+            ranks = np.concatenate([np.searchsorted(numbers, number_items) + 1,
+                                    np.searchsorted(strings, string_items) + 1 + len(numbers)])
+            weights = np.concatenate([number_weights, string_weights])
+            # The weighted inclusive quantiles of the ranks give the bucket boundaries, as in QuantileHistogram
+            cumulative_weights = np.cumsum(weights)
+            targets = np.arange(1, self.quantiles + 1) / (self.quantiles + 1) * cumulative_weights[-1]
+            quantiles = ranks[np.minimum(np.searchsorted(cumulative_weights, targets), len(ranks) - 1)]
+            bucket_boundaries = np.concatenate([[ranks[0]], np.unique(np.round(quantiles, 3))]).astype(np.float64)
+            counts = bucket_counts(bucket_boundaries, ranks, weights)
+            self.__histograms[key] = (ranks, weights, bucket_boundaries, counts / counts.sum())
+        return self.__histograms[key]
+
+    def __get_emds(self,
+                   key: Tuple[str, str],
+                   candidates: List[Tuple[str, str]]) -> np.ndarray:
+        distances = np.full(len(candidates), np.inf)
+        if not candidates:
+            return distances
+        _, _, bucket_boundaries, histogram = self.__get_histogram(key)
+        counts = np.stack([bucket_counts(bucket_boundaries, *self.__get_histogram(candidate)[:2])
+                           for candidate in candidates])
+        totals = counts.sum(axis=1)
+        non_empty = totals > 0
+        if non_empty.any():
+            distances[non_empty] = emd_1d(histogram, counts[non_empty] / totals[non_empty, np.newaxis])
+        return distances
@@ -1,13 +1,108 @@
 import math
-from ot import emd2
+from typing import List
+
+import numpy as np
 
 from .column_model import CorrelationClusteringColumn
-from .quantile_histogram import QuantileHistogram
+from .quantile_histogram import QuantileHistogram, bucket_counts, calc_dist_matrix
+
+
+def emd_1d(reference: np.ndarray,
+           histograms: np.ndarray,
+           exact: bool = False) -> np.ndarray:
+    """
+    Computes the EMD of a normalized reference histogram to every normalized histogram of a stack that shares its
+    buckets, with the |i - j| / n_buckets ground distance of the buckets. In one dimension the EMD is the L1 distance
+    of the cumulative histograms, so the whole stack is handled with a single cumulative sum.
+
+    Parameters
+    ---------
+    reference : ndarray
+        The (n_buckets,) reference histogram
+    histograms : ndarray
+        The (n_histograms, n_buckets) histograms, or a single (n_buckets,) one
+    exact : bool, optional
+        Solve the transportation problem of every histogram with POT's linear program solver instead, which gives
+        the same result up to floating point error and is meant for validation (default is False)
+
+    Returns
+    -------
+    ndarray
+        The EMD of the reference to every histogram, a 0-d array for a single histogram
+    """
+    n_buckets = reference.shape[-1]
+    if exact:
+        # POT (and SciPy with it) takes most of a second to import, which every worker process would pay otherwise
+        from ot import emd2
+        dist_matrix = np.array(calc_dist_matrix(n_buckets))
+        stack = np.atleast_2d(histograms)
+        distances = np.array([emd2(reference, histogram, dist_matrix) for histogram in stack], dtype=np.float64)
+        return distances.reshape(np.shape(histograms)[:-1])
+    return np.abs(np.cumsum(histograms - reference, axis=-1)[..., :-1]).sum(axis=-1) / n_buckets
+
+
+def quantile_emds(column1: CorrelationClusteringColumn,
+                  columns: List[CorrelationClusteringColumn],
+                  exact: bool = False) -> np.ndarray:
+    """
+    Computes the EMD of the quantile histogram of a column to the histograms of all the given columns, over the
+    buckets of the first column
+
+    Parameters
+    ---------
+    column1 : Column
+        The column whose quantile histogram is the reference
+    columns : list(Column)
+        The columns that are binned in the buckets of the reference
+    exact : bool, optional
+        Compute the EMDs with the exact linear program solver (default is False)
+
+    Returns
+    -------
+    ndarray
+        The EMD of column1 to every column, inf for the empty columns and the ones with no values in the buckets
+    """
+    if column1.size == 0:
+        return np.full(len(columns), math.inf)
+    return histogram_emds(column1.quantile_histogram, [column.ranks for column in columns], exact)
+
+
+def histogram_emds(histogram: QuantileHistogram,
+                   rank_arrays: List[np.ndarray],
+                   exact: bool = False) -> np.ndarray:
+    """
+    Computes the EMD of a quantile histogram to the histograms of the given sorted rank arrays over its buckets
+
+    Parameters
+    ---------
+    histogram : QuantileHistogram
+        The reference histogram
+    rank_arrays : list(ndarray)
+        The sorted ranks that are binned in the buckets of the reference
+    exact : bool, optional
+        Compute the EMDs with the exact linear program solver (default is False)
+
+    Returns
+    -------
+    ndarray
+        The EMD of the histogram to every rank array, inf for the ones with no values in the buckets
+    """
+    distances = np.full(len(rank_arrays), math.inf)
+    if not rank_arrays:
+        return distances
+    h1 = histogram.get_values / histogram.get_values.sum()
+    counts = np.stack([bucket_counts(histogram.bucket_boundaries, ranks) for ranks in rank_arrays])
+    totals = counts.sum(axis=1)
+    non_empty = totals > 0
+    if non_empty.any():
+        distances[non_empty] = emd_1d(h1, counts[non_empty] / totals[non_empty, np.newaxis], exact)
+    return distances
 
 
 def quantile_emd(column1: CorrelationClusteringColumn,
                  column2: CorrelationClusteringColumn,
-                 quantiles: int = 256):
+                 quantiles: int = 256,
+                 exact: bool = False):
     """
     Computes the Earth Mover's Distance (EMD) over two column quantile histograms
 
@@ -22,28 +117,19 @@ def quantile_emd(column1: CorrelationClusteringColumn,
         The second column that we create its quantile histogram by doing a linear scan over the first's
     quantiles: int, optional
         The number of quantiles that the histograms are split on (default is 256)
+    exact : bool, optional
+        Compute the EMD with the exact linear program solver (default is False)
 
     Returns
     -------
     float
         the EMD value between column1 and column2
     """
-    if column1.size == 0 or column2.size == 0:
-        return math.inf
-
-    histogram1 = column1.quantile_histogram
-    histogram2 = QuantileHistogram(column2.long_name, column2.ranks, column2.size, quantiles,
-                                   reference_hist=histogram1)
-    if histogram2.is_empty:
-        return math.inf
-    h1 = histogram1.get_values/histogram1.get_values.sum()
-    h2 = histogram2.get_values/histogram2.get_values.sum()
-    return emd2(h1, h2, histogram1.dist_matrix)
+    return float(quantile_emds(column1, [column2], exact)[0])
 
 
 def intersection_emd(column1: CorrelationClusteringColumn,
                      column2: CorrelationClusteringColumn,
-                     tmp_folder_path: str,
                      quantiles: int = 256):
     """
     Computes the intersection Earth Mover's Distance (EMD) over two column quantile histograms as described in
@@ -60,8 +146,6 @@ def intersection_emd(column1: CorrelationClusteringColumn,
         The first column
     column2 : Column
         The second column
-    tmp_folder_path: str
-        The path of the temporary folder that will serve as a cache for the run
     quantiles: int, optional
         The number of quantiles that the histograms are split on (default is 256)
 
@@ -70,22 +154,18 @@ def intersection_emd(column1: CorrelationClusteringColumn,
     float
         the intersection EMD value between column1 and column2
     """
-    common_elements = set(list(column1.data)).intersection(set(list(column2.data)))
+    # The global ranks identify the values, so the intersection is taken on the sorted ranks of the columns
+    common_elements = np.intersect1d(column1.ranks, column2.ranks)
 
     # If the two columns do not share any common elements return inf
     if len(common_elements) == 0:
         return math.inf
 
-    # The intersection of the two columns
-    intersection = [x for x in list(column1.data) + list(column2.data)
-                    if x in common_elements]
-    intersection_column = CorrelationClusteringColumn(
-        "", f"Intersection of {column1.long_name} {column2.long_name}",
-        intersection, "", "", tmp_folder_path)
-
-    e1 = quantile_emd(column1, intersection_column, quantiles)
-    e2 = quantile_emd(column2, intersection_column, quantiles)
+    # The values of both columns that are in the intersection, with their multiplicities
+    intersection = np.sort(np.concatenate([column1.ranks[np.isin(column1.ranks, common_elements)],
+                                           column2.ranks[np.isin(column2.ranks, common_elements)]]))
 
-    del common_elements, intersection, intersection_column
+    e1 = histogram_emds(column1.quantile_histogram, [intersection])[0]
+    e2 = histogram_emds(column2.quantile_histogram, [intersection])[0]
 
-    return (e1 + e2) / 2
+    return float((e1 + e2) / 2)
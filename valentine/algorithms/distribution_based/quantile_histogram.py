@@ -1,16 +1,24 @@
-from statistics import quantiles
+from functools import lru_cache
+from typing import Optional
+
 from numpy import ndarray
 import numpy as np
 
 
 class QuantileHistogram(object):
     """
-    A class used to represent an equi-depth quantile histogram
+    A class used to represent an equi-depth quantile histogram, backed by numpy arrays
 
     Attributes
     ----------
     name : str
         The column name
+    bucket_boundaries : ndarray
+        The n_buckets + 1 sorted boundaries of the buckets: the i-th bucket holds the values in
+        [bucket_boundaries[0], bucket_boundaries[1]] for i = 0 and in (bucket_boundaries[i], bucket_boundaries[i + 1]]
+        for the rest
+    bucket_values : ndarray
+        The normalized number of values in every bucket
 
     Methods
     -------
@@ -20,20 +28,11 @@ class QuantileHistogram(object):
     is_empty()
         Returns if the histogram is empty
 
-    add_buckets(min_val: int, bb: list)
-        Create the buckets with the given bucket boundaries
-
     add_values(values, norm=True)
         Add all values to buckets
 
-    normalize_values()
-        Normalize the bucket values based on the normalization factor
-
-    bucket_binary_search(x)
-        Find in which bucket the specific value falls into using binary search
-
-    calc_dist_matrix()
-         Compute the distance matrix between all buckets.
+    dist_matrix()
+        The distance matrix between all buckets, shared by all the histograms with the same number of buckets
     """
 
     def __init__(self,
@@ -48,7 +47,7 @@ class QuantileHistogram(object):
         name : tuple
             The column name (table_name, column_name)
         ranks : ndarray
-            The column's ranked data
+            The column's sorted ranked data
         normalization : int
             The number that normalizes the histogram values
         n_quantiles : int
@@ -56,22 +55,18 @@ class QuantileHistogram(object):
         reference_hist : QuantileHistogram, optional
             The reference histogram that provides the bucket boundaries
         """
-        self.bucket_boundaries = {}
-        self.bucket_values = {}
         self.name = name
         self.normalization_factor = normalization
         self.quantiles = n_quantiles
+        ranks = np.asarray(ranks)
         if reference_hist is None:
-            bucket = [round(q, 3) for q in quantiles(ranks, n=self.quantiles + 1, method='inclusive')] \
-                if len(ranks) > 1 else ranks
-
-            self.add_buckets(min(ranks), list(set(bucket)))
-            self.add_values(ranks)
+            # The inclusive quantiles at i / (n_quantiles + 1), rounded and deduplicated (np.unique sorts them)
+            bucket = np.unique(np.round(np.quantile(ranks, np.arange(1, self.quantiles + 1) / (self.quantiles + 1)), 3))
+            self.bucket_boundaries = np.concatenate([[ranks.min()], bucket]).astype(np.float64)
         else:
             self.bucket_boundaries = reference_hist.bucket_boundaries
-            self.add_values(ranks)
-        self.n_buckets = len(self.bucket_boundaries)
-        self.dist_matrix = self.calc_dist_matrix()
+        self.n_buckets = len(self.bucket_boundaries) - 1
+        self.add_values(ranks)
 
     @property
     def get_values(self):
@@ -83,7 +78,7 @@ class QuantileHistogram(object):
         ndarray
             The values inside the histogram
         """
-        return np.array(list(self.bucket_values.values()))
+        return self.bucket_values
 
     @property
     def is_empty(self):
@@ -97,93 +92,75 @@ class QuantileHistogram(object):
         """
         return np.sum(self.get_values) == 0
 
-    def add_buckets(self,
-                    min_val: int,
-                    bb: list):
-        """
-        Create the buckets with the given bucket boundaries
-
-        Parameters
-        ----------
-        min_val: int
-            The minimum value of the histogram
-        bb: list
-            List containing the bucket boundaries
-        """
-        self.bucket_boundaries[0] = (min_val, bb[0])
-        i = 0
-        while i < len(bb) - 1:
-            self.bucket_boundaries[i+1] = (bb[i], bb[i+1])
-            i = i + 1
+    @property
+    def dist_matrix(self):
+        return calc_dist_matrix(self.n_buckets)
 
     def add_values(self,
-                   values,
+                   values: ndarray,
                    norm=True):
         """
-        Add all values to buckets
+        Add all values to buckets, the values outside the boundaries are left out. A value that equals the boundary
+        of two buckets goes to the first one.
 
         Parameters
         ----------
         values: ndarray
-            The ranks to be added to the histogram
+            The sorted ranks to be added to the histogram
         norm: bool, optional
             Normalize the bucket values or not
         """
-        for i in range(len(self.bucket_boundaries.values())):
-            self.bucket_values[i] = 0.0
-        for value in values:
-            idx = self.bucket_binary_search(value)
-            if idx != -1:
-                self.bucket_values[idx] = self.bucket_values[idx] + 1.0
+        self.bucket_values = bucket_counts(self.bucket_boundaries, values)
         if norm:
-            self.normalize_values()
+            self.bucket_values /= self.normalization_factor
 
-    def normalize_values(self):
-        """
-        Normalize the bucket values based on the normalization factor
-        """
-        self.bucket_values = {k: v / self.normalization_factor for k, v in self.bucket_values.items()}
 
-    def bucket_binary_search(self, x):
-        """
-        Find in which bucket the specific value falls into using binary search
-        Parameters
-        ----------
-        x: int
-            The input value
+def bucket_counts(bucket_boundaries: ndarray,
+                  values: ndarray,
+                  weights: Optional[ndarray] = None) -> ndarray:
+    """
+    Count the sorted values that fall in each of the buckets with the given boundaries
 
-        Returns
-        -------
-        int
-            The bucket index that the value falls into or -1 if it does not fit in anyone
-        """
-        left = 0
-        right = len(self.bucket_boundaries) - 1
-        while left <= right:
-            mid = left + (right - left) // 2
-            if self.bucket_boundaries[mid][0] <= x <= self.bucket_boundaries[mid][1]:
-                return mid
-            elif self.bucket_boundaries[mid][1] < x:
-                left = mid + 1
-            else:
-                right = mid - 1
-        return -1
-
-    def calc_dist_matrix(self):
-        """
-        Compute the distance matrix between all buckets.
-        E.g. with 256 buckets the matrix will be 256x256
+    Parameters
+    ----------
+    bucket_boundaries: ndarray
+        The n_buckets + 1 sorted boundaries of the buckets
+    values: ndarray
+        The sorted values
+    weights: ndarray, optional
+        The weight of every value, e.g. of the items of a quantile sketch (default is 1 for all)
+
+    Returns
+    -------
+    ndarray
+        The float64 number (or total weight) of values in every bucket
+    """
+    # As the values are sorted, the number of values up to each upper boundary gives the bucket counts at once
+    upper_counts = np.searchsorted(values, bucket_boundaries[1:], side='right')
+    lower_count = np.searchsorted(values, bucket_boundaries[0], side='left')
+    if weights is not None:
+        cumulative_weights = np.concatenate([[0.0], np.cumsum(weights, dtype=np.float64)])
+        return np.diff(cumulative_weights[upper_counts], prepend=cumulative_weights[lower_count])
+    return np.diff(upper_counts, prepend=lower_count).astype(np.float64)
 
-        Returns
-        -------
-        ndarray
-            The distances between the buckets
-        """
-        q = np.array(list(range(1, self.n_buckets + 1))) / self.n_buckets
-        dist = []
-        for i in q:
-            temp = []
-            for j in q:
-                temp.append(abs(i - j))
-            dist.append(temp)
-        return np.array(dist)
+
+@lru_cache(maxsize=16)
+def calc_dist_matrix(n_buckets: int) -> ndarray:
+    """
+    Compute the distance matrix between all buckets.
+    E.g. with 256 buckets the matrix will be 256x256
+
+    Parameters
+    ----------
+    n_buckets: int
+        The number of buckets
+
+    Returns
+    -------
+    ndarray
+        The distances between the buckets, read-only since it is shared
+    """
+    q = np.arange(1, n_buckets + 1) / n_buckets
+    dist = np.abs(q[:, np.newaxis] - q[np.newaxis, :])
+    dist.flags.writeable = False
+    return dist
@@ -0,0 +1,112 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# The default number of items of the top level compactor, which bounds the rank error to about 1.7 / k
+DEFAULT_SKETCH_SIZE = 200
+MIN_COMPACTOR_SIZE = 2
+
+
+class QuantileSketch(object):
+    """
+    A mergeable quantile summary of a stream of values in the style of the KLL sketch of Karnin, Lang and Liberty.
+
+    The values are kept in a hierarchy of compactors, where an item of level h stands for 2^h values. When a level
+    exceeds its capacity it is sorted and every other item, starting from a random one of the first two, is promoted
+    to the next level. The capacities shrink geometrically towards the lower levels, so the sketch retains
+    O(k) items no matter how many values it has seen. Sketches of the same kind of values merge level by level, which
+    gives the same guarantees as sketching the union of their streams.
+
+    Attributes
+    ----------
+    k : int
+        The capacity of the top level compactor
+    n : int
+        The number of values that have been added
+
+    Methods
+    -------
+    update(values)
+        Add an array of values to the sketch
+
+    merge(other)
+        Add all the values of another sketch to this one
+
+    get_items()
+        The retained items, sorted, with their weights
+    """
+
+    def __init__(self,
+                 k: int = DEFAULT_SKETCH_SIZE,
+                 seed: Optional[int] = 0):
+        """
+        Parameters
+        ----------
+        k : int, optional
+            The capacity of the top level compactor (default is 200)
+        seed : int, optional
+            The seed of the compactions, so that the sketch of a stream is reproducible (default is 0)
+        """
+        self.k = max(int(k), MIN_COMPACTOR_SIZE)
+        self.n = 0
+        self.__rng = np.random.default_rng(seed)
+        self.__compactors: List[np.ndarray] = []
+
+    def __len__(self):
+        return sum(len(compactor) for compactor in self.__compactors)
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values)
+        if len(values) == 0:
+            return
+        if not self.__compactors:
+            self.__compactors.append(values[:0])
+        self.__compactors[0] = np.concatenate([self.__compactors[0], values])
+        self.n += len(values)
+        self.__compress()
+
+    def merge(self, other: 'QuantileSketch'):
+        for level, items in enumerate(other.__compactors):
+            if level == len(self.__compactors):
+                self.__compactors.append(items[:0])
+            self.__compactors[level] = np.concatenate([self.__compactors[level], items])
+        self.n += other.n
+        self.__compress()
+
+    def get_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The items that the sketch retains, sorted, with the number of values that every one of them stands for
+
+        Returns
+        -------
+        tuple
+            The sorted items and their int64 weights
+        """
+        if not self.__compactors:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        items = np.concatenate(self.__compactors)
+        weights = np.concatenate([np.full(len(compactor), 1 << level, dtype=np.int64)
+                                  for level, compactor in enumerate(self.__compactors)])
+        order = np.argsort(items, kind='stable')
+        return items[order], weights[order]
+
+    def __capacity(self, level: int) -> int:
+        depth = len(self.__compactors) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), MIN_COMPACTOR_SIZE)
+
+    def __compress(self):
+        level = 0
+        while level < len(self.__compactors):
+            if len(self.__compactors[level]) <= self.__capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.__compactors):
+                self.__compactors.append(self.__compactors[level][:0])
+            items = np.sort(self.__compactors[level])
+            # An odd item out stays at its level
+            kept = items[len(items) - len(items) % 2:]
+            promoted = items[:len(items) - len(kept)][self.__rng.integers(2)::2]
+            self.__compactors[level] = kept
+            self.__compactors[level + 1] = np.concatenate([self.__compactors[level + 1], promoted])
+            # A new level lowers the capacities of the levels below it
+            level = 0
@@ -0,0 +1,158 @@
+import math
+from typing import Dict, FrozenSet, Iterator, Tuple
+
+import numpy as np
+
+from ..jaccard_distance import StringDistanceFunction
+
+# Slack that keeps the filters conservative under floating point rounding
+EPSILON = 1e-9
+
+
+class FilteringIndex(object):
+    """
+    A class used to generate the candidate strings of a column that could be within a string distance threshold of a
+    given string, so that the string distance function is only called on the pairs that survive the filters.
+
+    The strings are kept sorted by length, which turns the length filter into a contiguous range of string ids. For
+    the edit distance functions an inverted index of q-grams is used on top of that as a count filter: if two
+    strings are within edit distance k they share at least max(|s1|, |s2|) - q + 1 - k * w q-grams, where w is the
+    number of q-grams a single edit operation can destroy. The q-grams are tagged with their occurrence number so
+    that the set intersection of the tagged q-grams equals the multiset intersection of the plain ones.
+
+    Attributes
+    ----------
+    values : frozenset
+        The distinct stringified values of the column
+    q : int
+        The length of the q-grams
+
+    Methods
+    -------
+    candidates(s, threshold, distance_function)
+        Yields the strings of the index that pass the filters for the given string
+    """
+
+    def __init__(self,
+                 values: FrozenSet[str],
+                 q: int = 2):
+        """
+        Parameters
+        ----------
+        values : frozenset
+            The distinct stringified values of the column
+        q : int, optional
+            The length of the q-grams (default is 2)
+        """
+        self.values = values
+        self.q = q
+        self.__strings = None
+        self.__lengths = None
+        self.__postings = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def candidates(self,
+                   s: str,
+                   threshold: float,
+                   distance_function: StringDistanceFunction) -> Iterator[str]:
+        """
+        Yields the strings of the index that could be within the threshold of the given string
+
+        Parameters
+        ----------
+        s : str
+            The string to find the candidates of
+        threshold : float
+            The acceptance threshold of the (normalized) similarity
+        distance_function : StringDistanceFunction
+            The string distance function that the candidates will be verified with
+
+        Returns
+        -------
+        generator
+            A generator of the candidate strings
+        """
+        if self.__strings is None:
+            self.__build()
+
+        min_len, max_len = self.__length_range(len(s), threshold, distance_function)
+        lo = int(np.searchsorted(self.__lengths, min_len, side='left'))
+        hi = int(np.searchsorted(self.__lengths, max_len, side='right'))
+        if lo >= hi:
+            return
+
+        if distance_function in (StringDistanceFunction.Levenshtein, StringDistanceFunction.DamerauLevenshtein,
+                                 StringDistanceFunction.Hamming):
+            ids = self.__count_filter(s, threshold, distance_function, lo, hi)
+        else:
+            ids = range(lo, hi)
+
+        strings = self.__strings
+        for i in ids:
+            yield strings[i]
+
+    def __build(self):
+        self.__strings = sorted(self.values, key=len)
+        self.__lengths = np.fromiter((len(s) for s in self.__strings), dtype=np.int64, count=len(self.__strings))
+        postings: Dict[Tuple[str, int], list] = {}
+        for i, s in enumerate(self.__strings):
+            for gram in self.__tagged_qgrams(s):
+                postings.setdefault(gram, []).append(i)
+        self.__postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    def __tagged_qgrams(self, s: str):
+        seen: Dict[str, int] = {}
+        for i in range(len(s) - self.q + 1):
+            gram = s[i:i + self.q]
+            occurrence = seen.get(gram, 0)
+            seen[gram] = occurrence + 1
+            yield gram, occurrence
+
+    @staticmethod
+    def __length_range(length: int,
+                       threshold: float,
+                       distance_function: StringDistanceFunction) -> Tuple[float, float]:
+        """
+        The range of lengths a string can have to be within the threshold of a string with the given length
+        """
+        if distance_function in (StringDistanceFunction.Jaro, StringDistanceFunction.JaroWinkler):
+            # jaro <= (2 + min_len / max_len) / 3 and jaro_winkler <= 0.6 * jaro + 0.4
+            if distance_function == StringDistanceFunction.Jaro:
+                ratio = 3 * threshold - 2
+            else:
+                ratio = 5 * threshold - 4
+            if ratio <= 0:
+                return 0, math.inf
+            return math.ceil(length * ratio - EPSILON), math.floor(length / ratio + EPSILON)
+        # The edit distance is at least the length difference and may be at most (1 - threshold) * max_len
+        if threshold <= 0:
+            return 0, math.inf
+        return math.ceil(length * threshold - EPSILON), math.floor(length / threshold + EPSILON)
+
+    def __count_filter(self,
+                       s: str,
+                       threshold: float,
+                       distance_function: StringDistanceFunction,
+                       lo: int,
+                       hi: int):
+        lengths = self.__lengths[lo:hi]
+        max_lengths = np.maximum(lengths, len(s))
+        max_distances = np.floor((1 - threshold) * np.maximum(max_lengths, 1) + EPSILON)
+        # A transposition can destroy one q-gram more than an insertion, deletion or substitution
+        destroyed = self.q + 1 if distance_function == StringDistanceFunction.DamerauLevenshtein else self.q
+        required = max_lengths - self.q + 1 - max_distances * destroyed
+        if required.max() <= 0:
+            return range(lo, hi)
+
+        postings = []
+        for gram in self.__tagged_qgrams(s):
+            ids = self.__postings.get(gram)
+            if ids is not None:
+                postings.append(ids[np.searchsorted(ids, lo):np.searchsorted(ids, hi)])
+        if postings:
+            counts = np.bincount(np.concatenate(postings) - lo, minlength=hi - lo)
+        else:
+            counts = np.zeros(hi - lo, dtype=np.int64)
+        return (np.flatnonzero(counts >= required) + lo).tolist()
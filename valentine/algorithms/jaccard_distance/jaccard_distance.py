@@ -1,16 +1,29 @@
 from itertools import product
-from multiprocessing import get_context
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
+import pandas as pd
 from jellyfish import levenshtein_distance, damerau_levenshtein_distance, \
                       jaro_similarity, jaro_winkler_similarity, hamming_distance
 
 from ..jaccard_distance import StringDistanceFunction
+from .filtering_index import FilteringIndex
+from .minhash_lsh import MinHashLSHIndex
+from .shared_values import SharedColumnHandle, SharedColumnValues, get_shared_index
 
 from ..base_matcher import BaseMatcher
 from ..match import Match
+from ...data_sources.base_column import BaseColumn
 from ...data_sources.base_table import BaseTable
-from ...utils.utils import normalize_distance
+from ...data_sources.sampling import SamplingStrategy
+
+# The string distance function to use and whether its output is a distance that needs to be normalized
+DISTANCE_FUNCTIONS = {
+    StringDistanceFunction.Levenshtein: (levenshtein_distance, True),
+    StringDistanceFunction.DamerauLevenshtein: (damerau_levenshtein_distance, True),
+    StringDistanceFunction.Hamming: (hamming_distance, True),
+    StringDistanceFunction.Jaro: (jaro_similarity, False),
+    StringDistanceFunction.JaroWinkler: (jaro_winkler_similarity, False),
+}
 
 
 class JaccardDistanceMatcher(BaseMatcher):
@@ -18,6 +31,9 @@ class JaccardDistanceMatcher(BaseMatcher):
     Class containing the methods for implementing a simple baseline matcher that uses Jaccard Similarity between
     columns to assess their correspondence score, enhanced by a string distance measure.
 
+    The columns are compared as sets of the string forms of their distinct values, so values that only differ in
+    type, e.g. 1 and '1' in a column of mixed types, are a single value.
+
     Methods
     -------
     jaccard_distance(list1, list2, threshold, process_pool)
@@ -27,7 +43,11 @@ class JaccardDistanceMatcher(BaseMatcher):
     def __init__(self,
                  threshold_dist: float = 0.8,
                  distance_fun: StringDistanceFunction = StringDistanceFunction.Levenshtein,
-                 process_num: int = 1):
+                 process_num: int = 1,
+                 lsh_index: Optional[MinHashLSHIndex] = None,
+                 sample_size: Optional[int] = None,
+                 sampling_strategy: SamplingStrategy = SamplingStrategy.Distinct,
+                 sampling_seed: int = 0):
         """
         Parameters
         ----------
@@ -35,80 +55,68 @@ class JaccardDistanceMatcher(BaseMatcher):
             The acceptance threshold for two strings to be considered as equal
         process_num : int, optional
             Te number of processes to spawn
+        lsh_index : MinHashLSHIndex, optional
+            An index of column signatures; if given, only the column pairs of the two tables that share a band of
+            its LSH banding are compared. The signatures of the tables added to the index are reused, the ones of
+            any other table are computed from its values and the index is not modified. The candidates are exact for the Exact distance function up
+            to the LSH recall, and an approximation for the fuzzy ones.
+        sample_size : int, optional
+            If given, every column is compared on a sample of its values of this budget instead of on all of them
+        sampling_strategy : SamplingStrategy, optional
+            The strategy of the samples (default is SamplingStrategy.Distinct, which keeps the same values in every
+            column so that the Jaccard similarity of the samples estimates that of the columns)
+        sampling_seed : int, optional
+            The seed of the samples, for reproducible results (default is 0)
         """
         self.__threshold_dist = float(threshold_dist)
         self.__process_num = int(process_num)
         self.__distance_function = distance_fun
+        self.__lsh_index = lsh_index
+        self.__sample_size = sample_size
+        self.__sampling_strategy = sampling_strategy
+        self.__sampling_seed = sampling_seed
 
     def get_matches(self,
                     source_input: BaseTable,
                     target_input: BaseTable) -> Dict[Tuple[Tuple[str, str], Tuple[str, str]], float]:
-        source_id = source_input.unique_identifier
-        target_id = target_input.unique_identifier
         matches = {}
-        if self.__process_num == 1:
-            for combination in self.__get_column_combinations(source_input,
-                                                              target_input,
-                                                              self.__threshold_dist,
-                                                              target_id,
-                                                              source_id,
-                                                              self.__distance_function):
+        process_num = self._get_process_num(self.__process_num)
+        if process_num == 1:
+            for combination in self.__get_column_combinations(source_input, target_input):
                 matches.update(self.process_jaccard_distance(combination))
         else:
-            with get_context("spawn").Pool(self.__process_num) as process_pool:
-                matches = {}
+            process_pool = self._get_process_pool(process_num)
+            # The column values are placed once in shared memory and the tasks only carry handles to them
+            with SharedColumnValues(self.__get_shared_column_values(source_input, target_input)) as shared_values:
                 list_of_matches = process_pool.map(self.process_jaccard_distance,
-                                                   self.__get_column_combinations(source_input,
-                                                                                  target_input,
-                                                                                  self.__threshold_dist,
-                                                                                  target_id,
-                                                                                  source_id,
-                                                                                  self.__distance_function))
-                for match in list_of_matches:
-                    matches.update(match)
+                                                   self.__get_column_combinations(source_input, target_input,
+                                                                                  shared_values))
+            for match in list_of_matches:
+                matches.update(match)
         # Remove the pairs with zero similarity
         matches = {k: v for k, v in matches.items() if v > 0.0}
         return matches
 
     def process_jaccard_distance(self, tup: tuple):
 
-        source_data, target_data, threshold, _, target_table_name, _, \
-            target_column_name, _, source_table_name, _, \
-            _, source_column_name, _, distance_function = tup
+        source_values, target_values, target_table_name, target_column_name, \
+            source_table_name, source_column_name = tup
 
-        if len(set(source_data)) < len(set(target_data)):
-            set1 = set(source_data)
-            set2 = set(target_data)
+        if isinstance(source_values, SharedColumnHandle):
+            source_values = get_shared_index(source_values)
+            target_values = get_shared_index(target_values)
+
+        if len(source_values) < len(target_values):
+            set1 = source_values
+            set2 = target_values
         else:
-            set1 = set(target_data)
-            set2 = set(source_data)
-
-        if distance_function == StringDistanceFunction.Exact:
-            threshold = 1.0
-        combinations = self.__get_set_combinations(set1, set2, threshold)
-
-        intersection_cnt = 0
-        for cmb in combinations:
-            if distance_function in [StringDistanceFunction.Levenshtein, StringDistanceFunction.Exact]:
-                intersection_cnt = intersection_cnt + self.__process_distance(cmb + (levenshtein_distance,
-                                                                                     True)
-                                                                              )
-            elif distance_function == StringDistanceFunction.DamerauLevenshtein:
-                intersection_cnt = intersection_cnt + self.__process_distance(cmb + (damerau_levenshtein_distance,
-                                                                                     True)
-                                                                              )
-            elif distance_function == StringDistanceFunction.Hamming:
-                intersection_cnt = intersection_cnt + self.__process_distance(cmb + (hamming_distance,
-                                                                                     True)
-                                                                              )
-            elif distance_function == StringDistanceFunction.Jaro:
-                intersection_cnt = intersection_cnt + self.__process_distance(cmb + (jaro_similarity,
-                                                                                     False)
-                                                                              )
-            elif distance_function == StringDistanceFunction.JaroWinkler:
-                intersection_cnt = intersection_cnt + self.__process_distance(cmb + (jaro_winkler_similarity,
-                                                                                     False)
-                                                                              )
+            set1 = target_values
+            set2 = source_values
+
+        if self.__distance_function == StringDistanceFunction.Exact:
+            intersection_cnt = len(set1.values & set2.values)
+        else:
+            intersection_cnt = self.__count_fuzzy_intersection(set1, set2)
 
         union_cnt = len(set1) + len(set2) - intersection_cnt
 
@@ -121,69 +129,111 @@ class JaccardDistanceMatcher(BaseMatcher):
                      source_table_name, source_column_name,
                      sim).to_dict
 
-    @staticmethod
-    def __get_column_combinations(source_table: BaseTable,
-                                  target_table: BaseTable,
-                                  threshold,
-                                  target_id,
-                                  source_id,
-                                  distance_function: StringDistanceFunction):
-        for source_column, target_column in product(source_table.get_columns(), target_table.get_columns()):
-            yield source_column.data, target_column.data, threshold, target_id, \
-                  target_table.name, target_table.unique_identifier, \
-                  target_column.name, target_column.unique_identifier, \
-                  source_table.name, source_table.unique_identifier, source_id, \
-                  source_column.name, source_column.unique_identifier, distance_function
-
-    @staticmethod
-    def __get_set_combinations(set1: set,
-                               set2: set,
-                               threshold: float):
+    def __count_fuzzy_intersection(self,
+                                   set1: FilteringIndex,
+                                   set2: FilteringIndex) -> int:
         """
-        Function that creates combination between elements of set1 and set2
+        Function that counts the elements of the first set for which there exists an element in the second set that
+        is within the distance threshold. Only the candidates that pass the filters of the second set's index are
+        compared with the string distance function.
 
         Parameters
         ----------
-        set1 : set
-            The first set that its elements will be taken
-        set2 : set
-            The second set
-        threshold : float
-            The Levenshtein ratio
+        set1 : FilteringIndex
+            The index of the (smaller) first set of stringified values
+        set2 : FilteringIndex
+            The index of the second set of stringified values
 
         Returns
         -------
-        generator
-            A generator that yields one element from the first set, the second set and the Levenshtein ratio
+        int
+            The size of the fuzzy intersection
         """
-        for s1 in set1:
-            yield str(s1), set2, threshold
-
-    @staticmethod
-    def __process_distance(tup: tuple):
+        distance_function, normalize = DISTANCE_FUNCTIONS[self.__distance_function]
+        threshold = self.__threshold_dist
+
+        # Identical strings are always within the threshold, so only the remaining ones need the distance function.
+        # The similarity functions score two empty strings with 0, so those take the slow path.
+        common = set1.values & set2.values
+        if not normalize and '' in common:
+            common = common - {''}
+        intersection_cnt = len(common)
+
+        for s1 in set1.values:
+            if s1 in common:
+                continue
+            len_s1 = len(s1)
+            for s2 in set2.candidates(s1, threshold, self.__distance_function):
+                dist = distance_function(s1, s2)
+                if normalize:
+                    # Equivalent to normalize_distance(dist, s1, s2) >= threshold
+                    if 1 - dist / max(len_s1, len(s2), 1) >= threshold:
+                        intersection_cnt += 1
+                        break
+                elif dist >= threshold:
+                    intersection_cnt += 1
+                    break
+        return intersection_cnt
+
+    def __get_column_value_sets(self, table: BaseTable) -> Dict[str, FilteringIndex]:
         """
-        Function that check if there exist entry from the second set that has a greater Levenshtein ratio with the
-        element from the first set than the given threshold
+        Function that computes the distinct stringified values of every column of a table, once per table instead of
+        once per column pair. The values are wrapped in a FilteringIndex that is built lazily on the first fuzzy
+        comparison, so that its candidate filters are also shared by all the pairs the column takes part in.
 
         Parameters
         ----------
-        tup : tuple
-            A tuple containing one element from the first set, the second set and the threshold of the Levenshtein ratio
+        table : BaseTable
+            The table
 
         Returns
         -------
-        int
-            1 if there is such an element 0 if not
+        dict
+            The index of the distinct stringified values of each column, keyed by the column name
+        """
+        return {column.name: FilteringIndex(frozenset(map(str, self.__get_distinct_values(column))))
+                for column in table.get_columns()}
+
+    def __get_distinct_values(self, column: BaseColumn):
+        if self.__sample_size is None:
+            return column.distinct_values
+        return pd.unique(column.sample(self.__sample_size, self.__sampling_strategy, self.__sampling_seed))
+
+    def __get_shared_column_values(self,
+                                   source_table: BaseTable,
+                                   target_table: BaseTable):
+        shared_column_values = {}
+        for side, table in (('source', source_table), ('target', target_table)):
+            for column_name, index in self.__get_column_value_sets(table).items():
+                shared_column_values[(side, column_name)] = index.values
+        return shared_column_values
+
+    def __get_column_combinations(self,
+                                  source_table: BaseTable,
+                                  target_table: BaseTable,
+                                  shared_values: Optional[SharedColumnValues] = None):
+        if shared_values is None:
+            source_value_sets = self.__get_column_value_sets(source_table)
+            target_value_sets = self.__get_column_value_sets(target_table)
+        else:
+            source_value_sets = {column.name: shared_values.get_handle(('source', column.name))
+                                 for column in source_table.get_columns()}
+            target_value_sets = {column.name: shared_values.get_handle(('target', column.name))
+                                 for column in target_table.get_columns()}
+        candidates = self.__get_lsh_candidates(source_table, target_table)
+        for source_column, target_column in product(source_value_sets.keys(), target_value_sets.keys()):
+            if candidates is not None and (source_column, target_column) not in candidates:
+                continue
+            yield source_value_sets[source_column], target_value_sets[target_column], \
+                target_table.name, target_column, source_table.name, source_column
+
+    def __get_lsh_candidates(self,
+                             source_table: BaseTable,
+                             target_table: BaseTable):
+        """
+        Function that returns the (source column name, target column name) pairs that the LSH index reports as
+        candidates, or None if there is no index and all the pairs have to be compared
         """
-        s1, set2, threshold, distance_function, normalize = tup
-
-        for s2 in set2:
-            str_s2 = str(s2)
-            dist = distance_function(s1, str_s2)
-            if normalize:
-                if normalize_distance(dist, s1, str_s2) >= threshold:
-                    return 1
-            else:
-                if dist >= threshold:
-                    return 1
-        return 0
+        if self.__lsh_index is None:
+            return None
+        return self.__lsh_index.table_candidates(source_table, target_table)
@@ -0,0 +1,300 @@
+import weakref
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ...data_sources.base_column import BaseColumn
+from ...data_sources.base_table import BaseTable
+
+# A prime just below 2^32, so that a * x + b never overflows an uint64 for 32 bit values
+PRIME = np.uint64(4294967291)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+# The number of values that are hashed at once, bounding the size of the (num_perm, chunk) hash matrix
+CHUNK_SIZE = 1 << 14
+
+
+class MinHashLSHIndex(object):
+    """
+    A class used to find the candidate joinable columns of a whole corpus of tables without comparing every column
+    pair, by indexing a MinHash signature of the distinct values of every column in an LSH banding index.
+
+    The signatures are computed over the same distinct stringified values that the JaccardDistanceMatcher uses, so
+    the fraction of equal signature positions is an unbiased estimate of the exact Jaccard similarity of two
+    columns. Columns are identified by their (table_name, column_name) pair and tables can be added incrementally.
+    The index remembers the tables it was given by their unique identifier, so that matching them again reuses their
+    signatures instead of hashing their values once more.
+
+    Attributes
+    ----------
+    threshold : float
+        The Jaccard similarity threshold the banding is tuned for
+    num_perm : int
+        The number of hash permutations of the signatures
+
+    Methods
+    -------
+    add_table(table)
+        Add (or replace) the columns of a table to the index
+
+    query(table_name, column_name)
+        The candidate columns of other tables for a column of the index
+
+    candidate_pairs()
+        All the candidate column pairs of different tables
+
+    table_candidates(source_table, target_table)
+        The candidate column pairs of two tables, indexed or not
+
+    estimate_jaccard(column1, column2)
+        The Jaccard similarity estimated from the signatures of two indexed columns
+    """
+
+    def __init__(self,
+                 threshold: float = 0.5,
+                 num_perm: int = 128,
+                 seed: int = 1):
+        """
+        Parameters
+        ----------
+        threshold : float, optional
+            The Jaccard similarity threshold the banding is tuned for (default is 0.5)
+        num_perm : int, optional
+            The number of hash permutations of the signatures (default is 128)
+        seed : int, optional
+            The seed of the hash permutations, indexes can only be compared if they share it (default is 1)
+        """
+        self.threshold = float(threshold)
+        self.num_perm = int(num_perm)
+        rng = np.random.default_rng(seed)
+        self.__a = rng.integers(1, PRIME, size=(self.num_perm, 1), dtype=np.uint64)
+        self.__b = rng.integers(0, PRIME, size=(self.num_perm, 1), dtype=np.uint64)
+        self.__bands, self.__rows = get_optimal_banding(self.threshold, self.num_perm)
+        self.__signatures: Dict[Tuple[str, str], np.ndarray] = {}
+        self.__hash_tables: List[Dict[bytes, Set[Tuple[str, str]]]] = [dict() for _ in range(self.__bands)]
+        # The indexed tables by unique identifier, as a weak reference to the table object and the name of the table
+        self.__tables: Dict[object, Tuple[weakref.ref, str]] = {}
+
+    def __getstate__(self):
+        # The weak references to the indexed tables cannot be pickled, e.g. along with a matcher sent to a worker
+        state = self.__dict__.copy()
+        state['_MinHashLSHIndex__tables'] = {}
+        return state
+
+    def __len__(self):
+        return len(self.__signatures)
+
+    def __contains__(self, column: Tuple[str, str]):
+        return column in self.__signatures
+
+    @property
+    def table_names(self) -> Set[str]:
+        return {table_name for table_name, _ in self.__signatures}
+
+    def add_table(self, table: BaseTable):
+        """
+        Add the columns of a table to the index, replacing the ones of a previously added table with the same name.
+        Empty columns are not indexed, since they cannot be joined with anything.
+
+        Parameters
+        ----------
+        table : BaseTable
+            The table to index
+        """
+        self.__tables = {uid: entry for uid, entry in self.__tables.items() if entry[1] != table.name}
+        self.__tables[table.unique_identifier] = (weakref.ref(table), table.name)
+        for column in table.get_columns():
+            key = (table.name, column.name)
+            if key in self.__signatures:
+                self.__remove(key)
+            if not column.is_empty:
+                self.__insert(key, self.get_signature(column))
+
+    def get_signature(self, column: BaseColumn) -> np.ndarray:
+        """
+        Compute the MinHash signature of the distinct stringified values of a column
+
+        Parameters
+        ----------
+        column : BaseColumn
+            The column
+
+        Returns
+        -------
+        ndarray
+            The signature of the column, with num_perm uint64 values
+        """
+        values = np.array(list(set(map(str, column.distinct_values))), dtype=object)
+        hashes = pd.util.hash_array(values) & MAX_HASH
+        signature = np.full(self.num_perm, PRIME, dtype=np.uint64)
+        for start in range(0, len(hashes), CHUNK_SIZE):
+            chunk = hashes[start:start + CHUNK_SIZE]
+            permuted = (self.__a * chunk[np.newaxis, :] + self.__b) % PRIME
+            signature = np.minimum(signature, permuted.min(axis=1))
+        return signature
+
+    def query(self,
+              table_name: str,
+              column_name: str) -> Set[Tuple[str, str]]:
+        """
+        The columns of other tables that share at least one band with the given indexed column
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table of the column
+        column_name : str
+            The name of the column
+
+        Returns
+        -------
+        set
+            The candidate (table_name, column_name) pairs
+        """
+        key = (table_name, column_name)
+        if key not in self.__signatures:
+            return set()
+        candidates = set()
+        for hash_table, band in zip(self.__hash_tables, self.__get_bands(self.__signatures[key])):
+            candidates.update(hash_table[band])
+        return {candidate for candidate in candidates if candidate[0] != table_name}
+
+    def candidate_pairs(self) -> Set[Tuple[Tuple[str, str], Tuple[str, str]]]:
+        """
+        All the pairs of columns of different tables that share at least one band
+
+        Returns
+        -------
+        set
+            The candidate column pairs, each one ordered so that it appears only once
+        """
+        pairs = set()
+        for hash_table in self.__hash_tables:
+            for bucket in hash_table.values():
+                if len(bucket) < 2:
+                    continue
+                bucket = sorted(bucket)
+                for i, column1 in enumerate(bucket):
+                    for column2 in bucket[i + 1:]:
+                        if column1[0] != column2[0]:
+                            pairs.add((column1, column2))
+        return pairs
+
+    def table_candidates(self,
+                         source_table: BaseTable,
+                         target_table: BaseTable) -> Set[Tuple[str, str]]:
+        """
+        The column pairs of two tables that share at least one band, with the hash permutations and the banding of
+        the index. The signatures of a table that was added to the index are looked up by its unique identifier, the
+        ones of any other table are computed from its values, and the index is left unchanged. A table only counts as
+        indexed if it is the very table object that was added, so a different table that reuses the name or the
+        unique identifier of an indexed one is hashed from its own values.
+
+        Parameters
+        ----------
+        source_table : BaseTable
+            The source table
+        target_table : BaseTable
+            The target table
+
+        Returns
+        -------
+        set
+            The candidate (source column name, target column name) pairs
+        """
+        target_hash_tables: List[Dict[bytes, Set[str]]] = [dict() for _ in range(self.__bands)]
+        for column_name, signature in self.__get_table_signatures(target_table).items():
+            for hash_table, band in zip(target_hash_tables, self.__get_bands(signature)):
+                hash_table.setdefault(band, set()).add(column_name)
+        candidates = set()
+        for column_name, signature in self.__get_table_signatures(source_table).items():
+            for hash_table, band in zip(target_hash_tables, self.__get_bands(signature)):
+                candidates.update((column_name, target_column) for target_column in hash_table.get(band, ()))
+        return candidates
+
+    def estimate_jaccard(self,
+                         column1: Tuple[str, str],
+                         column2: Tuple[str, str]) -> float:
+        """
+        The Jaccard similarity of two indexed columns, estimated from the fraction of equal signature values
+
+        Parameters
+        ----------
+        column1 : tuple
+            The (table_name, column_name) of the first column
+        column2 : tuple
+            The (table_name, column_name) of the second column
+
+        Returns
+        -------
+        float
+            The estimated Jaccard similarity
+        """
+        return float(np.mean(self.__signatures[column1] == self.__signatures[column2]))
+
+    def __get_table_signatures(self, table: BaseTable) -> Dict[str, np.ndarray]:
+        """
+        The signatures of the non empty columns of a table by column name, from the index if the table was added to it
+        """
+        table_ref, table_name = self.__tables.get(table.unique_identifier, (None, None))
+        if table_ref is not None and table_ref() is table:
+            return {column_name: self.__signatures[(table_name, column_name)]
+                    for column_name in table.get_column_names() if (table_name, column_name) in self.__signatures}
+        return {column.name: self.get_signature(column) for column in table.get_columns() if not column.is_empty}
+
+    def __get_bands(self, signature: np.ndarray):
+        for band in range(self.__bands):
+            yield signature[band * self.__rows:(band + 1) * self.__rows].tobytes()
+
+    def __insert(self, key: Tuple[str, str], signature: np.ndarray):
+        self.__signatures[key] = signature
+        for hash_table, band in zip(self.__hash_tables, self.__get_bands(signature)):
+            hash_table.setdefault(band, set()).add(key)
+
+    def __remove(self, key: Tuple[str, str]):
+        signature = self.__signatures.pop(key)
+        for hash_table, band in zip(self.__hash_tables, self.__get_bands(signature)):
+            bucket = hash_table[band]
+            bucket.discard(key)
+            if not bucket:
+                del hash_table[band]
+
+
+def get_optimal_banding(threshold: float,
+                        num_perm: int,
+                        false_positive_weight: float = 0.5,
+                        false_negative_weight: float = 0.5) -> Tuple[int, int]:
+    """
+    Find the number of bands b and rows per band r (b * r <= num_perm) that minimize the weighted probability mass
+    of false positives and false negatives around the threshold, given that two columns with Jaccard similarity s
+    become candidates with probability 1 - (1 - s^r)^b.
+
+    Parameters
+    ----------
+    threshold : float
+        The Jaccard similarity threshold
+    num_perm : int
+        The number of hash permutations of the signatures
+    false_positive_weight : float, optional
+        The weight of the false positive probability (default is 0.5)
+    false_negative_weight : float, optional
+        The weight of the false negative probability (default is 0.5)
+
+    Returns
+    -------
+    tuple
+        The number of bands and the number of rows per band
+    """
+    best = (1, num_perm)
+    min_error = np.inf
+    below = np.linspace(0.0, threshold, 100)
+    above = np.linspace(threshold, 1.0, 100)
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positives = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+            false_negatives = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+            error = false_positive_weight * false_positives + false_negative_weight * false_negatives
+            if error < min_error:
+                min_error = error
+                best = (bands, rows)
+    return best
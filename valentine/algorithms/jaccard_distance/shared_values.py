@@ -0,0 +1,117 @@
+from multiprocessing import shared_memory
+from typing import Dict, FrozenSet, Hashable, NamedTuple
+
+import numpy as np
+
+from .filtering_index import FilteringIndex
+
+
+class SharedColumnHandle(NamedTuple):
+    """
+    A reference to the distinct values of one column inside a SharedColumnValues block, small enough to be sent with
+    every task instead of the values themselves
+    """
+    payload_name: str
+    offsets_name: str
+    start: int
+    stop: int
+
+
+class SharedColumnValues(object):
+    """
+    A class used to place the distinct stringified values of many columns once into shared memory, so that the
+    worker processes can read them by handle instead of receiving a pickled copy with every column pair.
+
+    The values are UTF-8 encoded and concatenated into a payload block, while an offsets block holds the byte
+    offset of every value. The values of a column are the contiguous range [start, stop) of the offsets.
+
+    Methods
+    -------
+    get_handle(key)
+        Returns the handle of the values of a column
+
+    close()
+        Releases and removes the shared memory blocks
+    """
+
+    def __init__(self, columns: Dict[Hashable, FrozenSet[str]]):
+        """
+        Parameters
+        ----------
+        columns : dict
+            The distinct stringified values of every column, keyed by an identifier of the column
+        """
+        self.__ranges = {}
+        encoded = []
+        for key, values in columns.items():
+            start = len(encoded)
+            encoded.extend(value.encode('utf-8') for value in values)
+            self.__ranges[key] = (start, len(encoded))
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+
+        # Shared memory blocks cannot be empty
+        self.__payload = shared_memory.SharedMemory(create=True, size=max(int(offsets[-1]), 1))
+        self.__offsets = shared_memory.SharedMemory(create=True, size=offsets.nbytes)
+        self.__payload.buf[:offsets[-1]] = b''.join(encoded)
+        self.__offsets.buf[:offsets.nbytes] = offsets.tobytes()
+
+    def get_handle(self, key: Hashable) -> SharedColumnHandle:
+        start, stop = self.__ranges[key]
+        return SharedColumnHandle(self.__payload.name, self.__offsets.name, start, stop)
+
+    def close(self):
+        for block in (self.__payload, self.__offsets):
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+# The shared memory blocks a worker is attached to and the indexes it has decoded from them. Only the blocks of the
+# latest get_matches call are kept, so the indexes are built once per column and worker instead of once per task.
+_attached_blocks: Dict[str, shared_memory.SharedMemory] = {}
+_decoded_indexes: Dict[SharedColumnHandle, FilteringIndex] = {}
+
+
+def get_shared_index(handle: SharedColumnHandle) -> FilteringIndex:
+    """
+    Get the FilteringIndex of the column values a handle refers to, decoding them from shared memory on first use
+
+    Parameters
+    ----------
+    handle : SharedColumnHandle
+        The handle of the column values
+
+    Returns
+    -------
+    FilteringIndex
+        The index of the distinct stringified values of the column
+    """
+    index = _decoded_indexes.get(handle)
+    if index is not None:
+        return index
+
+    if handle.payload_name not in _attached_blocks:
+        for block in _attached_blocks.values():
+            block.close()
+        _attached_blocks.clear()
+        _decoded_indexes.clear()
+        _attached_blocks[handle.payload_name] = shared_memory.SharedMemory(name=handle.payload_name)
+        _attached_blocks[handle.offsets_name] = shared_memory.SharedMemory(name=handle.offsets_name)
+
+    offsets_buffer = _attached_blocks[handle.offsets_name].buf
+    offsets = np.frombuffer(offsets_buffer, dtype=np.int64, count=handle.stop - handle.start + 1,
+                            offset=handle.start * np.dtype(np.int64).itemsize).tolist()
+    payload = bytes(_attached_blocks[handle.payload_name].buf[offsets[0]:offsets[-1]])
+    base = offsets[0]
+    values = frozenset(payload[offsets[i] - base:offsets[i + 1] - base].decode('utf-8')
+                       for i in range(len(offsets) - 1))
+
+    index = FilteringIndex(values)
+    _decoded_indexes[handle] = index
+    return index
@@ -1,7 +1,14 @@
 from .dataframe.dataframe_table import DataframeTable
+from .file.csv_table import CSVTable
+from .file.parquet_table import ParquetTable
+from .sampling import SamplingStrategy
 
 __all__ = [
     "dataframe",
+    "file",
     "utils",
-    "DataframeTable"
+    "DataframeTable",
+    "CSVTable",
+    "ParquetTable",
+    "SamplingStrategy"
 ]
@@ -1,5 +1,11 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+import pandas as pd
+
+from .sampling import SamplingStrategy, sample_values
+from .type_inference import InferredType, infer_data_type
+
 
 class BaseColumn(ABC):
     """
@@ -29,6 +35,57 @@ class BaseColumn(ABC):
     def data(self) -> list:
         raise NotImplementedError
 
+    @property
+    def inferred_type(self) -> InferredType:
+        """
+        The type of the column along with the confidence and the sample cardinality of the inference
+        """
+        return infer_data_type(self.values, str(self.values.dtype))
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        The non-null values of the column as an array
+        """
+        return pd.Series(self.data).to_numpy()
+
+    @property
+    def distinct_values(self) -> np.ndarray:
+        """
+        The distinct non-null values of the column, in order of appearance
+        """
+        return pd.unique(self.values)
+
+    @property
+    def value_counts(self) -> pd.Series:
+        """
+        The number of occurrences of every distinct non-null value of the column, from the most to the least frequent
+        """
+        return pd.Series(self.values).value_counts()
+
+    @property
+    def null_count(self) -> int:
+        """
+        The number of missing values that are left out of the data of the column
+        """
+        return 0
+
+    def profile(self):
+        """
+        Compute the profile of the column that the matchers read, i.e. its type, values, distinct values and number of
+        missing values, so that columns that cache them can be sent to other processes already profiled
+        """
+        _ = self.inferred_type, self.values, self.distinct_values, self.null_count
+
+    def sample(self,
+               budget: int,
+               strategy: SamplingStrategy = SamplingStrategy.Reservoir,
+               seed: int = 0) -> np.ndarray:
+        """
+        A sample of the non-null values of the column, see `sampling.sample_values`
+        """
+        return sample_values(self.values, budget, strategy, seed)
+
     @property
     def size(self) -> int:
         return len(self.data)
@@ -1,10 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 from .base_column import BaseColumn
-from .utils import is_date
+from .type_inference import infer_data_type
 
 
 class BaseTable(ABC):
@@ -41,25 +42,29 @@ class BaseTable(ABC):
     def is_empty(self) -> bool:
         raise NotImplementedError
 
+    def get_column_names(self) -> List[str]:
+        return [column.name for column in self.get_columns()]
+
+    def get_row_sample(self,
+                       n_rows: int,
+                       seed: Optional[int] = 0) -> pd.DataFrame:
+        """
+        A uniform random sample of at most n_rows rows of the table, in their order in the table. The same seed
+        always gives the same sample of the same table.
+        """
+        df = self.get_df()
+        if len(df) <= n_rows:
+            return df
+        positions = np.sort(np.random.default_rng(seed).choice(len(df), size=max(int(n_rows), 0), replace=False))
+        return df.iloc[positions]
+
     def get_guid_column_lookup(self) -> Dict[str, object]:
         return {column.name:  column.unique_identifier for column in self.get_columns()}
 
     @staticmethod
     def get_data_type(data: list, d_type: str) -> str:
-        new_d_type = ""
-        if len(data) != 0:
-            if d_type == "object":
-                if is_date(data[0]):
-                    new_d_type = "date"
-                else:
-                    new_d_type = "varchar"
-            elif d_type.startswith("int"):
-                new_d_type = "int"
-            elif d_type.startswith("float"):
-                new_d_type = "float"
-        else:
-            if d_type == "object":
-                new_d_type = "varchar"
-            else:
-                new_d_type = d_type
-        return new_d_type
+        """
+        The type of a column with the given values and dtype, see `type_inference.infer_data_type`. The values of
+        an object column are inspected, so e.g. a column of numeric strings is an 'int' or 'float' column.
+        """
+        return infer_data_type(data, d_type).data_type
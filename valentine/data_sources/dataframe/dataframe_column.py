@@ -1,13 +1,32 @@
+import numpy as np
+import pandas as pd
+
 from ..base_column import BaseColumn
+from ..type_inference import DEFAULT_SAMPLE_SIZE, InferredType, get_sample, infer_data_type
 
 
 class DataframeColumn(BaseColumn):
+    """
+    A column of a DataframeTable that profiles itself lazily: the non-null values, the list of the data, the derived
+    artifacts and the data type are each computed on first access and cached, so that matchers that only need the
+    names and types of the columns never copy any values.
+
+    The non-null values are kept as a numpy array, which is a zero-copy view of the DataFrame's data if the column
+    has no missing values.
+    """
 
-    def __init__(self, column_name: str, data: list, d_type: str, table_guid: str):
+    def __init__(self, column_name: str, column_data: pd.Series, table_guid: str,
+                 type_sample_size: int = DEFAULT_SAMPLE_SIZE):
         self.__column_name = column_name
-        self.__data = data
-        self.__d_type = d_type
+        self.__column_data = column_data
         self.__table_guid = table_guid
+        self.__type_sample_size = type_sample_size
+        self.__inferred_type = None
+        self.__values = None
+        self.__null_count = None
+        self.__data = None
+        self.__distinct_values = None
+        self.__value_counts = None
 
     @property
     def unique_identifier(self) -> str:
@@ -19,8 +38,73 @@ class DataframeColumn(BaseColumn):
 
     @property
     def data_type(self):
-        return self.__d_type
+        return self.inferred_type.data_type
+
+    @property
+    def inferred_type(self) -> InferredType:
+        if self.__inferred_type is None:
+            d_type = str(self.__column_data.dtype)
+            if self.__values is not None:
+                values = self.__values
+            elif d_type in ('object', 'string'):
+                # The missing values of the sample are skipped, so there is no need to drop them from the column
+                values = self.__column_data.to_numpy()
+            else:
+                # Other dtypes get their type from the dtype and only need a sample of the non-null values for the
+                # cardinality
+                values = self.__get_non_null_sample()
+            self.__inferred_type = infer_data_type(values, d_type, self.__type_sample_size)
+        return self.__inferred_type
 
     @property
     def data(self) -> list:
+        if self.__data is None:
+            # tolist gives the python equivalents of the numpy scalars, apart from datetimes that it turns to ints
+            if self.values.dtype.kind in 'mM':
+                self.__data = list(self.values)
+            else:
+                self.__data = self.values.tolist()
         return self.__data
+
+    @property
+    def values(self) -> np.ndarray:
+        if self.__values is None:
+            values = self.__column_data.to_numpy()
+            null_mask = self.__column_data.isna().to_numpy()
+            self.__null_count = int(null_mask.sum())
+            self.__values = values[~null_mask] if self.__null_count > 0 else values
+        return self.__values
+
+    @property
+    def distinct_values(self) -> np.ndarray:
+        if self.__distinct_values is None:
+            self.__distinct_values = pd.unique(self.values)
+        return self.__distinct_values
+
+    @property
+    def value_counts(self) -> pd.Series:
+        if self.__value_counts is None:
+            self.__value_counts = pd.Series(self.values).value_counts()
+        return self.__value_counts
+
+    @property
+    def null_count(self) -> int:
+        if self.__null_count is None:
+            self.__null_count = int(self.__column_data.isna().sum())
+        return self.__null_count
+
+    @property
+    def size(self) -> int:
+        return len(self.values)
+
+    def __getstate__(self):
+        # A profiled column does not need its series any more, so it is sent to other processes without a second
+        # copy of its data
+        state = self.__dict__.copy()
+        if self.__inferred_type is not None and self.__values is not None:
+            state['_DataframeColumn__column_data'] = None
+        return state
+
+    def __get_non_null_sample(self) -> np.ndarray:
+        positions = np.flatnonzero(self.__column_data.notna().to_numpy())
+        return self.__column_data.to_numpy()[get_sample(positions, self.__type_sample_size)]
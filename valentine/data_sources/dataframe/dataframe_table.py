@@ -5,12 +5,14 @@ import pandas as pd
 from .dataframe_column import DataframeColumn
 from ..base_column import BaseColumn
 from ..base_table import BaseTable
+from ..type_inference import DEFAULT_SAMPLE_SIZE
 
 
 class DataframeTable(BaseTable):
 
-    def __init__(self, df: pd.DataFrame, name: str):
+    def __init__(self, df: pd.DataFrame, name: str, type_sample_size: int = DEFAULT_SAMPLE_SIZE):
         self.__table_name = name
+        self.__type_sample_size = type_sample_size
         self.__columns = dict()
         self.__df = df
 
@@ -30,12 +32,15 @@ class DataframeTable(BaseTable):
     def get_df(self) -> pd.DataFrame:
         return self.__df
 
+    def get_column_names(self) -> List[str]:
+        return list(self.__df.columns)
+
     @property
     def is_empty(self) -> bool:
         return self.__df.empty
 
     def __get_columns_from_df(self):
+        # The columns profile themselves lazily, on first access of their data or data type
         for column_name, column_data in self.__df.items():
-            data = list(column_data.dropna().values)
-            d_type = self.get_data_type(data, str(column_data.dtype))
-            self.__columns[column_name] = DataframeColumn(column_name, data, d_type, self.unique_identifier)
+            self.__columns[column_name] = DataframeColumn(column_name, column_data, self.unique_identifier,
+                                                          self.__type_sample_size)
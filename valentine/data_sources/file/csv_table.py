@@ -0,0 +1,57 @@
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+from .file_table import DEFAULT_CHUNK_SIZE, DEFAULT_MEMORY_BUDGET, FileTable
+from ..utils import get_delimiter, get_encoding
+
+
+class CSVTable(FileTable):
+    """
+    A table stored in a CSV file, read in chunks of rows. The encoding and the delimiter are detected from the first
+    lines of the file unless they are given.
+    """
+
+    def __init__(self,
+                 path: str,
+                 name: Optional[str] = None,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 seed: Optional[int] = 0,
+                 encoding: Optional[str] = None,
+                 delimiter: Optional[str] = None):
+        """
+        Parameters
+        ----------
+        path : str
+            The path of the CSV file
+        name : str, optional
+            The name of the table, the name of the file without its extension by default
+        memory_budget : int, optional
+            The memory budget of the values kept for all the columns, in bytes (default is 256 MiB)
+        chunk_size : int, optional
+            The number of rows that are read at a time (default is 100,000)
+        seed : int, optional
+            The seed of the reservoir samples of the columns that exceed their budget (default is 0)
+        encoding : str, optional
+            The encoding of the file, detected by default
+        delimiter : str, optional
+            The delimiter of the file, detected by default
+        """
+        super().__init__(path, name, memory_budget, chunk_size, seed)
+        self.__encoding = encoding if encoding is not None else get_encoding(path)
+        self.__delimiter = delimiter if delimiter is not None else get_delimiter(path)
+
+    def get_column_names(self) -> List[str]:
+        return list(pd.read_csv(self.path, encoding=self.__encoding, sep=self.__delimiter, nrows=0).columns)
+
+    def read_chunks(self) -> Iterator[pd.DataFrame]:
+        with pd.read_csv(self.path, encoding=self.__encoding, sep=self.__delimiter,
+                         chunksize=self.chunk_size) as reader:
+            yield from reader
+
+    def get_df(self) -> pd.DataFrame:
+        """
+        Read the whole file, for the matchers that need the table as a DataFrame
+        """
+        return pd.read_csv(self.path, encoding=self.__encoding, sep=self.__delimiter)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from ..base_column import BaseColumn
+from ..type_inference import InferredType, infer_data_type
+
+
+class FileColumn(BaseColumn):
+    """
+    A column of a FileTable, holding the profile that the table computed for it in a single pass over the file.
+
+    The values of the column are all of its non-null values if they fit in the memory budget of the table, or else a
+    uniform random sample of them; `is_sampled` tells the two apart. The size and the null count of the column are
+    always exact, while its value counts, distinct values and inferred type come from the sample when it is sampled.
+    """
+
+    def __init__(self, column_name: str, values: np.ndarray, d_type: str, table_guid: str, size: int,
+                 null_count: int, is_sampled: bool):
+        self.__column_name = column_name
+        self.__values = values
+        self.__d_type = d_type
+        self.__table_guid = table_guid
+        self.__size = size
+        self.__null_count = null_count
+        self.__is_sampled = is_sampled
+        self.__inferred_type = None
+        self.__data = None
+        self.__distinct_values = None
+
+    @property
+    def unique_identifier(self) -> str:
+        return f"{self.__table_guid[0]}_{self.__table_guid[1]}:{self.__column_name}"
+
+    @property
+    def name(self):
+        return self.__column_name
+
+    @property
+    def data_type(self):
+        return self.inferred_type.data_type
+
+    @property
+    def inferred_type(self) -> InferredType:
+        if self.__inferred_type is None:
+            self.__inferred_type = infer_data_type(self.__values, self.__d_type)
+        return self.__inferred_type
+
+    @property
+    def data(self) -> list:
+        if self.__data is None:
+            if self.__values.dtype.kind in 'mM':
+                self.__data = list(self.__values)
+            else:
+                self.__data = self.__values.tolist()
+        return self.__data
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.__values
+
+    @property
+    def distinct_values(self) -> np.ndarray:
+        if self.__distinct_values is None:
+            self.__distinct_values = super().distinct_values
+        return self.__distinct_values
+
+    @property
+    def null_count(self) -> int:
+        return self.__null_count
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def is_sampled(self) -> bool:
+        return self.__is_sampled
@@ -0,0 +1,195 @@
+import os
+from abc import abstractmethod
+from typing import Dict, Iterator, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from .file_column import FileColumn
+from ..base_column import BaseColumn
+from ..base_table import BaseTable
+from ..sampling import ReservoirSampler
+
+# The default memory budget of the values kept for all the columns of a table, in bytes
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# The default number of rows that are read at a time
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+class FileTable(BaseTable):
+    """
+    Abstract class representing a table that is stored in a file and read in chunks, so that it never has to be
+    loaded in memory as a whole.
+
+    The columns are profiled in a single pass over the file on the first call of `get_columns`. The memory budget is
+    split evenly over the columns: a column keeps all of its non-null values if they fit in its share, or else a
+    uniform reservoir sample of as many values as fit in it, sized by the average memory usage of its values in the
+    first chunk that has any. The number of values and of nulls of a column are exact either way, while its value
+    counts, distinct values and the cardinality its type is inferred from are estimates from the sample.
+    """
+
+    def __init__(self,
+                 path: str,
+                 name: Optional[str] = None,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 seed: Optional[int] = 0):
+        """
+        Parameters
+        ----------
+        path : str
+            The path of the file
+        name : str, optional
+            The name of the table, the name of the file without its extension by default
+        memory_budget : int, optional
+            The memory budget of the values kept for all the columns, in bytes (default is 256 MiB)
+        chunk_size : int, optional
+            The number of rows that are read at a time (default is 100,000)
+        seed : int, optional
+            The seed of the reservoir samples of the columns that exceed their budget (default is 0)
+        """
+        self.__path = path
+        self.__table_name = name if name is not None else os.path.splitext(os.path.basename(path))[0]
+        self.__memory_budget = memory_budget
+        self.__chunk_size = chunk_size
+        self.__seed = seed
+        self.__columns: Dict[str, FileColumn] = dict()
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def chunk_size(self) -> int:
+        return self.__chunk_size
+
+    @property
+    def unique_identifier(self) -> str:
+        return self.__table_name
+
+    @property
+    def name(self) -> str:
+        return self.__table_name
+
+    def get_columns(self) -> List[BaseColumn]:
+        if not self.__columns:
+            self.__profile_columns()
+        return list(self.__columns.values())
+
+    @property
+    def is_empty(self) -> bool:
+        return all(column.size + column.null_count == 0 for column in self.get_columns())
+
+    @abstractmethod
+    def get_column_names(self) -> List[str]:
+        """
+        The names of the columns of the file, read without scanning its rows
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_chunks(self) -> Iterator[pd.DataFrame]:
+        """
+        Read the file in DataFrames of at most chunk_size rows
+        """
+        raise NotImplementedError
+
+    def get_row_sample(self,
+                       n_rows: int,
+                       seed: Optional[int] = 0) -> pd.DataFrame:
+        """
+        A uniform random sample of at most n_rows rows of the file, in their order in the file, taken with a
+        reservoir sample of the row positions in a single pass, so that at most n_rows rows and a chunk are kept in
+        memory
+        """
+        if n_rows <= 0:
+            return pd.DataFrame(columns=self.get_column_names())
+        sampler = ReservoirSampler(n_rows, seed)
+        sample: Optional[pd.DataFrame] = None
+        parsed_columns: Set[str] = set()
+        for chunk in self.read_chunks():
+            parsed_columns.update(column_name for column_name, column_data in chunk.items()
+                                  if column_data.dtype != object and column_data.notna().any())
+            chunk.index = pd.RangeIndex(sampler.seen, sampler.seen + len(chunk))
+            sampler.add(chunk.index.to_numpy())
+            sample = chunk if sample is None else pd.concat([sample, chunk])
+            sample = sample[sample.index.isin(sampler.get_sample())]
+        if sample is None:
+            return pd.DataFrame(columns=self.get_column_names())
+        for column_name in parsed_columns:
+            if sample[column_name].dtype == object:
+                sample[column_name] = to_file_strings(sample[column_name].to_numpy())
+        return sample.reset_index(drop=True)
+
+    def __profile_columns(self):
+        column_names = self.get_column_names()
+        column_budget = self.__memory_budget / max(len(column_names), 1)
+        samplers: Dict[str, ReservoirSampler] = {}
+        null_counts = {column_name: 0 for column_name in column_names}
+        d_types: Dict[str, np.dtype] = {}
+        # The columns that some chunk parsed as something else than strings, e.g. numbers
+        parsed_columns: Set[str] = set()
+
+        for chunk in self.read_chunks():
+            for column_name, column_data in chunk.items():
+                null_mask = column_data.isna().to_numpy()
+                null_count = int(null_mask.sum())
+                null_counts[column_name] += null_count
+                # The chunks agree on the dtype as reading the whole file would, e.g. ints become floats in all the
+                # chunks if some chunk has missing values
+                d_types[column_name] = get_common_dtype(d_types.get(column_name), column_data.dtype)
+                if null_count == len(column_data):
+                    continue
+                if column_data.dtype != object:
+                    parsed_columns.add(column_name)
+                values = column_data.to_numpy()
+                if null_count > 0:
+                    values = values[~null_mask]
+                if column_name not in samplers:
+                    # The average size of the non-null values, since only those are kept
+                    value_size = pd.Series(values).memory_usage(deep=True, index=False) / len(values)
+                    samplers[column_name] = ReservoirSampler(int(column_budget // max(value_size, 1)), self.__seed)
+                samplers[column_name].add(values)
+
+        for column_name in column_names:
+            sampler = samplers.get(column_name)
+            values = sampler.get_sample() if sampler is not None else np.array([], dtype=object)
+            d_type = d_types.get(column_name, np.dtype(object))
+            if values.dtype != d_type and d_type != object:
+                values = values.astype(d_type)
+            elif d_type == object and column_name in parsed_columns:
+                values = to_file_strings(values)
+            self.__columns[column_name] = FileColumn(column_name, values, str(d_type), self.unique_identifier,
+                                                     size=sampler.seen if sampler is not None else 0,
+                                                     null_count=null_counts[column_name],
+                                                     is_sampled=sampler is not None and not sampler.is_exact)
+
+
+def to_file_strings(values: np.ndarray) -> np.ndarray:
+    """
+    The values of a column that a single read of the whole file parses as strings, from chunks that parsed some of
+    them as numbers or booleans: the values that are not strings (or missing) become the string form of the number,
+    with the integral floats of the chunks with missing values written as integers, e.g. 296.0 becomes '296'. This
+    is the text of the file unless its numbers are written in another way, e.g. 1.50 or 1e3.
+    """
+    strings = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        if isinstance(value, str) or pd.isna(value):
+            strings[i] = value
+        elif isinstance(value, (float, np.floating)) and float(value).is_integer():
+            strings[i] = str(int(value))
+        else:
+            strings[i] = str(value)
+    return strings
+
+
+def get_common_dtype(d_type1: Optional[np.dtype], d_type2: np.dtype) -> np.dtype:
+    """
+    The dtype that can hold the values of both dtypes, object for the pandas extension dtypes
+    """
+    if d_type1 is None:
+        return d_type2 if isinstance(d_type2, np.dtype) else np.dtype(object)
+    try:
+        return np.result_type(d_type1, d_type2)
+    except TypeError:
+        return np.dtype(object)
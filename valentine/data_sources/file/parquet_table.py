@@ -0,0 +1,64 @@
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+from .file_table import DEFAULT_CHUNK_SIZE, DEFAULT_MEMORY_BUDGET, FileTable
+
+
+def import_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet files requires pyarrow, install it with: pip install valentine[parquet]") \
+            from e
+    return pq
+
+
+class ParquetTable(FileTable):
+    """
+    A table stored in a Parquet file, read one row group at a time in batches of at most chunk_size rows. It requires
+    the optional pyarrow dependency.
+    """
+
+    def __init__(self,
+                 path: str,
+                 name: Optional[str] = None,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 seed: Optional[int] = 0):
+        """
+        Parameters
+        ----------
+        path : str
+            The path of the Parquet file
+        name : str, optional
+            The name of the table, the name of the file without its extension by default
+        memory_budget : int, optional
+            The memory budget of the values kept for all the columns, in bytes (default is 256 MiB)
+        chunk_size : int, optional
+            The maximum number of rows that are read at a time (default is 100,000)
+        seed : int, optional
+            The seed of the reservoir samples of the columns that exceed their budget (default is 0)
+        """
+        super().__init__(path, name, memory_budget, chunk_size, seed)
+        import_parquet()
+
+    def get_column_names(self) -> List[str]:
+        schema = import_parquet().ParquetFile(self.path).schema_arrow
+        # The index of a DataFrame written by pandas is stored as columns like __index_level_0__, which pandas reads
+        # back as the index and not as columns. A RangeIndex is only described in the metadata, not stored.
+        index_columns = {column for column in (schema.pandas_metadata or {}).get('index_columns', [])
+                         if isinstance(column, str)}
+        return [column_name for column_name in schema.names if column_name not in index_columns]
+
+    def read_chunks(self) -> Iterator[pd.DataFrame]:
+        parquet_file = import_parquet().ParquetFile(self.path)
+        for row_group in range(parquet_file.num_row_groups):
+            for batch in parquet_file.iter_batches(batch_size=self.chunk_size, row_groups=[row_group]):
+                yield batch.to_pandas()
+
+    def get_df(self) -> pd.DataFrame:
+        """
+        Read the whole file, for the matchers that need the table as a DataFrame
+        """
+        return import_parquet().read_table(self.path).to_pandas()
@@ -0,0 +1,145 @@
+from enum import Enum, auto
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class SamplingStrategy(Enum):
+    Reservoir = auto()
+    Distinct = auto()
+    TopKFrequent = auto()
+
+
+class ReservoirSampler(object):
+    """
+    A class used to keep a uniform random sample of at most capacity values out of a stream of arrays of unknown
+    total length, with Algorithm R applied to a whole array at a time. The sample is exact, i.e. all the values, as
+    long as no more than capacity of them have been added.
+
+    Attributes
+    ----------
+    capacity : int
+        The maximum number of values that are kept
+    seen : int
+        The number of values that have been added
+
+    Methods
+    -------
+    add(values)
+        Add an array of values to the stream
+
+    get_sample()
+        The values that are kept, in order of appearance as long as the reservoir is not full
+    """
+
+    def __init__(self,
+                 capacity: int,
+                 seed: Optional[int] = 0):
+        """
+        Parameters
+        ----------
+        capacity : int
+            The maximum number of values that are kept
+        seed : int, optional
+            The seed of the random replacements, so that the sample of a stream is reproducible (default is 0)
+        """
+        self.capacity = max(int(capacity), 1)
+        self.seen = 0
+        self.__rng = np.random.default_rng(seed)
+        self.__parts = []
+        self.__reservoir: Optional[np.ndarray] = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self.seen <= self.capacity
+
+    def add(self, values: np.ndarray):
+        values = np.asarray(values)
+        if len(values) == 0:
+            return
+        if self.__reservoir is None:
+            free = self.capacity - self.seen
+            self.__parts.append(values[:free])
+            self.seen += min(free, len(values))
+            values = values[free:]
+            if self.seen < self.capacity:
+                return
+            self.__reservoir = np.concatenate(self.__parts)
+            self.__parts = []
+            if len(values) == 0:
+                return
+
+        # The i-th value of the stream replaces a random slot with probability capacity / i. If several values draw
+        # the same slot the last one wins, as it would if they were added one by one.
+        positions = np.arange(self.seen + 1, self.seen + len(values) + 1)
+        slots = (self.__rng.random(len(values)) * positions).astype(np.int64)
+        replaced = slots < self.capacity
+        if replaced.any():
+            if np.result_type(self.__reservoir, values) != self.__reservoir.dtype:
+                self.__reservoir = self.__reservoir.astype(np.result_type(self.__reservoir, values))
+            self.__reservoir[slots[replaced]] = values[replaced]
+        self.seen += len(values)
+
+    def get_sample(self) -> np.ndarray:
+        if self.__reservoir is not None:
+            return self.__reservoir
+        if not self.__parts:
+            return np.array([])
+        return np.concatenate(self.__parts)
+
+
+def sample_values(values: np.ndarray,
+                  budget: int,
+                  strategy: SamplingStrategy = SamplingStrategy.Reservoir,
+                  seed: Optional[int] = 0) -> np.ndarray:
+    """
+    Sample the values of a column with one of the sampling strategies:
+
+    - Reservoir: a uniform random sample of budget values, in order of appearance if there are no more of them
+    - Distinct: every occurrence of the budget distinct values with the smallest seeded hashes of their string form.
+      The hash is the same in every column, so the samples of two columns keep the values they share (bottom-k
+      coordinated sampling) and the Jaccard similarity of the samples is an estimate of that of the columns.
+    - TopKFrequent: every occurrence of the budget most frequent distinct values
+
+    Parameters
+    ----------
+    values : ndarray
+        The non-null values of the column
+    budget : int
+        The number of values (Reservoir) or distinct values (Distinct, TopKFrequent) to keep
+    strategy : SamplingStrategy, optional
+        The sampling strategy (default is SamplingStrategy.Reservoir)
+    seed : int, optional
+        The seed of the sample, the same seed always gives the same sample of the same values (default is 0)
+
+    Returns
+    -------
+    ndarray
+        The sampled values
+    """
+    if strategy == SamplingStrategy.Reservoir:
+        if len(values) <= budget:
+            return values
+        sampler = ReservoirSampler(budget, seed)
+        sampler.add(values)
+        return sampler.get_sample()
+
+    codes, distinct_values = pd.factorize(values)
+    if len(distinct_values) <= budget:
+        return values
+    if strategy == SamplingStrategy.Distinct:
+        # Hashing the string form gives equal values of columns with different dtypes (e.g. 1 and '1') equal hashes,
+        # in line with the stringified values that the instance based matchers compare
+        hash_key = str(seed if seed is not None else 0).zfill(16)[-16:]
+        hashes = pd.util.hash_array(np.asarray(distinct_values, dtype=str).astype(object), hash_key=hash_key)
+        kept = np.argpartition(hashes, budget - 1)[:budget]
+    elif strategy == SamplingStrategy.TopKFrequent:
+        # A stable sort keeps the values that appear first among the ones with equal counts
+        counts = np.bincount(codes, minlength=len(distinct_values))
+        kept = np.argsort(-counts, kind='stable')[:budget]
+    else:
+        raise ValueError(f"Unknown sampling strategy: {strategy}")
+    mask = np.zeros(len(distinct_values), dtype=bool)
+    mask[kept] = True
+    return values[mask[codes]]
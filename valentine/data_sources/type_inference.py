@@ -0,0 +1,163 @@
+import re
+import warnings
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+from pandas.tseries.api import guess_datetime_format
+
+# The number of values of a column that are inspected to infer its type
+DEFAULT_SAMPLE_SIZE = 200
+# The minimum fraction of the sampled values that have to conform to a type for the column to get it
+DEFAULT_MIN_CONFIDENCE = 0.9
+
+# Integers and decimal numbers, with an optional sign and exponent
+INTEGER_PATTERN = re.compile(r'[+-]?\d+')
+NUMBER_PATTERN = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+# A cheap pre-screen for the strings that are worth handing to the datetime parser: ISO-like and numeric dates
+# (2019-04-26, 26/04/2019, 2019.04.26 18:03), or dates that spell out the month (26 April 2019, Apr 26, 2019)
+DATE_PATTERN = re.compile(r'\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}(?:[ T]\d{1,2}:\d{2}.*)?'
+                          r'|(?:\d{1,2}[ -])?(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?'
+                          r'[ -]\d{1,4}(?:,? \d{2,4})?(?: \d{1,2}:\d{2}.*)?',
+                          re.IGNORECASE)
+
+# The number of strings whose guessed datetime format is cached, since the columns of a table (and the tables of a
+# corpus) mostly repeat their dates and date formats
+DATE_FORMAT_CACHE_SIZE = 1 << 12
+# The number of candidate strings of a column whose guessed formats are tried
+MAX_GUESSED_DATE_FORMATS = 3
+
+
+class InferredType(NamedTuple):
+    """
+    The type of a column as inferred from a sample of its values
+
+    Attributes
+    ----------
+    data_type : str
+        The type of the column: 'int', 'float', 'date' or 'varchar', or the dtype of an empty non-object column
+    confidence : float
+        The fraction of the sampled values that conform to the type
+    cardinality : int
+        The number of distinct values in the sample
+    """
+    data_type: str
+    confidence: float
+    cardinality: int
+
+
+def infer_data_type(values: Sequence,
+                    d_type: str,
+                    sample_size: int = DEFAULT_SAMPLE_SIZE,
+                    min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> InferredType:
+    """
+    Infer the type of a column from its dtype, inspecting a sample of its values if the dtype is object. The sample is
+    spread evenly over the column and classified with a single pass of pandas' inference of the python types, and
+    for the strings with precompiled number patterns and a date pre-screen followed by vectorized datetime parsing
+    with a cached format. So an object column of numeric strings is an 'int' or a 'float' column, and not a varchar
+    as before the inference looked at the strings. The cardinality is counted on the same sample for every dtype.
+
+    Parameters
+    ----------
+    values : Sequence
+        The values of the column, missing values in the sample of an object column are ignored
+    d_type : str
+        The dtype of the column
+    sample_size : int, optional
+        The maximum number of values to inspect (default is 200)
+    min_confidence : float, optional
+        The minimum fraction of the sampled values that have to be numbers or dates for the column to get that type,
+        otherwise it is a varchar (default is 0.9)
+
+    Returns
+    -------
+    InferredType
+        The type, the confidence and the sample cardinality of the column
+    """
+    if d_type not in ('object', 'string'):
+        if len(values) == 0:
+            return InferredType(d_type, 1.0, 0)
+        # The type follows from the dtype, the sample is only needed for its cardinality
+        cardinality = len(pd.unique(np.asarray(get_sample(values, sample_size))))
+        if d_type.startswith(('int', 'uint', 'Int', 'UInt')):
+            return InferredType('int', 1.0, cardinality)
+        if d_type.startswith(('float', 'Float')):
+            return InferredType('float', 1.0, cardinality)
+        if d_type.startswith('datetime64'):
+            return InferredType('date', 1.0, cardinality)
+        return InferredType('', 1.0, cardinality)
+
+    sample = pd.Series(get_sample(values, sample_size), dtype=object).dropna()
+    if sample.empty:
+        return InferredType('varchar', 1.0, 0)
+    cardinality = int(sample.nunique())
+
+    # pandas recognizes the columns that hold python numbers and dates in a single pass
+    inferred = infer_dtype(sample, skipna=True)
+    if inferred == 'integer':
+        return InferredType('int', 1.0, cardinality)
+    if inferred in ('floating', 'mixed-integer-float', 'decimal'):
+        return InferredType('float', 1.0, cardinality)
+    if inferred in ('datetime', 'datetime64', 'date'):
+        return InferredType('date', 1.0, cardinality)
+
+    # The compiled patterns are matched directly, which is several times faster than the pandas string methods
+    strings = [str(value).strip() for value in sample]
+    numbers = [string for string in strings if NUMBER_PATTERN.fullmatch(string)]
+    numeric_fraction = len(numbers) / len(strings)
+    if numeric_fraction >= min_confidence:
+        if all(INTEGER_PATTERN.fullmatch(number) for number in numbers):
+            return InferredType('int', numeric_fraction, cardinality)
+        return InferredType('float', numeric_fraction, cardinality)
+
+    date_fraction = get_date_fraction(strings)
+    if date_fraction >= min_confidence:
+        return InferredType('date', date_fraction, cardinality)
+    return InferredType('varchar', 1.0 - max(numeric_fraction, date_fraction), cardinality)
+
+
+def get_sample(values: Sequence,
+               sample_size: int) -> Sequence:
+    """
+    Get at most sample_size values evenly spread over the given ones, deterministically
+    """
+    if len(values) <= sample_size:
+        return values
+    positions = np.linspace(0, len(values) - 1, sample_size).astype(np.int64)
+    if isinstance(values, np.ndarray):
+        return values[positions]
+    return [values[position] for position in positions]
+
+
+@lru_cache(maxsize=DATE_FORMAT_CACHE_SIZE)
+def guess_date_format(string: str) -> Optional[str]:
+    """
+    The datetime format of a string as guessed by pandas, None if it is not a date
+    """
+    with warnings.catch_warnings():
+        # pandas warns when the guessed format puts the day first, which is fine for inference
+        warnings.simplefilter('ignore', UserWarning)
+        return guess_datetime_format(string)
+
+
+def get_date_fraction(strings: List[str]) -> float:
+    """
+    The fraction of the strings that are dates in a common format. Only the strings that pass the pre-screen are
+    parsed, with the formats guessed from the first few of them.
+    """
+    candidates = pd.Series([string for string in strings if DATE_PATTERN.fullmatch(string)], dtype=object)
+    if candidates.empty:
+        return 0.0
+    formats = []
+    for candidate in candidates.iloc[:MAX_GUESSED_DATE_FORMATS]:
+        guessed = guess_date_format(candidate)
+        if guessed is not None and guessed not in formats:
+            formats.append(guessed)
+    best = 0
+    for date_format in formats:
+        best = max(best, int(pd.to_datetime(candidates, format=date_format, errors='coerce').notna().sum()))
+        if best == len(candidates):
+            break
+    return best / len(strings)